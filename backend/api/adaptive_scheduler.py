@@ -2,18 +2,61 @@
 Adaptive Scheduler API endpoints.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from googleapiclient.errors import HttpError
 from sqlalchemy.orm import Session
 from ..models import get_db_session
+from ..core.adaptive_scheduler import AdaptiveScheduler, ScheduleStore
+from ..integrations.calendar_integration import CalendarSync
 
 router = APIRouter(prefix="/api/calendar", tags=["Adaptive Scheduler"])
 
 @router.post("/sync")
-def sync_calendar(db: Session = Depends(get_db_session)):
-    """Sync with calendar."""
-    return {"result": "Synced"}
+def sync_calendar(calendar_id: str = 'primary', db: Session = Depends(get_db_session)):
+    """Bring the local calendar mirror up to date, fetching only changes after the first sync."""
+    try:
+        result = CalendarSync(session_factory=lambda: db).sync(calendar_id)
+    except HttpError as e:
+        raise HTTPException(status_code=502, detail=f"Calendar sync failed: {e}")
+    return {"result": "Synced" if result['mode'] != 'unavailable' else "Calendar unavailable", **result}
 
 @router.post("/schedule-session")
 def schedule_session(session_data: dict, db: Session = Depends(get_db_session)):
-    """Schedule learning session."""
-    return {"result": "Scheduled"}
\ No newline at end of file
+    """Schedule learning sessions into the user's stored schedule."""
+    user_id = session_data.get('user_id')
+    if not user_id:
+        raise HTTPException(status_code=400, detail="user_id is required")
+
+    scheduler = AdaptiveScheduler(store=ScheduleStore(lambda: db))
+    items = session_data.get('items', [])
+    if scheduler.load_schedule(user_id):
+        try:
+            scheduled = scheduler.add_items(items)
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid learning item: {e}")
+    elif scheduler.initialize_scheduler(items):
+        scheduled = scheduler.generate_schedule()
+    else:
+        raise HTTPException(status_code=400, detail="Could not schedule the given learning items")
+
+    try:
+        version = scheduler.save_schedule(user_id)
+    except ValueError as e:
+        # The stored schedule changed while this request was scheduling
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return {"result": "Scheduled", "version": version, "items": scheduled}
+
+@router.post("/simulate")
+def simulate_schedule(simulation_data: dict, db: Session = Depends(get_db_session)):
+    """Compare what-if scenarios against the user's stored schedule without changing it."""
+    user_id = simulation_data.get('user_id')
+    if not user_id:
+        raise HTTPException(status_code=400, detail="user_id is required")
+
+    scheduler = AdaptiveScheduler(store=ScheduleStore(lambda: db))
+    if not scheduler.load_schedule(user_id):
+        raise HTTPException(status_code=404, detail=f"No stored schedule for {user_id}")
+
+    results = scheduler.simulate(simulation_data.get('scenarios', []), simulation_data.get('mode', "heuristic"))
+    return {"results": results}
\ No newline at end of file
@@ -2,17 +2,18 @@
 Learning Tracker API endpoints.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..models import get_db_session
 from ..core.ai_engine import GPTClient, Recommender
-from ..core.learning_tracker import PathGenerator
+from ..core.learning_tracker import PathGenerator, GoalTracker
 
 router = APIRouter(prefix="/api", tags=["Learning Tracker"])
 
 gpt_client = GPTClient()
 recommender = Recommender(gpt_client)
 path_generator = PathGenerator(recommender)
+goal_tracker = GoalTracker()
 
 @router.get("/paths/active")
 def get_active_paths(db: Session = Depends(get_db_session)):
@@ -65,17 +66,19 @@ def sync_concepts_from_obsidian(vault_path: str, db: Session = Depends(get_db_se
 @router.get("/goals/active")
 def get_active_goals(db: Session = Depends(get_db_session)):
     """Get active goals."""
-    # Placeholder
-    return {"goals": []}
+    return {"goals": goal_tracker.get_active_goals()}
 
 @router.post("/goals/create")
 def create_goal(title: str, description: str, domain: str, timeframe_weeks: int = 12, db: Session = Depends(get_db_session)):
     """Create new goal."""
-    # Placeholder
-    return {"goal": {"title": title, "description": description}}
+    goal = goal_tracker.create_goal(title, description, domain, [], timeframe_weeks)
+    return {"goal": goal}
 
 @router.put("/goals/{goal_id}/progress")
 def update_progress(goal_id: str, progress: float, db: Session = Depends(get_db_session)):
     """Update goal progress."""
-    # Placeholder
-    return {"result": "Updated"}
\ No newline at end of file
+    try:
+        goal = goal_tracker.update_goal_progress(goal_id, progress)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"result": "Updated", "goal": goal}
\ No newline at end of file
@@ -24,6 +24,13 @@ class Config:
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
 
+    # Goal deadline notifications; enable in exactly one process per database
+    GOAL_NOTIFICATIONS: bool = os.getenv("GOAL_NOTIFICATIONS", "false").lower() == "true"
+
+    # Periodic learning-curve fitting; enable in exactly one process per database
+    LEARNING_CURVE_FITTING: bool = os.getenv("LEARNING_CURVE_FITTING", "false").lower() == "true"
+    LEARNING_CURVE_INTERVAL_SECONDS: float = float(os.getenv("LEARNING_CURVE_INTERVAL_SECONDS", "3600"))
+
     # Obsidian vault path
     OBSIDIAN_VAULT_PATH: Optional[str] = os.getenv("OBSIDIAN_VAULT_PATH")
 
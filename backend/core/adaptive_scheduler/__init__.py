@@ -7,11 +7,19 @@ integrating with calendar systems and adapting based on user progress and availa
 
 from .scheduler import AdaptiveScheduler
 from .algorithms import AdaptiveSchedulingAlgorithm, ScheduleItem, UserAvailability, ConflictType
+from .batch import BatchScheduler
+from .recurrence import RecurringItem
+from .store import ScheduleStore
+from .simulation import simulate_scenarios
 
 __all__ = [
     'AdaptiveScheduler',
+    'BatchScheduler',
+    'ScheduleStore',
+    'simulate_scenarios',
     'AdaptiveSchedulingAlgorithm',
     'ScheduleItem',
     'UserAvailability',
+    'RecurringItem',
     'ConflictType'
 ]
\ No newline at end of file
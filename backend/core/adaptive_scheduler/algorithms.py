@@ -1,8 +1,19 @@
+import copy
 import datetime
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, field
+import heapq
+import itertools
+from collections import deque
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 from enum import Enum
 
+import numpy as np
+
+from .columns import FIELDS, MICROSECONDS_PER_MINUTE, NO_TIME, Column, ScheduleTable
+from .dependencies import critical_path_lengths, find_dependency_cycles
+from .intervals import AvailabilityIndex, find_overlapping_pairs, iter_overlapping_pairs
+from .recurrence import RecurringItem, expand_recurring
+from .solver import solve_schedule
+
 
 class ConflictType(Enum):
     TIME_OVERLAP = "time_overlap"
@@ -11,71 +22,316 @@ class ConflictType(Enum):
     DEPENDENCY_CONFLICT = "dependency_conflict"
 
 
-@dataclass
 class ScheduleItem:
-    """Represents a scheduled learning item."""
-    id: str
-    title: str
-    duration_minutes: int
-    priority: int  # 1-10 scale
-    start_time: Optional[datetime.datetime] = None
-    end_time: Optional[datetime.datetime] = None
-    dependencies: List[str] = field(default_factory=list)  # IDs of prerequisite items
-    completed: bool = False
-    progress_percentage: float = 0.0
-
-
-@dataclass
+    """
+    Represents a scheduled learning item.
+
+    A thin view over one row of a ScheduleTable. Items created on their own
+    hold their values until an AdaptiveSchedulingAlgorithm adopts them into
+    its table. Changes to ``dependencies``, assigned or in place, are
+    written to the row.
+    """
+
+    __slots__ = ('_table', '_row', '_values')
+
+    id = Column('id')
+    title = Column('title')
+    duration_minutes = Column('duration_minutes')
+    priority = Column('priority')  # 1-10 scale
+    start_time = Column('start_time')
+    end_time = Column('end_time')
+    dependencies = Column('dependencies')  # IDs of prerequisite items
+    completed = Column('completed')
+    progress_percentage = Column('progress_percentage')
+    deadline = Column('deadline')  # Soft due date, used by the optimal mode
+
+    def __init__(self, id: str, title: str, duration_minutes: int, priority: int,
+                 start_time: Optional[datetime.datetime] = None, end_time: Optional[datetime.datetime] = None,
+                 dependencies: Optional[List[str]] = None, completed: bool = False,
+                 progress_percentage: float = 0.0, deadline: Optional[datetime.datetime] = None):
+        self._table: Optional[ScheduleTable] = None
+        self._row = -1
+        self._values = [id, title, duration_minutes, priority, start_time, end_time,
+                        list(dependencies or []), completed, progress_percentage, deadline]
+
+    @classmethod
+    def _view(cls, table: ScheduleTable, row: int) -> 'ScheduleItem':
+        """An item viewing an existing row of ``table``."""
+        item = cls.__new__(cls)
+        item._table, item._row, item._values = table, row, None
+        return item
+
+    def _field_values(self) -> Tuple:
+        if self._table is None:
+            values = list(self._values)
+            values[6] = list(values[6])  # dependencies
+            return tuple(values)
+        return self._table.row_values(self._row)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._field_values() == other._field_values()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(FIELDS, self._field_values()))
+        return f"ScheduleItem({fields})"
+
+    def __copy__(self):
+        """A standalone item with the same values."""
+        return ScheduleItem(*self._field_values())
+
+    def __deepcopy__(self, memo):
+        return ScheduleItem(*copy.deepcopy(self._field_values(), memo))
+
+    def __reduce__(self):
+        return ScheduleItem, self._field_values()
+
+
 class UserAvailability:
     """Represents user's available time slots."""
-    start_time: datetime.datetime
-    end_time: datetime.datetime
-    confidence: float  # 0-1 scale of how reliable this slot is
+
+    __slots__ = ('start_time', 'end_time', 'confidence')
+
+    def __init__(self, start_time: datetime.datetime, end_time: datetime.datetime, confidence: float):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.confidence = confidence  # 0-1 scale of how reliable this slot is
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.start_time, self.end_time, self.confidence) == \
+               (other.start_time, other.end_time, other.confidence)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"UserAvailability(start_time={self.start_time!r}, end_time={self.end_time!r}, "
+                f"confidence={self.confidence!r})")
 
 
 class AdaptiveSchedulingAlgorithm:
     """Adaptive scheduling algorithms that adjust based on progress, conflicts, and user availability."""
 
-    def __init__(self, learning_items: List[ScheduleItem], user_availability: List[UserAvailability]):
+    def __init__(self, learning_items: List[ScheduleItem], user_availability: List[UserAvailability],
+                 recurring_items: Optional[List[RecurringItem]] = None):
         self.learning_items = learning_items
         self.user_availability = user_availability
+        self.recurring_items = recurring_items or []  # Fixed-time sessions expanded over the availability horizon
         self.conflicts = []
+        self.last_solve_report: Optional[Dict] = None
+        self.last_changes: List[Dict] = []
+
+    @property
+    def learning_items(self) -> List[ScheduleItem]:
+        return self._learning_items
+
+    @learning_items.setter
+    def learning_items(self, learning_items: List[ScheduleItem]) -> None:
+        self._learning_items = learning_items
+        self._table: Optional[ScheduleTable] = None  # Adopted on first use
+
+    @property
+    def table(self) -> ScheduleTable:
+        """Columnar storage behind the learning items, re-adopted if the list changed."""
+        self._table = ScheduleTable.adopt(
+            self._learning_items, self._table,
+            itertools.chain((time for slot in self._user_availability for time in (slot.start_time, slot.end_time)),
+                            (recurring.start_time for recurring in self.recurring_items))
+        )
+        return self._table
+
+    def clone(self) -> 'AdaptiveSchedulingAlgorithm':
+        """
+        Copy of the algorithm that can be rescheduled without touching this one.
+
+        The items are views onto a copy of the table; availability, its index
+        and the recurring items are shared read-only until the clone replaces
+        them.
+        """
+        table = self.table.copy()
+        clone = AdaptiveSchedulingAlgorithm([ScheduleItem._view(table, row) for row in range(len(table))],
+                                            self.user_availability, self.recurring_items)
+        clone._table = table
+        clone._availability_index = self.availability_index
+        return clone
+
+    def get_item(self, item_id: str) -> Optional[ScheduleItem]:
+        """
+        Find an item by ID through the table's ID index.
+
+        Lookups are O(1); the table is only re-adopted when the item list
+        changed length or the indexed row no longer holds the item. An item
+        swapped into the list in place is found after the next bulk operation
+        or after reassigning ``learning_items``.
+        """
+        table = self._current_table()
+        row = table.row_of(item_id)
+        if row is not None:
+            item = self._learning_items[row]
+            if item._table is table and item._row == row:
+                return item
+            row = self.table.row_of(item_id)
+        return None if row is None else self._learning_items[row]
+
+    def get_dependents(self, item_id: str) -> List[ScheduleItem]:
+        """Incomplete items that list ``item_id`` as a prerequisite, via the table's reverse index."""
+        rows = self._current_table().dependents(item_id)
+        return [item for item in map(self._learning_items.__getitem__, rows)
+                if not item.completed and item.id != item_id]
+
+    def _current_table(self) -> ScheduleTable:
+        """The table, re-adopting the items only if the list changed length."""
+        if self._table is None or len(self._table) != len(self._learning_items):
+            return self.table
+        return self._table
+
+    @property
+    def user_availability(self) -> List[UserAvailability]:
+        return self._user_availability
+
+    @user_availability.setter
+    def user_availability(self, user_availability: List[UserAvailability]) -> None:
+        self._user_availability = user_availability
+        self._availability_index = None
+
+    @property
+    def availability_index(self) -> AvailabilityIndex:
+        """Sorted index over the availability slots, built on first use."""
+        if self._availability_index is None:
+            self._availability_index = AvailabilityIndex(self._user_availability)
+        return self._availability_index
 
     def detect_conflicts(self) -> List[Dict]:
-        """Detect various types of scheduling conflicts."""
-        conflicts = []
+        """
+        Detect various types of scheduling conflicts.
+
+        Time overlaps are found with a sweep line over the scheduled intervals
+        and circular dependencies with a strongly connected components pass
+        over the dependency graph, so the cost is O(n log n + k) rather than
+        a comparison of every pair.
+        """
+        table = self.table
+        ids = table.ids()
+        dependency_lists = table.dependency_lists()
 
         # Sort items by priority and dependencies
-        sorted_items = sorted(self.learning_items, key=lambda x: (-x.priority, len(x.dependencies)))
-
-        for i, item1 in enumerate(sorted_items):
-            for item2 in sorted_items[i+1:]:
-                if self._has_time_overlap(item1, item2):
-                    conflicts.append({
-                        'type': ConflictType.TIME_OVERLAP,
-                        'items': [item1.id, item2.id],
-                        'severity': self._calculate_conflict_severity(item1, item2)
-                    })
-
-                if self._has_dependency_conflict(item1, item2):
-                    conflicts.append({
-                        'type': ConflictType.DEPENDENCY_CONFLICT,
-                        'items': [item1.id, item2.id],
-                        'severity': 9  # High severity for dependency conflicts
-                    })
-
-        return conflicts
-
-    def _has_time_overlap(self, item1: ScheduleItem, item2: ScheduleItem) -> bool:
-        """Check if two items have overlapping scheduled times."""
-        if not item1.start_time or not item1.end_time or not item2.start_time or not item2.end_time:
-            return False
-
-        return (item1.start_time < item2.end_time and item1.end_time > item2.start_time)
-
-    def _has_dependency_conflict(self, item1: ScheduleItem, item2: ScheduleItem) -> bool:
-        """Check if items have circular or conflicting dependencies."""
-        return (item1.id in item2.dependencies and item2.id in item1.dependencies)
+        order = np.lexsort((
+            [len(deps) for deps in dependency_lists], -table.column('priority').astype(np.int64)
+        ))
+        rows = order.tolist()
+        rank = {}
+        for index, row in enumerate(rows):
+            rank.setdefault(ids[row], index)
+
+        found = []  # (rank of first item, rank of second item, type order, conflict)
+
+        # Overlaps are integer comparisons on the time columns
+        intervals = [
+            (start, end) if start != NO_TIME and end != NO_TIME else None
+            for start, end in zip(table.column('start_time')[order].tolist(),
+                                  table.column('end_time')[order].tolist())
+        ]
+        for i, j in find_overlapping_pairs(intervals):
+            i, j = min(i, j), max(i, j)
+            found.append((i, j, 0, {
+                'type': ConflictType.TIME_OVERLAP,
+                'items': [ids[rows[i]], ids[rows[j]]],
+                'severity': self._calculate_conflict_severity(self.learning_items[rows[i]],
+                                                              self.learning_items[rows[j]])
+            }))
+
+        dependencies = {}
+        for row in rows:
+            dependencies.setdefault(ids[row], dependency_lists[row])
+        for cycle in find_dependency_cycles(dependencies):
+            members = sorted(cycle, key=rank.__getitem__)
+            found.append((rank[members[0]], rank[members[1]], 1, {
+                'type': ConflictType.DEPENDENCY_CONFLICT,
+                'items': members,
+                'severity': 9  # High severity for dependency conflicts
+            }))
+
+        found.sort(key=lambda entry: entry[:3])
+        return [conflict for *_, conflict in found] + list(self.iter_recurring_conflicts())
+
+    def iter_recurring_conflicts(self, window_start: Optional[datetime.datetime] = None,
+                                 window_end: Optional[datetime.datetime] = None) -> Iterator[Dict]:
+        """
+        Stream the time overlaps that involve recurring sessions.
+
+        Occurrences are expanded lazily and merged in start order with the
+        scheduled items, so memory follows the sessions open at one time
+        rather than the length of the window.
+
+        Args:
+            window_start: Start of the window to check, by default the start of the availability
+            window_end: End of the window to check, by default the end of the availability
+
+        Yields:
+            Time overlap conflicts in which at least one item is an occurrence
+        """
+        window = self._recurrence_window(window_start, window_end)
+        if window is None:
+            return
+
+        table = self.table
+        starts, ends = table.column('start_time'), table.column('end_time')
+        window_start_code, window_end_code = table.encode_time(window[0]), table.encode_time(window[1])
+        in_window = ((starts != NO_TIME) & (ends != NO_TIME) & ~table.column('completed')
+                     & (starts < window_end_code) & (ends > window_start_code))
+        rows = np.flatnonzero(in_window)
+        scheduled = (
+            (item.start_time, item.end_time, (item, False))
+            for item in map(self.learning_items.__getitem__, rows[np.argsort(starts[rows], kind='stable')].tolist())
+        )
+        occurrences = (
+            (start, end, (self._occurrence_item(template, start, end), True))
+            for start, end, template in expand_recurring(self.recurring_items, *window)
+        )
+
+        stream = heapq.merge(scheduled, occurrences, key=lambda entry: entry[0])
+        for (item1, recurring1), (item2, recurring2) in iter_overlapping_pairs(stream):
+            if recurring1 or recurring2:
+                yield {
+                    'type': ConflictType.TIME_OVERLAP,
+                    'items': [item1.id, item2.id],
+                    'severity': self._calculate_conflict_severity(item1, item2)
+                }
+
+    def _recurrence_window(self, window_start: Optional[datetime.datetime] = None,
+                           window_end: Optional[datetime.datetime] = None
+                           ) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+        """Window to expand recurring items over, defaulting to the availability horizon."""
+        if not self.recurring_items:
+            return None
+        segments = self.availability_index.segments
+        if window_start is None or window_end is None:
+            if not segments:
+                return None
+            window_start = segments[0][0] if window_start is None else window_start
+            window_end = segments[-1][1] if window_end is None else window_end
+        return window_start, window_end
+
+    @staticmethod
+    def _occurrence_item(template: RecurringItem, start_time: datetime.datetime,
+                         end_time: datetime.datetime) -> ScheduleItem:
+        """A standalone item for one occurrence, with the occurrence start in its ID."""
+        return ScheduleItem(id=f"{template.id}@{start_time.isoformat()}", title=template.title,
+                            duration_minutes=template.duration_minutes, priority=template.priority,
+                            start_time=start_time, end_time=end_time)
+
+    def _free_time(self) -> AvailabilityIndex:
+        """Copy of the availability free list with the recurring sessions taken out."""
+        free_time = self.availability_index.copy()
+        window = self._recurrence_window()
+        if window is not None:
+            for start, end, _ in expand_recurring(self.recurring_items, *window):
+                free_time.block(start, end)
+        return free_time
 
     def _calculate_conflict_severity(self, item1: ScheduleItem, item2: ScheduleItem) -> int:
         """Calculate severity of conflict based on priorities and progress."""
@@ -87,129 +343,426 @@ class AdaptiveSchedulingAlgorithm:
         return min(int(severity), 10)
 
     def reschedule_based_on_progress(self, item_id: str, new_progress: float) -> List[ScheduleItem]:
-        """Adjust schedule based on learning progress changes."""
-        item = next((i for i in self.learning_items if i.id == item_id), None)
+        """
+        Adjust schedule based on learning progress changes.
+
+        Only the item and the items it pushes are moved; the moves are left
+        in ``last_changes`` for calendar sync.
+        """
+        item = self.get_item(item_id)
         if not item:
             return self.learning_items
 
         old_progress = item.progress_percentage
         item.progress_percentage = new_progress
+        self.last_changes = []
 
-        # If progress increased significantly, free up time for other items
-        if new_progress - old_progress > 20:
-            self._optimize_schedule()
         # If progress is slow, allocate more time or reschedule
-        elif new_progress < old_progress:
+        if new_progress < old_progress:
             self._adjust_for_slow_progress(item)
 
         return self.learning_items
 
+    def reschedule_item(self, item_id: str, duration_minutes: Optional[int] = None) -> List[Dict]:
+        """
+        Repair the schedule around one item after its duration changed.
+
+        The item keeps its start if the new length still fits, displacing
+        lower-priority neighbours if needed, and otherwise moves to the best
+        free time after its prerequisites. Displaced neighbours and any
+        dependents that would now start too early are re-placed in turn;
+        nothing else moves.
+
+        Args:
+            item_id: ID of the changed item
+            duration_minutes: New duration, if it changed
+
+        Returns:
+            Moved items with their previous and new times
+        """
+        item = self.get_item(item_id)
+        if not item or item.completed:
+            return []
+        if duration_minutes is not None:
+            item.duration_minutes = duration_minutes
+
+        # Lower-priority neighbours give way if the item can grow in place
+        displaced: List[ScheduleItem] = []
+        target = None
+        if item.start_time:
+            target = (item.start_time, item.start_time + datetime.timedelta(minutes=item.duration_minutes))
+            table = self.table
+            starts, ends = table.column('start_time'), table.column('end_time')
+            target_start = table.encode_time(target[0])
+            target_end = target_start + item.duration_minutes * MICROSECONDS_PER_MINUTE
+            mask = ((starts != NO_TIME) & (ends != NO_TIME) & ~table.column('completed')
+                    & (starts < target_end) & (ends > target_start))
+            overlapping = [other for other in map(self.learning_items.__getitem__, np.flatnonzero(mask).tolist())
+                           if other is not item]
+            if all(other.priority < item.priority for other in overlapping) and self._is_time_available(*target):
+                displaced = overlapping
+            elif overlapping:
+                target = None
+
+        free_time = self._free_time()
+        holding = set()  # Items whose time is taken out of free_time
+        displaced_ids = {id(neighbour) for neighbour in displaced}
+        for other in self.learning_items:
+            if (other is not item and not other.completed and other.start_time and other.end_time
+                    and id(other) not in displaced_ids and free_time.reserve(other.start_time, other.end_time)):
+                holding.add(id(other))
+
+        previous: Dict[int, Tuple] = {}
+
+        def place(target_item: ScheduleItem, slot: Optional[Tuple[datetime.datetime, datetime.datetime]]) -> None:
+            previous.setdefault(id(target_item), (target_item, target_item.start_time, target_item.end_time))
+            target_item.start_time, target_item.end_time = slot or (None, None)
+            if slot:
+                holding.add(id(target_item))
+
+        def reallocate(target_item: ScheduleItem) -> None:
+            # Prerequisites must end first; an unscheduled one leaves the item unscheduled too
+            ready, blocked = None, False
+            for dep in target_item.dependencies:
+                prerequisite = self.get_item(dep)
+                if prerequisite is None or prerequisite.completed or prerequisite is target_item:
+                    continue
+                if not prerequisite.end_time:
+                    blocked = True
+                elif ready is None or prerequisite.end_time > ready:
+                    ready = prerequisite.end_time
+
+            slot = None
+            if not blocked:
+                slot = free_time.allocate(target_item.duration_minutes, ready,
+                                          earliest=bool(self.get_dependents(target_item.id)))
+            place(target_item, slot)
+
+        if target and free_time.reserve(*target):
+            if target != (item.start_time, item.end_time):
+                place(item, target)
+        else:
+            reallocate(item)
+
+        # Re-place displaced neighbours, then dependents that now start too early
+        for neighbour in displaced:
+            reallocate(neighbour)
+        queue = deque(displaced + [item])
+        pushed = set()  # (prerequisite, dependent) pairs already handled, so cycles terminate
+        while queue:
+            moved = queue.popleft()
+            for dependent in self.get_dependents(moved.id):
+                if not dependent.start_time or (id(moved), id(dependent)) in pushed:
+                    continue
+                pushed.add((id(moved), id(dependent)))
+                if moved.end_time is None or dependent.start_time < moved.end_time:
+                    if id(dependent) in holding:
+                        holding.discard(id(dependent))
+                        free_time.release(dependent.start_time, dependent.end_time)
+                    reallocate(dependent)
+                    queue.append(dependent)
+
+        changes = []
+        for target_item, old_start, old_end in previous.values():
+            if (old_start, old_end) != (target_item.start_time, target_item.end_time):
+                changes.append({
+                    'id': target_item.id,
+                    'previous_start_time': old_start,
+                    'previous_end_time': old_end,
+                    'start_time': target_item.start_time,
+                    'end_time': target_item.end_time
+                })
+        return changes
+
     def reschedule_based_on_availability(self, new_availability: List[UserAvailability]) -> List[ScheduleItem]:
         """Adjust schedule based on updated user availability."""
         self.user_availability = new_availability
 
-        # Find items that no longer fit in available slots
-        items_to_reschedule = []
-        for item in self.learning_items:
-            if item.start_time and item.end_time and not self._is_time_available(item.start_time, item.end_time):
-                items_to_reschedule.append(item)
-
-        # Reschedule conflicting items
-        for item in items_to_reschedule:
-            self._find_best_slot(item)
+        # Items that still fit keep their time; the rest are placed in what is left
+        self._allocate(keep_existing=True)
 
         return self.learning_items
 
     def _is_time_available(self, start_time: datetime.datetime, end_time: datetime.datetime) -> bool:
         """Check if a time slot is available in user's schedule."""
-        for slot in self.user_availability:
-            if (start_time >= slot.start_time and end_time <= slot.end_time):
-                return True
-        return False
-
-    def _find_best_slot(self, item: ScheduleItem) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
-        """Find the best available time slot for an item."""
-        best_slot = None
-        best_score = -1
-
-        for slot in self.user_availability:
-            slot_duration = (slot.end_time - slot.start_time).total_seconds() / 60
-
-            if slot_duration >= item.duration_minutes:
-                # Score based on slot confidence and how well it fits the item
-                score = slot.confidence * 10 + (slot_duration - item.duration_minutes) / slot_duration * 5
-
-                if score > best_score:
-                    best_score = score
-                    start_time = slot.start_time
-                    end_time = start_time + datetime.timedelta(minutes=item.duration_minutes)
-                    best_slot = (start_time, end_time)
-
+        return self.availability_index.contains(start_time, end_time)
+
+    def _occupied_time(self) -> Tuple[AvailabilityIndex, Set[int]]:
+        """
+        Free list with the scheduled items' time taken out.
+
+        Returns:
+            The free list, and the ``id()`` of every item whose time it holds
+            (an item overlapping one taken out earlier holds none)
+        """
+        free_time = self._free_time()
+        holding = set()
+        for other in self.learning_items:
+            self._hold(free_time, holding, other)
+        return free_time, holding
+
+    @staticmethod
+    def _hold(free_time: AvailabilityIndex, holding: Set[int], item: ScheduleItem) -> None:
+        """Take a scheduled item's time out of the free list if it is still free."""
+        if (id(item) not in holding and not item.completed and item.start_time and item.end_time
+                and free_time.reserve(item.start_time, item.end_time)):
+            holding.add(id(item))
+
+    @staticmethod
+    def _release(free_time: AvailabilityIndex, holding: Set[int], item: ScheduleItem) -> None:
+        """Give an item's held time back to the free list."""
+        if id(item) in holding:
+            holding.discard(id(item))
+            free_time.release(item.start_time, item.end_time)
+
+    def _find_best_slot(self, item: ScheduleItem,
+                        occupied: Optional[Tuple[AvailabilityIndex, Set[int]]] = None
+                        ) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+        """
+        Find the best available time slot for an item and move it there.
+
+        Args:
+            item: Item to place
+            occupied: Free list and holders from ``_occupied_time`` to place it
+                in and keep up to date; built from the current placements if omitted
+
+        Returns:
+            The new (start, end), or None if nothing fits
+        """
+        free_time, holding = occupied or self._occupied_time()
+        self._release(free_time, holding, item)
+
+        # Prerequisites that are already scheduled must finish first
+        ready = None
+        for dep in item.dependencies:
+            prerequisite = self.get_item(dep)
+            if (prerequisite is None or prerequisite is item or prerequisite.completed
+                    or not prerequisite.start_time or not prerequisite.end_time):
+                continue
+            if ready is None or prerequisite.end_time > ready:
+                ready = prerequisite.end_time
+        is_prerequisite = any(other is not item for other in self.get_dependents(item.id))
+
+        best_slot = free_time.allocate(item.duration_minutes, ready, earliest=is_prerequisite)
         if best_slot:
             item.start_time, item.end_time = best_slot
+            holding.add(id(item))
 
         return best_slot
 
     def _optimize_schedule(self) -> None:
         """Optimize the overall schedule for efficiency."""
-        # Sort by priority and dependencies
-        self.learning_items.sort(key=lambda x: (-x.priority, len(x.dependencies)))
-
         # Reset all schedules and reschedule optimally
-        for item in self.learning_items:
-            if not item.completed:
-                self._find_best_slot(item)
+        self._allocate(keep_existing=False)
+
+    def _scheduling_order(self, items: List[ScheduleItem]) -> List[ScheduleItem]:
+        """Order items so prerequisites come first, preferring the critical path."""
+        table = self.table
+        rows = self._order_rows([item._row for item in items], table.ids(), table.dependency_lists())
+        return [self.learning_items[row] for row in rows]
+
+    def _order_rows(self, rows: List[int], ids: List[str], dependency_lists: List[List[str]]) -> List[int]:
+        """
+        Order table rows so prerequisites come first, preferring the critical path.
+
+        A list scheduler over the dependency DAG: critical-path lengths are
+        computed once, then ready items are taken from a heap keyed by
+        critical path, priority and dependency count, O((n + e) log n).
+        Items caught in a dependency cycle are appended at the end.
+        """
+        durations = self.table.column('duration_minutes').tolist()
+        priorities = self.table.column('priority').tolist()
+
+        position = {}
+        for index, row in enumerate(rows):
+            position.setdefault(ids[row], index)
+
+        first_rows = [rows[index] for index in position.values()]
+        critical_path = critical_path_lengths(
+            {ids[row]: dependency_lists[row] for row in first_rows},
+            {ids[row]: durations[row] for row in first_rows}
+        )
+
+        waiting = [0] * len(rows)
+        dependents: List[List[int]] = [[] for _ in rows]
+        for index, row in enumerate(rows):
+            for dep in set(dependency_lists[row]):
+                dep_index = position.get(dep)
+                if dep_index is not None and dep_index != index:
+                    waiting[index] += 1
+                    dependents[dep_index].append(index)
+
+        def key(index):
+            row = rows[index]
+            return (-critical_path[ids[row]], -priorities[row], len(dependency_lists[row]), index)
+
+        ready = [key(index) for index in range(len(rows)) if not waiting[index]]
+        heapq.heapify(ready)
+
+        order = []
+        while ready:
+            index = heapq.heappop(ready)[-1]
+            order.append(index)
+            for dependent in dependents[index]:
+                waiting[dependent] -= 1
+                if not waiting[dependent]:
+                    heapq.heappush(ready, key(dependent))
+
+        if len(order) < len(rows):
+            placed = set(order)
+            order.extend(index for index in range(len(rows)) if index not in placed)
+
+        return [rows[index] for index in order]
+
+    def _allocate(self, keep_existing: bool) -> None:
+        """
+        Allocate time to every incomplete item in a single pass.
+
+        Each item takes free time from the availability free list, which is
+        then split around it, so allocated items never overlap and nothing
+        needs resolving afterwards. Items start no earlier than the end of
+        their prerequisites. Prerequisites take the earliest time that fits
+        so their dependents are not pushed out of the plan; other items take
+        the best-scoring slot.
+
+        Args:
+            keep_existing: Keep current placements that are still free, long
+                enough and after their prerequisites
+        """
+        table = self.table
+        ids = table.ids()
+        dependency_lists = table.dependency_lists()
+        durations = table.column('duration_minutes').tolist()
+        rows = np.flatnonzero(~table.column('completed')).tolist()
+
+        pending_ids = {ids[row] for row in rows}
+        prerequisites = {dep for row in rows for dep in dependency_lists[row] if dep != ids[row]}
+        order = self._order_rows(rows, ids, dependency_lists)
+        free_time = self._free_time()
+        end_times: Dict[str, datetime.datetime] = {}
+        kept = set()
+
+        def ready_time(row):
+            """End of the item's prerequisites, or False if one of them is unscheduled."""
+            ready = None
+            for dep in dependency_lists[row]:
+                if dep not in pending_ids or dep == ids[row]:
+                    continue
+                if dep not in end_times:
+                    return False
+                if ready is None or end_times[dep] > ready:
+                    ready = end_times[dep]
+            return ready
+
+        if keep_existing:
+            starts, ends = table.column('start_time').tolist(), table.column('end_time').tolist()
+            for row in order:
+                if starts[row] == NO_TIME or ends[row] == NO_TIME:
+                    continue
+                if ends[row] - starts[row] < durations[row] * MICROSECONDS_PER_MINUTE:
+                    continue
+                item = self.learning_items[row]
+                ready = ready_time(row)
+                if ready is False or (ready is not None and item.start_time < ready):
+                    continue
+                if free_time.reserve(item.start_time, item.end_time):
+                    end_times[ids[row]] = item.end_time
+                    kept.add(row)
+
+        for row in order:
+            if row in kept:
+                continue
+
+            item = self.learning_items[row]
+            ready = ready_time(row)
+            slot = None
+            if ready is not False:
+                slot = free_time.allocate(durations[row], ready, earliest=ids[row] in prerequisites)
+            if slot:
+                item.start_time, item.end_time = slot
+                end_times[ids[row]] = slot[1]
+            else:
+                item.start_time = item.end_time = None
 
     def _adjust_for_slow_progress(self, item: ScheduleItem) -> None:
         """Adjust schedule when progress is slower than expected."""
         # Increase allocated time by 25%
         if item.duration_minutes:
-            item.duration_minutes = int(item.duration_minutes * 1.25)
+            self.last_changes = self.reschedule_item(item.id, int(item.duration_minutes * 1.25))
+
+    def generate_schedule(self, mode: str = "heuristic", time_limit_seconds: float = 10.0) -> List[ScheduleItem]:
+        """
+        Generate an optimized schedule based on all factors.
+
+        Args:
+            mode: "heuristic" for the single-pass allocator, or "optimal" to
+                refine it with the CP-SAT solver (requires OR-Tools)
+            time_limit_seconds: Solver time limit in optimal mode
+
+        Returns:
+            The learning items with updated placements
+        """
+        if mode not in ("heuristic", "optimal"):
+            raise ValueError(f"Unknown scheduling mode: {mode}")
 
-        # Find a better slot if current one is too short
-        if item.start_time and item.end_time:
-            current_duration = (item.end_time - item.start_time).total_seconds() / 60
-            if current_duration < item.duration_minutes:
-                self._find_best_slot(item)
+        # Break circular dependencies so every item has a valid place in the order
+        table = self.table
+        for cycle in find_dependency_cycles(dict(zip(table.ids(), table.dependency_lists()))):
+            self._resolve_dependency_conflict(cycle)
 
-    def generate_schedule(self) -> List[ScheduleItem]:
-        """Generate an optimized schedule based on all factors."""
-        # Detect and resolve conflicts
-        conflicts = self.detect_conflicts()
-        self._resolve_conflicts(conflicts)
+        # Keep placements that still work and allocate everything else
+        self._allocate(keep_existing=True)
 
-        # Schedule unscheduled items
-        for item in self.learning_items:
-            if not item.start_time and not item.completed:
-                self._find_best_slot(item)
+        if mode == "optimal":
+            self._solve_optimal(time_limit_seconds)
 
         return self.learning_items
 
+    def _solve_optimal(self, time_limit_seconds: float) -> None:
+        """Improve the heuristic schedule with the solver, keeping it if no solution is found."""
+        items = [item for item in self.learning_items if not item.completed]
+        report = solve_schedule(items, self._free_time().free_segments(), time_limit_seconds)
+
+        if report['status'] in ('optimal', 'feasible'):
+            for index, placement in report['placements'].items():
+                items[index].start_time, items[index].end_time = placement or (None, None)
+
+        # Report the solve without the per-item placements
+        self.last_solve_report = {key: value for key, value in report.items() if key != 'placements'}
+        self.last_solve_report['scheduled_items'] = sum(
+            1 for placement in report['placements'].values() if placement
+        )
+
     def _resolve_conflicts(self, conflicts: List[Dict]) -> None:
-        """Resolve detected scheduling conflicts."""
+        """Resolve detected scheduling conflicts against one shared free list."""
+        occupied = None
         for conflict in sorted(conflicts, key=lambda x: x['severity'], reverse=True):
             if conflict['type'] == ConflictType.TIME_OVERLAP:
-                self._resolve_time_overlap(conflict['items'])
+                occupied = occupied or self._occupied_time()
+                self._resolve_time_overlap(conflict['items'], occupied)
             elif conflict['type'] == ConflictType.DEPENDENCY_CONFLICT:
                 self._resolve_dependency_conflict(conflict['items'])
 
-    def _resolve_time_overlap(self, item_ids: List[str]) -> None:
+    def _resolve_time_overlap(self, item_ids: List[str],
+                              occupied: Optional[Tuple[AvailabilityIndex, Set[int]]] = None) -> None:
         """Resolve time overlap conflicts by rescheduling lower priority items."""
-        items = [next(i for i in self.learning_items if i.id == iid) for iid in item_ids]
+        items = [self.get_item(iid) for iid in item_ids]
         items.sort(key=lambda x: x.priority)
 
         # Reschedule the lower priority item
         if len(items) >= 2:
             lower_priority_item = items[0]
-            self._find_best_slot(lower_priority_item)
+            free_time, holding = occupied = occupied or self._occupied_time()
+            # The items it overlapped keep their time before it is placed again
+            self._release(free_time, holding, lower_priority_item)
+            for other in items[1:]:
+                self._hold(free_time, holding, other)
+            self._find_best_slot(lower_priority_item, occupied)
 
     def _resolve_dependency_conflict(self, item_ids: List[str]) -> None:
         """Resolve dependency conflicts by adjusting dependencies."""
-        # For now, remove circular dependencies
-        item1 = next(i for i in self.learning_items if i.id == item_ids[0])
-        item2 = next(i for i in self.learning_items if i.id == item_ids[1])
-
-        if item1.id in item2.dependencies:
-            item2.dependencies.remove(item1.id)
-        if item2.id in item1.dependencies:
-            item1.dependencies.remove(item2.id)
\ No newline at end of file
+        # For now, remove the dependencies that form the cycle
+        cycle = set(item_ids)
+        for item in filter(None, map(self.get_item, cycle)):
+            item.dependencies = [dep for dep in item.dependencies
+                                 if dep not in cycle or dep == item.id]
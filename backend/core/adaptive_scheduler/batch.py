@@ -0,0 +1,290 @@
+"""
+Batch scheduling for many users on a process pool.
+
+Each user's items and availability are packed into compact NumPy arrays
+(epoch seconds, CSR dependencies) so shards are cheap to send to worker
+processes. Workers rebuild the schedule objects, run the scheduling
+algorithm and send back only the placements.
+"""
+
+import datetime
+import math
+import multiprocessing
+import os
+import queue
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .algorithms import AdaptiveSchedulingAlgorithm, ScheduleItem, UserAvailability
+from .columns import NO_TIME, ScheduleTable, schedule_time_zone
+
+logger = logging.getLogger(__name__)
+
+UNSCHEDULED = -1  # Epoch-second marker for a missing time
+POOL_GRACE_SECONDS = 60.0  # Slack on top of the shards' own budget before stuck workers are terminated
+_UTC = datetime.timezone.utc
+
+
+def _to_epoch(value: Optional[datetime.datetime]) -> int:
+    if value is None:
+        return UNSCHEDULED
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_UTC)  # Naive times are treated as UTC
+    return int(value.timestamp())
+
+
+def _from_epoch(value: int, aware: bool) -> Optional[datetime.datetime]:
+    if value == UNSCHEDULED:
+        return None
+    result = datetime.datetime.fromtimestamp(int(value), tz=_UTC)
+    return result if aware else result.replace(tzinfo=None)
+
+
+def _column_seconds(table: ScheduleTable, name: str) -> np.ndarray:
+    """Epoch seconds of a time column, UNSCHEDULED where unset."""
+    values = table.column(name)
+    return np.where(values == NO_TIME, UNSCHEDULED, values // 1_000_000)
+
+
+def pack_user_schedule(user_id: Any, items: Sequence[ScheduleItem],
+                       availability: Sequence[UserAvailability]) -> Dict[str, Any]:
+    """
+    Pack one user's schedule into compact arrays for a worker process.
+
+    Args:
+        user_id: Identifier passed back with the results
+        items: The user's learning items
+        availability: The user's availability slots
+
+    Returns:
+        Dict of NumPy arrays plus the item IDs
+    """
+    # Read the items' own column store when they fill it exactly; otherwise pack
+    # from a snapshot so the caller's items stay bound where they are
+    table = items[0]._table if items else None
+    if table is None or len(table) != len(items) or not all(
+        item._table is table and item._row == row for row, item in enumerate(items)
+    ):
+        rows = [item._field_values() for item in items]
+        table = ScheduleTable(schedule_time_zone(time for row in rows for time in (row[4], row[5], row[9])))
+        table.extend(rows)
+    offsets, rows = table.dependency_rows()
+    known = rows >= 0  # Dependencies on unknown IDs are dropped
+    indptr = np.concatenate(([0], np.cumsum(known)))[offsets]
+
+    sample = next((slot.start_time for slot in availability), None) or next(
+        (item.start_time for item in items if item.start_time), None
+    )
+
+    return {
+        'user_id': user_id,
+        'aware': bool(sample is not None and sample.tzinfo is not None),
+        'ids': table.ids(),
+        'duration': table.column('duration_minutes').astype(np.int32),
+        'priority': table.column('priority').astype(np.int16),
+        'completed': table.column('completed'),
+        'start': _column_seconds(table, 'start_time'),
+        'end': _column_seconds(table, 'end_time'),
+        'deadline': _column_seconds(table, 'deadline'),
+        'dep_indptr': indptr.astype(np.int32),
+        'dep_indices': rows[known].astype(np.int32),
+        'slot_start': np.array([_to_epoch(slot.start_time) for slot in availability], dtype=np.int64),
+        'slot_end': np.array([_to_epoch(slot.end_time) for slot in availability], dtype=np.int64),
+        'slot_confidence': np.array([slot.confidence for slot in availability], dtype=np.float32)
+    }
+
+
+def unpack_user_schedule(packed: Dict[str, Any]) -> Tuple[List[ScheduleItem], List[UserAvailability]]:
+    """Rebuild schedule items and availability from ``pack_user_schedule`` output."""
+    aware = packed['aware']
+    ids = packed['ids']
+    indptr = packed['dep_indptr'].tolist()
+    indices = packed['dep_indices'].tolist()
+
+    items = []
+    for index, item_id in enumerate(ids):
+        items.append(ScheduleItem(
+            id=item_id,
+            title="",
+            duration_minutes=int(packed['duration'][index]),
+            priority=int(packed['priority'][index]),
+            start_time=_from_epoch(packed['start'][index], aware),
+            end_time=_from_epoch(packed['end'][index], aware),
+            dependencies=[ids[dep] for dep in indices[indptr[index]:indptr[index + 1]]],
+            completed=bool(packed['completed'][index]),
+            deadline=_from_epoch(packed['deadline'][index], aware)
+        ))
+
+    availability = [
+        UserAvailability(_from_epoch(start, aware), _from_epoch(end, aware), float(confidence))
+        for start, end, confidence in zip(packed['slot_start'].tolist(), packed['slot_end'].tolist(),
+                                          packed['slot_confidence'].tolist())
+    ]
+    return items, availability
+
+
+def _schedule_shard(shard: List[Dict[str, Any]], mode: str, time_limit_seconds: float,
+                    shard_timeout: Optional[float]) -> List[Dict[str, Any]]:
+    """Worker entry point: schedule each packed user until the shard's time budget runs out."""
+    started = time.monotonic()
+    results = []
+
+    for packed in shard:
+        if shard_timeout is not None and time.monotonic() - started >= shard_timeout:
+            results.append({'user_id': packed['user_id'], 'status': 'timeout'})
+            continue
+
+        try:
+            items, availability = unpack_user_schedule(packed)
+            algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+            algorithm.generate_schedule(mode, time_limit_seconds)
+            results.append({
+                'user_id': packed['user_id'],
+                'status': 'scheduled',
+                'ids': packed['ids'],
+                'start': _column_seconds(algorithm.table, 'start_time'),
+                'end': _column_seconds(algorithm.table, 'end_time'),
+                'aware': packed['aware']
+            })
+        except Exception as e:
+            results.append({'user_id': packed['user_id'], 'status': 'failed', 'error': str(e)})
+
+    return results
+
+
+class BatchScheduler:
+    """
+    Schedules many users at once by sharding them across a process pool.
+
+    The pool is a ``multiprocessing.Pool`` owned by each ``schedule_users``
+    call, so workers stuck past the batch budget can be terminated.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, shard_size: int = 50,
+                 shard_timeout: Optional[float] = 300.0,
+                 progress_callback: Optional[Callable[[int, int], None]] = None,
+                 writer: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        """
+        Args:
+            max_workers: Worker processes (defaults to the CPU count)
+            shard_size: Users sent to a worker at a time
+            shard_timeout: Seconds a shard may spend scheduling; users not reached are reported as timed out,
+                and workers still running once the whole batch is past its budget are terminated
+            progress_callback: Called with (users done, total users) as shards finish
+            writer: Called with each finished shard's results for bulk persistence,
+                e.g. ``ScheduleStore().save_placements``; if omitted, results are
+                returned from ``schedule_users``
+        """
+        self.max_workers = max_workers
+        self.shard_size = shard_size
+        self.shard_timeout = shard_timeout
+        self.progress_callback = progress_callback
+        self.writer = writer
+
+    def schedule_users(self, users: Iterable[Tuple[Any, Sequence[ScheduleItem], Sequence[UserAvailability]]],
+                       mode: str = "heuristic", time_limit_seconds: float = 10.0) -> Dict[str, Any]:
+        """
+        Generate schedules for many users in parallel.
+
+        Args:
+            users: (user_id, items, availability) for each user
+            mode: Scheduling mode passed to ``generate_schedule``
+            time_limit_seconds: Solver time limit per user in optimal mode
+
+        Returns:
+            Summary with counts, timed out and failed user IDs, and the
+            placements per user (item ID to (start, end)) when no writer is set
+        """
+        packed = [pack_user_schedule(user_id, items, availability) for user_id, items, availability in users]
+        shards = [packed[i:i + self.shard_size] for i in range(0, len(packed), self.shard_size)]
+        total = len(packed)
+
+        summary = {'users': total, 'scheduled': 0, 'timed_out': [], 'failed': [], 'results': {}}
+        done = 0
+        if not shards:
+            return summary
+
+        workers = self.max_workers or os.cpu_count() or 1
+        finished = queue.Queue()  # (shard index, results, error) as shards complete
+        pending = set(range(len(shards)))
+        pool = multiprocessing.Pool(processes=min(workers, len(shards)))
+        try:
+            for index, shard in enumerate(shards):
+                pool.apply_async(
+                    _schedule_shard, (shard, mode, time_limit_seconds, self.shard_timeout),
+                    callback=lambda results, index=index: finished.put((index, results, None)),
+                    error_callback=lambda error, index=index: finished.put((index, None, error))
+                )
+            pool.close()
+
+            # Shards enforce their own budget; this guards against a worker that never returns
+            deadline = None
+            if self.shard_timeout is not None:
+                rounds = math.ceil(len(shards) / workers)
+                deadline = time.monotonic() + (self.shard_timeout + time_limit_seconds) * rounds + POOL_GRACE_SECONDS
+
+            while pending:
+                try:
+                    index, results, error = finished.get(
+                        timeout=None if deadline is None else max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    logger.error(f"{len(pending)} scheduling shards did not finish in time")
+                    for index in sorted(pending):
+                        summary['timed_out'].extend(user['user_id'] for user in shards[index])
+                    break
+
+                pending.discard(index)
+                shard = shards[index]
+                if error is not None:
+                    logger.error(f"Scheduling shard failed: {error}")
+                    results = [{'user_id': user['user_id'], 'status': 'failed', 'error': str(error)}
+                               for user in shard]
+
+                self._collect(results, summary)
+                done += len(shard)
+                if self.progress_callback:
+                    self.progress_callback(done, total)
+        finally:
+            if pending:
+                # A worker stuck past its budget would otherwise outlive the batch
+                pool.terminate()
+            pool.join()
+
+        return summary
+
+    def _collect(self, results: List[Dict[str, Any]], summary: Dict[str, Any]) -> None:
+        """Convert a shard's results and hand them to the writer in one call."""
+        placements = []
+        for result in results:
+            if result['status'] == 'timeout':
+                summary['timed_out'].append(result['user_id'])
+            elif result['status'] == 'failed':
+                summary['failed'].append(result['user_id'])
+            else:
+                summary['scheduled'] += 1
+                aware = result['aware']
+                placements.append({
+                    'user_id': result['user_id'],
+                    'placements': {
+                        item_id: (_from_epoch(start, aware), _from_epoch(end, aware))
+                        for item_id, start, end in zip(result['ids'], result['start'].tolist(),
+                                                       result['end'].tolist())
+                    }
+                })
+
+        if not placements:
+            return
+        if self.writer:
+            try:
+                self.writer(placements)
+            except Exception as e:
+                logger.error(f"Writing batch schedule results failed: {e}")
+                summary['scheduled'] -= len(placements)
+                summary['failed'].extend(placement['user_id'] for placement in placements)
+        else:
+            for placement in placements:
+                summary['results'][placement['user_id']] = placement['placements']
@@ -0,0 +1,550 @@
+"""
+Columnar storage for schedule items.
+
+A ScheduleTable keeps every item of a plan in compact typed columns instead
+of one object graph per item: times are int64 microseconds since the epoch,
+durations and priorities are integer columns and dependencies are stored in
+CSR form (an offsets column plus interned ID codes). ScheduleItem objects
+are thin views onto a row, and bulk checks read whole columns as NumPy
+arrays so overlaps become integer comparisons.
+"""
+
+import datetime
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+NO_TIME = -(2 ** 63)  # Column marker for an unset time
+
+FIELDS = ('id', 'title', 'duration_minutes', 'priority', 'start_time', 'end_time',
+          'dependencies', 'completed', 'progress_percentage', 'deadline')
+_DEPENDENCIES = FIELDS.index('dependencies')
+_TIME_FIELDS = tuple(FIELDS.index(name) for name in ('start_time', 'end_time', 'deadline'))
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+MICROSECONDS_PER_MINUTE = 60_000_000
+
+
+def schedule_time_zone(times: Iterable[Optional[datetime.datetime]],
+                       default: Optional[datetime.tzinfo] = datetime.timezone.utc) -> Optional[datetime.tzinfo]:
+    """
+    Time zone for a table holding ``times``.
+
+    Args:
+        times: Every time the table will hold; None values are ignored
+        default: Zone to use if no time is set
+
+    Returns:
+        None if all times are naive, their zone if all share one, else UTC
+
+    Raises:
+        ValueError: If naive and time-zone-aware times are mixed
+    """
+    naive = aware = None
+    for value in times:
+        if value is None:
+            continue
+        if value.tzinfo is None:
+            naive = value
+        elif aware is None or aware.tzinfo is value.tzinfo:
+            aware = value
+        else:
+            aware = value.astimezone(datetime.timezone.utc)  # Different zones: fall back to UTC
+    if naive is not None and aware is not None:
+        raise ValueError(f"Schedule mixes naive and time-zone-aware times ({naive} and {aware})")
+    if aware is not None:
+        return aware.tzinfo
+    return None if naive is not None else default
+
+
+class ScheduleTable:
+    """
+    Column store behind a list of ScheduleItems.
+
+    Times are stored as microseconds since the Unix epoch in UTC. The table
+    has one time zone, fixed when it is created: times are returned in that
+    zone, or naive (read as UTC) for a table created with ``tz=None``.
+    Writing a naive time to an aware table or the other way round raises
+    ``ValueError``. Rows are appended, never removed.
+
+    Rows that were appended or changed since the last ``clear_dirty`` are
+    tracked so a store can write back only what changed.
+    """
+
+    _NUMERIC = {
+        'duration_minutes': ('_duration', np.int64),
+        'priority': ('_priority', np.int32),
+        'start_time': ('_start', np.int64),
+        'end_time': ('_end', np.int64),
+        'deadline': ('_deadline', np.int64),
+        'completed': ('_completed', np.bool_),
+        'progress_percentage': ('_progress', np.float64)
+    }
+
+    def __init__(self, tz: Optional[datetime.tzinfo] = datetime.timezone.utc):
+        """
+        Args:
+            tz: Zone times are returned in, or None for a table of naive times
+        """
+        self._names: List[str] = []  # Interned item and dependency IDs
+        self._codes: Dict[str, int] = {}
+        self._id = array('i')
+        self._title: List[str] = []
+        self._duration = array('q')
+        self._priority = array('i')
+        self._start = array('q')
+        self._end = array('q')
+        self._deadline = array('q')
+        self._completed = array('b')
+        self._progress = array('d')
+        self._dep_offsets = array('q', [0])
+        self._dep_codes = array('i')
+        self._dep_changed: Dict[int, array] = {}  # Rows whose dependencies were replaced since the last compaction
+        self._tz = tz
+        self._row_of: Optional[Dict[str, int]] = None  # ID to first row, built on first lookup
+        self._dependents: Optional[Dict[int, Set[int]]] = None  # ID code to dependent rows, built on first lookup
+        self._dirty = bytearray()  # Per-row flag: appended or changed since the last clear_dirty
+        self._shared = False  # Names, titles and dependency columns are shared with a copy
+
+    def __len__(self) -> int:
+        return len(self._id)
+
+    def copy(self) -> 'ScheduleTable':
+        """
+        Independent table with the same rows.
+
+        Numeric columns are copied outright. Interned names, titles and the
+        dependency CSR columns are shared copy-on-write: both tables copy
+        them before their first change, so a copy that only moves items
+        never duplicates them. All rows of the copy start clean.
+        """
+        clone = object.__new__(ScheduleTable)
+        clone.__dict__.update(self.__dict__)
+        for name in ('_id', '_duration', '_priority', '_start', '_end', '_deadline', '_completed', '_progress'):
+            setattr(clone, name, array(getattr(self, name).typecode, getattr(self, name)))
+        clone._dep_changed = dict(self._dep_changed)
+        clone._row_of = clone._dependents = None
+        clone._dirty = bytearray(len(self._id))
+        self._shared = clone._shared = True
+        return clone
+
+    def _unshare(self) -> None:
+        """Take private copies of the columns shared with a copy before changing them."""
+        if self._shared:
+            self._names, self._codes, self._title = list(self._names), dict(self._codes), list(self._title)
+            self._dep_offsets, self._dep_codes = array('q', self._dep_offsets), array('i', self._dep_codes)
+            self._shared = False
+
+    @property
+    def tz(self) -> Optional[datetime.tzinfo]:
+        """Zone of the table's times, or None for naive times."""
+        return self._tz
+
+    @classmethod
+    def adopt(cls, items: Sequence[Any], table: Optional['ScheduleTable'] = None,
+              other_times: Iterable[Optional[datetime.datetime]] = ()) -> 'ScheduleTable':
+        """
+        Return the table backing ``items``, moving them into a new one if needed.
+
+        If every item already views row ``i`` of ``table`` the table is reused
+        as is, and items appended after the table's rows are added to it;
+        otherwise the items' current values are copied into a fresh table and
+        each item is rebound to its row there.
+
+        A fresh table's zone comes from ``schedule_time_zone`` over all
+        the items' times and ``other_times``.
+
+        Args:
+            items: ScheduleItems, in row order
+            table: Table the items were last adopted into, if any
+            other_times: Other times the plan compares with the items, such as availability
+
+        Returns:
+            The table whose row ``i`` is ``items[i]``
+
+        Raises:
+            ValueError: If naive and time-zone-aware times are mixed
+        """
+        if table is None and items:
+            table = items[0]._table
+        first = 0
+        if table is not None and len(table) <= len(items) and all(
+            item._table is table and item._row == row for row, item in enumerate(items[:len(table)])
+        ):
+            first = len(table)
+            if first == len(items):
+                return table
+            if any(item._table is not None for item in items[first:]):
+                first, table = 0, None
+        else:
+            table = None
+        added = items[first:]
+        rows = [item._values if item._table is None else item._field_values() for item in added]
+        if table is None:
+            table = cls(schedule_time_zone(
+                [row[field] for row in rows for field in _TIME_FIELDS] + list(other_times)
+            ))
+        table.extend(rows)
+        for row, item in enumerate(added, first):
+            item._table, item._row, item._values = table, row, None
+        return table
+
+    def append(self, id: str, title: str, duration_minutes: int, priority: int,
+               start_time: Optional[datetime.datetime] = None, end_time: Optional[datetime.datetime] = None,
+               dependencies: Sequence[str] = (), completed: bool = False, progress_percentage: float = 0.0,
+               deadline: Optional[datetime.datetime] = None) -> int:
+        """Append an item and return its row."""
+        row = len(self._id)
+        self._unshare()
+        self._id.append(self._intern(id))
+        self._title.append(title)
+        self._duration.append(int(duration_minutes))
+        self._priority.append(int(priority))
+        self._start.append(self.encode_time(start_time))
+        self._end.append(self.encode_time(end_time))
+        self._deadline.append(self.encode_time(deadline))
+        self._completed.append(bool(completed))
+        self._progress.append(float(progress_percentage))
+        self._dep_codes.extend(self._intern(dep) for dep in dependencies)
+        self._dep_offsets.append(len(self._dep_codes))
+        self._dirty.append(1)
+        if self._row_of is not None:
+            self._row_of.setdefault(id, row)
+        if self._dependents is not None:
+            self._index_dependencies(row)
+        return row
+
+    def extend(self, rows: Sequence[Sequence[Any]]) -> None:
+        """Append many items at once, each given as field values in ``FIELDS`` order."""
+        if not rows:
+            return
+        first = len(self._id)
+        self._unshare()
+        ids, titles, durations, priorities, starts, ends, dependencies, completed, progress, deadlines = zip(*rows)
+        self._id.extend(map(self._intern, ids))
+        self._title.extend(titles)
+        self._duration.extend(map(int, durations))
+        self._priority.extend(map(int, priorities))
+        self._start.extend(map(self.encode_time, starts))
+        self._end.extend(map(self.encode_time, ends))
+        self._deadline.extend(map(self.encode_time, deadlines))
+        self._completed.extend(map(bool, completed))
+        self._progress.extend(map(float, progress))
+        for deps in dependencies:
+            self._dep_codes.extend(map(self._intern, deps))
+            self._dep_offsets.append(len(self._dep_codes))
+        self._dirty.extend(b'\x01' * (len(self._id) - first))
+        self._row_of = self._dependents = None
+
+    def _intern(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            self._unshare()
+            code = self._codes[name] = len(self._names)
+            self._names.append(name)
+        return code
+
+    # Time encoding
+
+    def encode_time(self, value: Optional[datetime.datetime]) -> int:
+        """Microseconds since the epoch for ``value``, or NO_TIME for None."""
+        if value is None:
+            return NO_TIME
+        if value.tzinfo is None:
+            if self._tz is not None:
+                raise ValueError(f"Naive time {value} in a schedule with time zone {self._tz}")
+            return (value - _EPOCH) // _MICROSECOND
+        if self._tz is None:
+            raise ValueError(f"Time-zone-aware time {value} in a schedule of naive times")
+        return (value - _EPOCH_UTC) // _MICROSECOND
+
+    def decode_time(self, value: int) -> Optional[datetime.datetime]:
+        """Inverse of ``encode_time`` in the table's time zone."""
+        if value == NO_TIME:
+            return None
+        if self._tz is None:
+            return _EPOCH + datetime.timedelta(microseconds=value)
+        result = _EPOCH_UTC + datetime.timedelta(microseconds=value)
+        return result if self._tz is datetime.timezone.utc else result.astimezone(self._tz)
+
+    # Row access used by the ScheduleItem view
+
+    def _write(self, column: Any, row: int, value: Any) -> None:
+        """Store a cell, marking the row dirty only if the value changed."""
+        if column[row] != value:
+            column[row] = value
+            self._dirty[row] = 1
+
+    def _get_id(self, row: int) -> str:
+        return self._names[self._id[row]]
+
+    def _set_id(self, row: int, value: str) -> None:
+        self._write(self._id, row, self._intern(value))
+        self._row_of = None
+
+    def _get_title(self, row: int) -> str:
+        return self._title[row]
+
+    def _set_title(self, row: int, value: str) -> None:
+        if self._title[row] != value:
+            self._unshare()
+        self._write(self._title, row, value)
+
+    def _get_duration_minutes(self, row: int) -> int:
+        return self._duration[row]
+
+    def _set_duration_minutes(self, row: int, value: int) -> None:
+        self._write(self._duration, row, int(value))
+
+    def _get_priority(self, row: int) -> int:
+        return self._priority[row]
+
+    def _set_priority(self, row: int, value: int) -> None:
+        self._write(self._priority, row, int(value))
+
+    def _get_start_time(self, row: int) -> Optional[datetime.datetime]:
+        return self.decode_time(self._start[row])
+
+    def _set_start_time(self, row: int, value: Optional[datetime.datetime]) -> None:
+        self._write(self._start, row, self.encode_time(value))
+
+    def _get_end_time(self, row: int) -> Optional[datetime.datetime]:
+        return self.decode_time(self._end[row])
+
+    def _set_end_time(self, row: int, value: Optional[datetime.datetime]) -> None:
+        self._write(self._end, row, self.encode_time(value))
+
+    def _get_deadline(self, row: int) -> Optional[datetime.datetime]:
+        return self.decode_time(self._deadline[row])
+
+    def _set_deadline(self, row: int, value: Optional[datetime.datetime]) -> None:
+        self._write(self._deadline, row, self.encode_time(value))
+
+    def _get_completed(self, row: int) -> bool:
+        return bool(self._completed[row])
+
+    def _set_completed(self, row: int, value: bool) -> None:
+        self._write(self._completed, row, bool(value))
+
+    def _get_progress_percentage(self, row: int) -> float:
+        return self._progress[row]
+
+    def _set_progress_percentage(self, row: int, value: float) -> None:
+        self._write(self._progress, row, float(value))
+
+    def _get_dependencies(self, row: int) -> List[str]:
+        names = self._names
+        return [names[code] for code in self._dependency_codes(row)]
+
+    def _set_dependencies(self, row: int, value: Sequence[str]) -> None:
+        if self._dependents is not None:
+            for code in self._dependency_codes(row):
+                self._dependents[code].discard(row)
+        self._dep_changed[row] = array('i', (self._intern(dep) for dep in value))
+        self._dirty[row] = 1
+        if self._dependents is not None:
+            self._index_dependencies(row)
+
+    def _dependency_codes(self, row: int) -> Sequence[int]:
+        codes = self._dep_changed.get(row)
+        if codes is None:
+            codes = self._dep_codes[self._dep_offsets[row]:self._dep_offsets[row + 1]]
+        return codes
+
+    def row_values(self, row: int) -> Tuple:
+        """Field values of one row, in ``FIELDS`` order."""
+        return (self._get_id(row), self._title[row], self._duration[row], self._priority[row],
+                self.decode_time(self._start[row]), self.decode_time(self._end[row]),
+                self._get_dependencies(row), bool(self._completed[row]), self._progress[row],
+                self.decode_time(self._deadline[row]))
+
+    # Change tracking
+
+    def dirty_rows(self) -> List[int]:
+        """Rows appended or changed since the last ``clear_dirty``, in row order."""
+        return np.flatnonzero(np.frombuffer(self._dirty, dtype=np.uint8)).tolist()
+
+    def clear_dirty(self) -> None:
+        """Mark every row as saved."""
+        self._dirty = bytearray(len(self._id))
+
+    # Bulk access
+
+    def column(self, name: str) -> np.ndarray:
+        """Copy of a numeric column as a NumPy array; times are raw microseconds with NO_TIME for unset."""
+        attribute, dtype = self._NUMERIC[name]
+        return np.array(getattr(self, attribute), dtype=dtype)
+
+    def ids(self) -> List[str]:
+        """Item ID of every row."""
+        names = self._names
+        return [names[code] for code in self._id]
+
+    def dependency_lists(self) -> List[List[str]]:
+        """Prerequisite IDs of every row."""
+        self._compact_dependencies()
+        names, offsets, codes = self._names, self._dep_offsets, self._dep_codes
+        return [[names[code] for code in codes[offsets[row]:offsets[row + 1]]] for row in range(len(self._id))]
+
+    def row_of(self, item_id: str) -> Optional[int]:
+        """First row holding ``item_id``, O(1) once the index is built."""
+        return self._row_index().get(item_id)
+
+    def dependents(self, item_id: str) -> List[int]:
+        """Rows that list ``item_id`` as a prerequisite, in row order."""
+        code = self._codes.get(item_id)
+        if code is None:
+            return []
+        if self._dependents is None:
+            self._dependents = {}
+            for row in range(len(self._id)):
+                self._index_dependencies(row)
+        return sorted(self._dependents.get(code, ()))
+
+    def _index_dependencies(self, row: int) -> None:
+        for code in self._dependency_codes(row):
+            self._dependents.setdefault(code, set()).add(row)
+
+    def _row_index(self) -> Dict[str, int]:
+        if self._row_of is None:
+            self._row_of = {}
+            for row, code in enumerate(self._id):
+                self._row_of.setdefault(self._names[code], row)
+        return self._row_of
+
+    def dependency_rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dependencies as CSR arrays of row numbers.
+
+        Returns:
+            (offsets, rows): the prerequisites of row ``i`` are
+            ``rows[offsets[i]:offsets[i + 1]]``, with -1 for IDs that are not
+            in the table
+        """
+        self._compact_dependencies()
+        lookup = np.full(len(self._names), -1, dtype=np.int64)
+        for item_id, row in self._row_index().items():
+            lookup[self._codes[item_id]] = row
+        codes = np.array(self._dep_codes, dtype=np.int64)
+        return np.array(self._dep_offsets, dtype=np.int64), lookup[codes]
+
+    def _compact_dependencies(self) -> None:
+        """Fold replaced dependency lists back into the CSR columns."""
+        if not self._dep_changed:
+            return
+        offsets, codes = array('q', [0]), array('i')
+        for row in range(len(self._id)):
+            changed = self._dep_changed.get(row)
+            if changed is None:
+                codes.extend(self._dep_codes[self._dep_offsets[row]:self._dep_offsets[row + 1]])
+            else:
+                codes.extend(changed)
+            offsets.append(len(codes))
+        self._dep_offsets, self._dep_codes, self._dep_changed = offsets, codes, {}
+
+
+class DependencyList(list):
+    """
+    The ``dependencies`` of a table row.
+
+    A list whose in-place changes (``append``, ``remove``, slice assignment,
+    ...) are written back to the row and mark it dirty, as they would take
+    effect on a plain list attribute. Copies and pickles are plain lists.
+    """
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: ScheduleTable, row: int, names: Sequence[str]):
+        super().__init__(names)
+        self._table, self._row = table, row
+
+    def _write_back(self) -> None:
+        self._table._set_dependencies(self._row, self)
+
+    def append(self, value):
+        super().append(value)
+        self._write_back()
+
+    def extend(self, values):
+        super().extend(values)
+        self._write_back()
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._write_back()
+
+    def remove(self, value):
+        super().remove(value)
+        self._write_back()
+
+    def pop(self, index=-1):
+        value = super().pop(index)
+        self._write_back()
+        return value
+
+    def clear(self):
+        super().clear()
+        self._write_back()
+
+    def sort(self, *, key=None, reverse=False):
+        super().sort(key=key, reverse=reverse)
+        self._write_back()
+
+    def reverse(self):
+        super().reverse()
+        self._write_back()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._write_back()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._write_back()
+
+    def __iadd__(self, values):
+        super().__iadd__(values)
+        self._write_back()
+        return self
+
+    def __imul__(self, count):
+        super().__imul__(count)
+        self._write_back()
+        return self
+
+    def __copy__(self):
+        return list(self)
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+class Column:
+    """Descriptor exposing one ScheduleTable column as an attribute of a row view."""
+
+    __slots__ = ('index', '_get', '_set')
+
+    def __init__(self, name: str):
+        self.index = FIELDS.index(name)
+        self._get = getattr(ScheduleTable, '_get_' + name)
+        self._set = getattr(ScheduleTable, '_set_' + name)
+
+    def __get__(self, view: Any, owner: Any = None) -> Any:
+        if view is None:
+            return self
+        table = view._table
+        if table is None:
+            return view._values[self.index]
+        if self.index == _DEPENDENCIES:
+            return DependencyList(table, view._row, self._get(table, view._row))
+        return self._get(table, view._row)
+
+    def __set__(self, view: Any, value: Any) -> None:
+        table = view._table
+        if table is None:
+            view._values[self.index] = list(value) if self.index == _DEPENDENCIES else value
+        else:
+            self._set(table, view._row, value)
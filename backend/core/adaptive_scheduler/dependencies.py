@@ -0,0 +1,120 @@
+"""
+Dependency graph helpers for the adaptive scheduler.
+"""
+
+from typing import Dict, List, Sequence
+
+
+def find_dependency_cycles(dependencies: Dict[str, Sequence[str]]) -> List[List[str]]:
+    """
+    Find circular dependencies with Tarjan's strongly connected components.
+
+    Runs in O(V + E) with an explicit stack, so large plans don't hit the
+    recursion limit. Dependencies on unknown IDs and self-dependencies are ignored.
+
+    Args:
+        dependencies: Item ID to the IDs of its prerequisite items
+
+    Returns:
+        Groups of item IDs that depend on each other in a cycle
+    """
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    cycles = []
+    counter = 0
+
+    for root in dependencies:
+        if root in index_of:
+            continue
+
+        work = [(root, iter(dependencies[root]))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, edges = work[-1]
+            advanced = False
+            for dep in edges:
+                if dep not in dependencies or dep == node:
+                    continue
+                if dep not in index_of:
+                    index_of[dep] = lowlink[dep] = counter
+                    counter += 1
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(dependencies[dep])))
+                    advanced = True
+                    break
+                if dep in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[dep])
+
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1:
+                    cycles.append(component)
+
+    return cycles
+
+
+def critical_path_lengths(dependencies: Dict[str, Sequence[str]],
+                          durations: Dict[str, float]) -> Dict[str, float]:
+    """
+    Length of the longest chain of work that starts with each item.
+
+    An item's critical path is its own duration plus the longest critical
+    path among the items that depend on it. Computed once in reverse
+    topological order, O(V + E). Items caught in a cycle only count their
+    own duration and the dependents outside the cycle.
+
+    Args:
+        dependencies: Item ID to the IDs of its prerequisite items
+        durations: Item ID to its duration
+
+    Returns:
+        Item ID to its critical path length
+    """
+    dependents: Dict[str, List[str]] = {item_id: [] for item_id in dependencies}
+    waiting = dict.fromkeys(dependencies, 0)
+    for item_id, deps in dependencies.items():
+        for dep in set(deps):
+            if dep in dependents and dep != item_id:
+                dependents[dep].append(item_id)
+                waiting[item_id] += 1
+
+    order = [item_id for item_id, count in waiting.items() if not count]
+    for item_id in order:
+        for dependent in dependents[item_id]:
+            waiting[dependent] -= 1
+            if not waiting[dependent]:
+                order.append(dependent)
+
+    lengths: Dict[str, float] = {}
+    for item_id in reversed(order):
+        lengths[item_id] = durations[item_id] + max(
+            (lengths[dependent] for dependent in dependents[item_id]), default=0
+        )
+    for item_id in dependencies:
+        if item_id not in lengths:
+            lengths[item_id] = durations[item_id] + max(
+                (lengths.get(dependent, 0) for dependent in dependents[item_id]), default=0
+            )
+
+    return lengths
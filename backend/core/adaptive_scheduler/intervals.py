@@ -0,0 +1,529 @@
+"""
+Interval helpers for the adaptive scheduler.
+"""
+
+import bisect
+import datetime
+import heapq
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+def find_overlapping_pairs(intervals: Sequence[Optional[Tuple[Any, Any]]]) -> List[Tuple[int, int]]:
+    """
+    Find every pair of overlapping intervals with a sweep line.
+
+    Intervals are visited in start order while a heap keeps the ones still
+    open, so the cost is O(n log n + k) for k overlapping pairs.
+
+    Args:
+        intervals: (start, end) pairs, or None for unscheduled entries
+
+    Returns:
+        Index pairs (i, j) of intervals that overlap
+    """
+    order = sorted(
+        (index for index, interval in enumerate(intervals) if interval is not None),
+        key=lambda index: intervals[index][0]
+    )
+    return list(iter_overlapping_pairs((intervals[index][0], intervals[index][1], index) for index in order))
+
+
+def iter_overlapping_pairs(intervals: Iterable[Tuple[Any, Any, Any]]) -> Iterator[Tuple[Any, Any]]:
+    """
+    Stream the overlapping pairs of intervals that arrive in start order.
+
+    Only the intervals still open are held, so memory follows the largest
+    set of simultaneously open intervals rather than the length of the stream.
+
+    Args:
+        intervals: (start, end, key) triples sorted by start
+
+    Yields:
+        (earlier key, later key) for each overlapping pair
+    """
+    active: List[Tuple[Any, int, Any, Any]] = []  # (end, arrival, start, key) of intervals still open
+    for arrival, (start, end, key) in enumerate(intervals):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+
+        # Everything still open ends after this start and began at or before it
+        for _, _, other_start, other_key in active:
+            if end > other_start:
+                yield other_key, key
+
+        heapq.heappush(active, (end, arrival, start, key))
+
+
+def merge_intervals(intervals: Iterable[Tuple[Any, Any]]) -> List[Tuple[Any, Any]]:
+    """
+    Merge overlapping or touching intervals.
+
+    Args:
+        intervals: (start, end) pairs in any order
+
+    Returns:
+        Disjoint (start, end) pairs sorted by start
+    """
+    merged: List[List[Any]] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_intervals(windows: Sequence[Tuple[Any, Any, float]],
+                       busy: Iterable[Tuple[Any, Any]]) -> List[Tuple[Any, Any, float]]:
+    """
+    Remove busy periods from availability windows in one linear merge.
+
+    Args:
+        windows: (start, end, confidence) windows sorted by start and not overlapping
+        busy: (start, end) busy periods in any order
+
+    Returns:
+        Maximal free (start, end, confidence) intervals sorted by start
+    """
+    busy = merge_intervals(busy)
+    free = []
+    position = 0
+    for start, end, confidence in windows:
+        # Busy periods that ended before this window can't affect later windows either
+        while position < len(busy) and busy[position][1] <= start:
+            position += 1
+
+        cursor = start
+        index = position
+        while index < len(busy) and busy[index][0] < end:
+            busy_start, busy_end = busy[index]
+            if busy_start > cursor:
+                free.append((cursor, busy_start, confidence))
+            cursor = max(cursor, busy_end)
+            if busy_end >= end:
+                break
+            index += 1
+        if cursor < end:
+            free.append((cursor, end, confidence))
+
+    return free
+
+
+def expand_working_hours(template: Dict[int, Sequence[Tuple[datetime.time, datetime.time, float]]],
+                         start: datetime.datetime, end: datetime.datetime) -> List[Tuple[datetime.datetime, datetime.datetime, float]]:
+    """
+    Lay a weekly working-hours template over a horizon.
+
+    Args:
+        template: Weekday (0 = Monday) to (start time, end time, confidence) windows
+        start: Start of the horizon; windows keep its timezone
+        end: End of the horizon
+
+    Returns:
+        (start, end, confidence) windows clipped to the horizon, sorted by start
+    """
+    windows = []
+    day = start.date()
+    while day <= end.date():
+        for window_start, window_end, confidence in sorted(template.get(day.weekday(), ())):
+            window_start = datetime.datetime.combine(day, window_start, tzinfo=start.tzinfo)
+            window_end = datetime.datetime.combine(day, window_end, tzinfo=start.tzinfo)
+            window_start, window_end = max(window_start, start), min(window_end, end)
+            if window_start < window_end:
+                windows.append((window_start, window_end, confidence))
+        day += datetime.timedelta(days=1)
+    return windows
+
+
+def cap_weekly_hours(windows: Sequence[Tuple[datetime.datetime, datetime.datetime, float]],
+                     hours_per_week: float) -> List[Tuple[datetime.datetime, datetime.datetime, float]]:
+    """
+    Limit availability to a number of hours per ISO week.
+
+    Within each week the most confident windows are kept first, earliest
+    first among equals, and the last window kept is shortened to fit.
+
+    Args:
+        windows: Disjoint (start, end, confidence) windows
+        hours_per_week: Hours to keep in each week
+
+    Returns:
+        The kept (start, end, confidence) windows sorted by start
+    """
+    weeks: Dict[Tuple[int, int], List[Tuple[datetime.datetime, datetime.datetime, float]]] = {}
+    for window in windows:
+        weeks.setdefault(window[0].isocalendar()[:2], []).append(window)
+
+    kept = []
+    budget = datetime.timedelta(hours=hours_per_week)
+    for week_windows in weeks.values():
+        remaining = budget
+        for start, end, confidence in sorted(week_windows, key=lambda window: (-window[2], window[0])):
+            if remaining <= datetime.timedelta(0):
+                break
+            end = min(end, start + remaining)
+            kept.append((start, end, confidence))
+            remaining -= end - start
+    kept.sort()
+    return kept
+
+
+class _MaxTree:
+    """Segment tree returning the longest leaf in a suffix, ties to the earliest."""
+
+    def __init__(self, values: List[float]):
+        self._size = 1
+        while self._size < len(values):
+            self._size *= 2
+        self._best = [-1] * (2 * self._size)  # leaf position of the longest value under each node
+        self._values = [-1.0] * self._size
+        for position, value in enumerate(values):
+            self._values[position] = value
+            self._best[self._size + position] = position
+        for node in range(self._size - 1, 0, -1):
+            self._pull(node)
+
+    def _better(self, a: int, b: int) -> int:
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        if self._values[b] > self._values[a] or (self._values[b] == self._values[a] and b < a):
+            return b
+        return a
+
+    def _pull(self, node: int) -> None:
+        self._best[node] = self._better(self._best[2 * node], self._best[2 * node + 1])
+
+    def update(self, position: int, value: float) -> None:
+        self._values[position] = value
+        node = (self._size + position) // 2
+        while node:
+            self._pull(node)
+            node //= 2
+
+    def copy(self) -> "_MaxTree":
+        clone = object.__new__(_MaxTree)
+        clone._size = self._size
+        clone._best = list(self._best)
+        clone._values = list(self._values)
+        return clone
+
+    def first_at_least(self, lo: int, value: float) -> int:
+        """Earliest position at or after ``lo`` holding at least ``value``, or -1 if there is none."""
+        return self._first_at_least(1, 0, self._size, lo, value)
+
+    def _first_at_least(self, node: int, node_lo: int, node_hi: int, lo: int, value: float) -> int:
+        best = self._best[node]
+        if node_hi <= lo or best < 0 or self._values[best] < value:
+            return -1
+        if node >= self._size:
+            return node_lo
+        mid = (node_lo + node_hi) // 2
+        found = self._first_at_least(2 * node, node_lo, mid, lo, value)
+        if found < 0:
+            found = self._first_at_least(2 * node + 1, mid, node_hi, lo, value)
+        return found
+
+    def longest(self, lo: int) -> int:
+        """Position of the longest value at or after ``lo``, or -1 if there is none."""
+        best = -1
+        left, right = lo + self._size, 2 * self._size
+        while left < right:
+            if left & 1:
+                best = self._better(best, self._best[left])
+                left += 1
+            if right & 1:
+                right -= 1
+                best = self._better(best, self._best[right])
+            left //= 2
+            right //= 2
+        return best
+
+
+class AvailabilityIndex:
+    """
+    Sorted index and free list over a user's availability slots.
+
+    Containment checks bisect into the merged availability intervals.
+    For best-fit lookups the slots are split into disjoint segments, each
+    carrying the highest confidence of the slots that cover it, and every
+    segment keeps a sorted list of its free fragments.
+
+    Within one confidence level a longer fragment always scores higher, so
+    each level keeps a segment tree of the longest free fragment per segment.
+    A lookup queries the levels from the most confident down and stops once
+    no lower level can catch up, which is O(log m) per level visited.
+    A tree over all segments also finds the earliest fragment that fits.
+    Allocating time splits the chosen fragment and updates its tree paths.
+    """
+
+    def __init__(self, slots: Iterable[Any]):
+        slots = [slot for slot in slots if slot.end_time > slot.start_time]
+
+        merged = merge_intervals((slot.start_time, slot.end_time) for slot in slots)
+        self._merged_starts = [start for start, _ in merged]
+        self._merged_ends = [end for _, end in merged]
+
+        self.segments = self._build_segments(slots)
+        self.starts = [start for start, _, _ in self.segments]
+        self.ends = [end for _, end, _ in self.segments]
+        self._fragments = [[(start, end)] for start, end, _ in self.segments]
+
+        # Segment indices per confidence level, most confident first
+        self._levels = sorted({confidence for _, _, confidence in self.segments}, reverse=True)
+        level_of = {confidence: level for level, confidence in enumerate(self._levels)}
+        self._members: List[List[int]] = [[] for _ in self._levels]
+        self._position = []  # (level, position within the level) per segment
+        for index, (_, _, confidence) in enumerate(self.segments):
+            level = level_of[confidence]
+            self._position.append((level, len(self._members[level])))
+            self._members[level].append(index)
+        self._level_ends = [[self.ends[index] for index in members] for members in self._members]
+        self._trees = [
+            _MaxTree([(self.ends[index] - self.starts[index]).total_seconds() for index in members])
+            for members in self._members
+        ]
+        self._all = _MaxTree([(end - start).total_seconds() for start, end, _ in self.segments])
+
+    @staticmethod
+    def _build_segments(slots: List[Any]) -> List[Tuple[Any, Any, float]]:
+        """Split possibly overlapping slots into disjoint (start, end, confidence) segments."""
+        events = sorted({slot.start_time for slot in slots} | {slot.end_time for slot in slots})
+        by_start = sorted(slots, key=lambda slot: slot.start_time)
+
+        segments: List[Tuple[Any, Any, float]] = []
+        active: List[Tuple[float, Any]] = []  # (-confidence, end) of covering slots
+        next_slot = 0
+        for start, end in zip(events, events[1:]):
+            while next_slot < len(by_start) and by_start[next_slot].start_time <= start:
+                slot = by_start[next_slot]
+                heapq.heappush(active, (-slot.confidence, slot.end_time))
+                next_slot += 1
+            while active and active[0][1] <= start:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            confidence = -active[0][0]
+            if segments and segments[-1][1] == start and segments[-1][2] == confidence:
+                segments[-1] = (segments[-1][0], end, confidence)
+            else:
+                segments.append((start, end, confidence))
+        return segments
+
+    def copy(self) -> "AvailabilityIndex":
+        """Independent free list over the same availability."""
+        clone = object.__new__(AvailabilityIndex)
+        clone.__dict__.update(self.__dict__)
+        clone._fragments = [list(fragments) for fragments in self._fragments]
+        clone._trees = [tree.copy() for tree in self._trees]
+        clone._all = self._all.copy()
+        return clone
+
+    def contains(self, start_time: Any, end_time: Any) -> bool:
+        """Check whether [start_time, end_time] lies inside the availability."""
+        index = bisect.bisect_right(self._merged_starts, start_time) - 1
+        return index >= 0 and end_time <= self._merged_ends[index]
+
+    def best_fit(self, duration_minutes: float, ready: Optional[Any] = None) -> Optional[Tuple[int, int, Any]]:
+        """
+        Find the free fragment that best fits an item.
+
+        Fragments are scored like ``AdaptiveSchedulingAlgorithm._find_best_slot``:
+        confidence first, then the share of the usable fragment left over.
+        Ties go to the earlier fragment.
+
+        Args:
+            duration_minutes: Length of the item
+            ready: Earliest time the item may start
+
+        Returns:
+            (segment index, fragment index, start time), or None if nothing fits
+        """
+        duration = datetime.timedelta(minutes=duration_minutes)
+        best_score, best_fit = -1.0, None
+
+        for level, confidence in enumerate(self._levels):
+            if confidence * 10 + 5 < best_score:
+                break  # Even an endless fragment at this level would score lower
+
+            members = self._members[level]
+            # Segments are disjoint, so their ends are sorted too
+            first = 0
+            if ready is not None:
+                first = bisect.bisect_left(self._level_ends[level], ready + duration)
+                if first >= len(members):
+                    continue
+
+            candidates = []
+            if ready is not None:
+                # The first segment may straddle the ready time, so score its fragments exactly
+                candidates.append(self._segment_fit(members[first], duration_minutes, ready))
+                first += 1
+            position = self._trees[level].longest(first) if first < len(members) else -1
+            if position >= 0:
+                candidates.append(self._segment_fit(members[position], duration_minutes, None))
+
+            for score, fit in candidates:
+                if fit is not None and (score > best_score or (score == best_score and fit[0] < best_fit[0])):
+                    best_score, best_fit = score, fit
+
+        return best_fit
+
+    def earliest_fit(self, duration_minutes: float, ready: Optional[Any] = None) -> Optional[Tuple[int, int, Any]]:
+        """
+        Find the earliest free fragment that can hold an item.
+
+        Args:
+            duration_minutes: Length of the item
+            ready: Earliest time the item may start
+
+        Returns:
+            (segment index, fragment index, start time), or None if nothing fits
+        """
+        duration = datetime.timedelta(minutes=duration_minutes)
+        index = bisect.bisect_left(self.ends, ready + duration) if ready is not None else 0
+
+        while index < len(self.segments):
+            index = self._all.first_at_least(index, duration.total_seconds())
+            if index < 0:
+                return None
+            for fragment, (start, end) in enumerate(self._fragments[index]):
+                begin = start if ready is None or ready <= start else ready
+                if end - begin >= duration and end > begin:
+                    return (index, fragment, begin)
+            # Only a segment straddling the ready time can fail here
+            index += 1
+
+        return None
+
+    def _segment_fit(self, index: int, duration_minutes: float,
+                     ready: Optional[Any]) -> Tuple[float, Optional[Tuple[int, int, Any]]]:
+        """Best-scoring fragment within one segment."""
+        confidence = self.segments[index][2]
+        best_score, best_fit = -1.0, None
+        for fragment, (start, end) in enumerate(self._fragments[index]):
+            begin = start if ready is None or ready <= start else ready
+            usable = (end - begin).total_seconds() / 60
+            if usable <= 0 or usable < duration_minutes:
+                continue
+            score = confidence * 10 + (usable - duration_minutes) / usable * 5
+            if score > best_score:
+                best_score, best_fit = score, (index, fragment, begin)
+        return best_score, best_fit
+
+    def allocate(self, duration_minutes: float, ready: Optional[Any] = None,
+                 earliest: bool = False) -> Optional[Tuple[Any, Any]]:
+        """
+        Take free time for an item out of the free list.
+
+        Args:
+            duration_minutes: Length of the item
+            ready: Earliest time the item may start
+            earliest: Take the earliest fragment that fits instead of the best-scoring one
+
+        Returns:
+            (start, end) of the allocated time, or None if nothing fits
+        """
+        if earliest:
+            fit = self.earliest_fit(duration_minutes, ready)
+        else:
+            fit = self.best_fit(duration_minutes, ready)
+        if fit is None:
+            return None
+
+        index, fragment, start_time = fit
+        end_time = start_time + datetime.timedelta(minutes=duration_minutes)
+        self._split(index, fragment, start_time, end_time)
+        return (start_time, end_time)
+
+    def reserve(self, start_time: Any, end_time: Any) -> bool:
+        """
+        Take a fixed interval out of the free list.
+
+        Returns:
+            False (leaving the free list untouched) if the interval is not entirely free
+        """
+        index = bisect.bisect_right(self.starts, start_time) - 1
+        if index < 0 or end_time > self.ends[index]:
+            return False
+
+        fragments = self._fragments[index]
+        fragment = bisect.bisect_right(fragments, (start_time, self.ends[index])) - 1
+        if fragment < 0 or end_time > fragments[fragment][1]:
+            return False
+
+        self._split(index, fragment, start_time, end_time)
+        return True
+
+    def block(self, start_time: Any, end_time: Any) -> None:
+        """Take whatever part of [start_time, end_time] is still free out of the free list."""
+        index = max(bisect.bisect_right(self.starts, start_time) - 1, 0)
+        while index < len(self.starts) and self.starts[index] < end_time:
+            fragments = self._fragments[index]
+            first = max(bisect.bisect_left(fragments, (start_time,)) - 1, 0)
+            last = first
+            remaining = []
+            while last < len(fragments) and fragments[last][0] < end_time:
+                fragment_start, fragment_end = fragments[last]
+                if fragment_start < start_time:
+                    remaining.append((fragment_start, min(fragment_end, start_time)))
+                if fragment_end > end_time:
+                    remaining.append((max(fragment_start, end_time), fragment_end))
+                last += 1
+            if fragments[first:last] != remaining:
+                fragments[first:last] = remaining
+                self._update(index)
+            index += 1
+
+    def free_segments(self) -> List[Tuple[Any, Any, float]]:
+        """Free fragments as (start, end, confidence) segments sorted by start."""
+        return [
+            (start, end, confidence)
+            for (_, _, confidence), fragments in zip(self.segments, self._fragments)
+            for start, end in fragments
+        ]
+
+    def release(self, start_time: Any, end_time: Any) -> None:
+        """Return a previously allocated or reserved interval to the free list."""
+        if end_time <= start_time:
+            return
+
+        index = bisect.bisect_right(self.starts, start_time) - 1
+        if index < 0 or end_time > self.ends[index]:
+            raise ValueError("Released time is not inside a single availability segment")
+
+        fragments = self._fragments[index]
+        position = bisect.bisect_left(fragments, (start_time, end_time))
+        # Merge with touching neighbours so fragments stay maximal
+        if position < len(fragments) and fragments[position][0] == end_time:
+            end_time = fragments.pop(position)[1]
+        if position > 0 and fragments[position - 1][1] == start_time:
+            position -= 1
+            start_time = fragments.pop(position)[0]
+        fragments.insert(position, (start_time, end_time))
+        self._update(index)
+
+    def _split(self, index: int, fragment: int, start_time: Any, end_time: Any) -> None:
+        """Replace a free fragment with what is left around [start_time, end_time]."""
+        if end_time <= start_time:
+            return  # Zero-length items take no time
+
+        fragment_start, fragment_end = self._fragments[index][fragment]
+        remaining = []
+        if start_time > fragment_start:
+            remaining.append((fragment_start, start_time))
+        if fragment_end > end_time:
+            remaining.append((end_time, fragment_end))
+        self._fragments[index][fragment:fragment + 1] = remaining
+        self._update(index)
+
+    def _update(self, index: int) -> None:
+        """Refresh the trees after a segment's fragments changed."""
+        longest = max(((end - start).total_seconds() for start, end in self._fragments[index]), default=-1.0)
+        level, position = self._position[index]
+        self._trees[level].update(position, longest)
+        self._all.update(index, longest)
@@ -0,0 +1,76 @@
+"""
+Recurring learning sessions.
+
+A RecurringItem describes sessions such as "30 minutes of SLAM every
+weekday" with an RFC 5545 RRULE. Occurrences are generated lazily for a
+query window, so a rule that runs for a year only costs memory for the
+window being scheduled.
+"""
+
+import datetime
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from dateutil.rrule import rrulestr
+
+
+@dataclass
+class RecurringItem:
+    """A learning session that repeats on an RRULE schedule."""
+    id: str
+    title: str
+    duration_minutes: int
+    priority: int  # 1-10 scale
+    rule: str  # RRULE, e.g. "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"
+    start_time: datetime.datetime  # DTSTART: the first occurrence and the time of day
+    exclusions: List[datetime.datetime] = field(default_factory=list)  # EXDATE occurrences to skip
+    _rule: Any = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # rrulestr raises ValueError for a malformed rule
+        self._rule = rrulestr(self.rule, dtstart=self.start_time)
+
+    def occurrences(self, window_start: datetime.datetime,
+                    window_end: datetime.datetime) -> Iterator[Tuple[datetime.datetime, datetime.datetime]]:
+        """
+        Generate the occurrences that overlap a window, in start order.
+
+        Args:
+            window_start: Start of the query window
+            window_end: End of the query window
+
+        Yields:
+            (start, end) of each occurrence
+        """
+        duration = datetime.timedelta(minutes=self.duration_minutes)
+        excluded = set(self.exclusions)
+        # Occurrences starting up to one duration before the window still overlap it
+        for start in self._rule.xafter(window_start - duration):
+            if start >= window_end:
+                return
+            if start not in excluded:
+                yield start, start + duration
+
+
+def expand_recurring(templates: Iterable[RecurringItem], window_start: datetime.datetime,
+                     window_end: datetime.datetime) -> Iterator[Tuple[datetime.datetime, datetime.datetime, RecurringItem]]:
+    """
+    Merge the occurrences of several recurring items into one stream.
+
+    Args:
+        templates: Recurring items to expand
+        window_start: Start of the query window
+        window_end: End of the query window
+
+    Yields:
+        (start, end, template) for every occurrence overlapping the window, in start order
+    """
+    streams = [_tagged(template, window_start, window_end) for template in templates]
+    return heapq.merge(*streams, key=lambda occurrence: occurrence[0])
+
+
+def _tagged(template: RecurringItem, window_start: datetime.datetime,
+            window_end: datetime.datetime) -> Iterator[Tuple[datetime.datetime, datetime.datetime, RecurringItem]]:
+    for start, end in template.occurrences(window_start, window_end):
+        yield start, end, template
@@ -1,75 +1,228 @@
 import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Sequence, Tuple
 from .algorithms import AdaptiveSchedulingAlgorithm, ScheduleItem, UserAvailability, ConflictType
+from .intervals import expand_working_hours, subtract_intervals
+from .recurrence import RecurringItem
+from .simulation import simulate_scenarios
+from .store import ScheduleStore
+from ...integrations.calendar_integration.availability import AvailabilityProvider
 from ...integrations.calendar_integration.google_calendar import GoogleCalendarIntegration
+from ...integrations.calendar_integration.sync import CalendarSync
+
+
+# Weekday (0 = Monday) to (start, end, confidence) windows used when free time comes from the calendar
+DEFAULT_WORKING_HOURS = {
+    **{weekday: [(datetime.time(9, 0), datetime.time(17, 0), 0.8)] for weekday in range(5)},
+    # Lower confidence on weekends
+    **{weekday: [(datetime.time(10, 0), datetime.time(16, 0), 0.6)] for weekday in (5, 6)}
+}
+
+# A stored availability snapshot older than this is recomputed when the schedule is loaded
+AVAILABILITY_TTL = datetime.timedelta(hours=1)
+
+# A calendar mirror last synced longer ago than this is synced before availability is read from it
+CALENDAR_SYNC_MAX_AGE = datetime.timedelta(hours=1)
 
 
 class AdaptiveScheduler:
     """Main adaptive scheduling system that integrates calendar data and learning progress."""
 
-    def __init__(self, calendar_integration: Optional[GoogleCalendarIntegration] = None):
+    def __init__(self, calendar_integration: Optional[GoogleCalendarIntegration] = None,
+                 working_hours: Optional[Dict[int, List[Tuple[datetime.time, datetime.time, float]]]] = None,
+                 horizon_days: int = 7, store: Optional[ScheduleStore] = None,
+                 calendar_sync: Optional[CalendarSync] = None, calendar_ids: Sequence[str] = ('primary',),
+                 availability_provider: Optional[AvailabilityProvider] = None):
         self.calendar_integration = calendar_integration or GoogleCalendarIntegration()
+        self.calendar_sync = calendar_sync  # Local event mirror; busy times are read from it when set
+        self.availability_provider = availability_provider  # Other busy-time source, such as an ICS file
+        self.calendar_ids = list(calendar_ids)  # Calendars whose busy times block study time
+        self.store = store
+        self.working_hours = working_hours or DEFAULT_WORKING_HOURS
+        self.horizon_days = horizon_days
         self.algorithm = None
         self.scheduled_items: List[ScheduleItem] = []
+        self.recurring_items: List[RecurringItem] = []
         self.user_availability: List[UserAvailability] = []
+        self.availability_captured_at: Optional[datetime.datetime] = None  # When the availability was computed (UTC)
+        self._availability_refreshed = False  # Computed since the last load or save, so it needs storing
+        self.schedule_version: Optional[int] = None  # Stored version the items were loaded from
 
     def initialize_scheduler(self, learning_items: List[Dict[str, Any]]) -> bool:
-        """Initialize the scheduler with learning items and user availability."""
+        """
+        Initialize the scheduler with learning items and user availability.
+
+        Items with a 'recurrence' RRULE and a 'start_time' become recurring
+        sessions; the rest are scheduled as one-off items.
+        """
         try:
             # Convert dict items to ScheduleItem objects
             self.scheduled_items = []
+            self.recurring_items = []
+            self.schedule_version = None
             for item_data in learning_items:
-                item = ScheduleItem(
-                    id=item_data['id'],
-                    title=item_data['title'],
-                    duration_minutes=item_data.get('duration_minutes', 60),
-                    priority=item_data.get('priority', 5),
-                    dependencies=item_data.get('dependencies', []),
-                    completed=item_data.get('completed', False),
-                    progress_percentage=item_data.get('progress_percentage', 0.0)
-                )
-                self.scheduled_items.append(item)
+                if item_data.get('recurrence'):
+                    self.recurring_items.append(RecurringItem(
+                        id=item_data['id'],
+                        title=item_data['title'],
+                        duration_minutes=item_data.get('duration_minutes', 60),
+                        priority=item_data.get('priority', 5),
+                        rule=item_data['recurrence'],
+                        start_time=self._parse_utc_time(item_data['start_time']),
+                        exclusions=[self._parse_utc_time(value) for value in item_data.get('exclusions', [])]
+                    ))
+                    continue
+
+                self.scheduled_items.append(self._item_from_dict(item_data))
 
             # Load user availability from calendar
             self._load_user_availability()
 
             # Initialize the algorithm
-            self.algorithm = AdaptiveSchedulingAlgorithm(self.scheduled_items, self.user_availability)
+            self.algorithm = AdaptiveSchedulingAlgorithm(self.scheduled_items, self.user_availability,
+                                                         self.recurring_items)
 
             return True
         except Exception as e:
             print(f"Failed to initialize scheduler: {e}")
             return False
 
+    def load_schedule(self, user_id: str) -> bool:
+        """
+        Restore a saved schedule and its availability snapshot from the store.
+
+        A snapshot older than ``AVAILABILITY_TTL`` is recomputed from the
+        calendar; a fresh one is used from the current time on, so nothing
+        is placed in slots that have already passed. Recurring sessions are
+        not stored and have to be passed to ``initialize_scheduler`` again.
+        """
+        if not self.store:
+            return False
+
+        stored = self.store.load(user_id)
+        if stored is None:
+            return False
+
+        self.scheduled_items = stored['items']
+        now = datetime.datetime.now(datetime.timezone.utc)
+        captured_at = stored['availability_captured_at']
+        if captured_at is None or now - captured_at.replace(tzinfo=datetime.timezone.utc) > AVAILABILITY_TTL:
+            self._load_user_availability()
+        else:
+            self.user_availability = self._upcoming(stored['availability'], now)
+            self.availability_captured_at = captured_at.replace(tzinfo=datetime.timezone.utc)
+            self._availability_refreshed = False
+        self.recurring_items = []
+        self.schedule_version = stored['version']
+        self.algorithm = AdaptiveSchedulingAlgorithm(self.scheduled_items, self.user_availability)
+        return True
+
+    def add_items(self, learning_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add one-off learning items to the current schedule and place them.
+
+        Items already placed keep their slots where still valid, so only the
+        new items and any that had to move become dirty for the next save.
+        """
+        if not self.algorithm:
+            return []
+
+        added = [self._item_from_dict(item_data) for item_data in learning_items]
+        self.scheduled_items.extend(added)
+        self.algorithm.generate_schedule()
+        return [self._item_to_dict(item) for item in added]
+
+    def save_schedule(self, user_id: str) -> Optional[int]:
+        """
+        Save the items changed since the last load or save.
+
+        Raises:
+            ValueError: If the stored schedule changed since it was loaded
+        """
+        if not self.store or not self.algorithm:
+            return None
+
+        # The stored snapshot (and its capture time) only changes when availability was recomputed
+        self.schedule_version = self.store.save(
+            user_id, self.scheduled_items,
+            self.user_availability if self._availability_refreshed else None,
+            expected_version=self.schedule_version,
+            availability_captured_at=self.availability_captured_at
+        )
+        self._availability_refreshed = False
+        return self.schedule_version
+
+    @staticmethod
+    def _upcoming(availability: List[UserAvailability], now: datetime.datetime) -> List[UserAvailability]:
+        """Trim availability to the part after ``now``."""
+        upcoming = []
+        for slot in availability:
+            current = now if slot.end_time.tzinfo else now.replace(tzinfo=None)
+            if slot.end_time > current:
+                upcoming.append(UserAvailability(max(slot.start_time, current), slot.end_time, slot.confidence))
+        return upcoming
+
     def _load_user_availability(self) -> None:
-        """Load user availability from calendar integration."""
+        """Load user availability from the availability provider, the calendar mirror or the calendar integration."""
         self.user_availability = []
 
-        if not self.calendar_integration.authenticate():
+        # Plan from now to the end of the horizon
+        now = datetime.datetime.now(datetime.timezone.utc)
+        horizon_end = now + datetime.timedelta(days=self.horizon_days)
+        self.availability_captured_at = now
+        self._availability_refreshed = True
+
+        if self.availability_provider is not None:
+            try:
+                busy_times = self.availability_provider.busy_periods(now, horizon_end)
+            except (OSError, ValueError) as e:
+                print(f"Availability provider failed, using default availability: {e}")
+                self._set_default_availability()
+                return
+        elif self.calendar_sync is not None:
+            # An empty mirror looks like a free calendar, so only read one that was synced recently
+            if not self._sync_stale_calendars(now):
+                self._set_default_availability()
+                return
+            busy_times = self.calendar_sync.busy_periods(now, horizon_end, self.calendar_ids)
+        elif self.calendar_integration.authenticate():
+            # Get busy times from calendar
+            busy_times = self.calendar_integration.get_free_busy(
+                time_min=now,
+                time_max=horizon_end,
+                calendar_ids=self.calendar_ids
+            )
+        else:
             # Fallback to default availability if calendar auth fails
             self._set_default_availability()
             return
 
-        # Get current week
-        now = datetime.datetime.now(datetime.timezone.utc)
-        week_start = now - datetime.timedelta(days=now.weekday())
-        week_end = week_start + datetime.timedelta(days=7)
-
-        # Get busy times from calendar
-        busy_times = self.calendar_integration.get_free_busy(
-            time_min=week_start,
-            time_max=week_end
-        )
-
         # Convert busy times to availability (inverse)
-        self._calculate_availability_from_busy_times(busy_times, week_start, week_end)
+        self._calculate_availability_from_busy_times(busy_times, now, horizon_end)
+
+    def _sync_stale_calendars(self, now: datetime.datetime) -> bool:
+        """Sync mirrored calendars that were never or not recently synced; False if one can't be."""
+        synced_at = self.calendar_sync.synced_at(self.calendar_ids)
+        for calendar_id in self.calendar_ids:
+            last_sync = synced_at.get(calendar_id)
+            if last_sync is not None and now - last_sync.replace(tzinfo=datetime.timezone.utc) <= CALENDAR_SYNC_MAX_AGE:
+                continue
+
+            try:
+                result = self.calendar_sync.sync(calendar_id)
+            except Exception as e:
+                print(f"Calendar {calendar_id} could not be synced, using default availability: {e}")
+                return False
+            if result['mode'] == 'unavailable':
+                print(f"Calendar {calendar_id} is unavailable and its mirror is stale, using default availability")
+                return False
+        return True
 
     def _set_default_availability(self) -> None:
         """Set default availability when calendar is not available."""
         now = datetime.datetime.now(datetime.timezone.utc)
 
         # Default: weekdays 9 AM - 5 PM, weekends 10 AM - 4 PM
-        for day_offset in range(7):
+        for day_offset in range(self.horizon_days):
             day = now + datetime.timedelta(days=day_offset)
             is_weekend = day.weekday() >= 5
 
@@ -87,41 +240,39 @@ class AdaptiveScheduler:
     def _calculate_availability_from_busy_times(self, busy_times: List[Dict[str, Any]],
                                                week_start: datetime.datetime,
                                                week_end: datetime.datetime) -> None:
-        """Calculate available time slots from busy periods."""
-        # This is a simplified implementation
-        # In a real system, you'd need more sophisticated logic to handle multiple busy periods
-
-        # For now, assume standard working hours minus busy times
-        current_time = week_start
-        while current_time < week_end:
-            day_end = current_time.replace(hour=17, minute=0, second=0, microsecond=0)
-            if current_time.weekday() >= 5:  # Weekend
-                day_end = current_time.replace(hour=16, minute=0, second=0, microsecond=0)
-
-            # Check if this time slot conflicts with busy times
-            is_available = True
-            slot_end = min(current_time + datetime.timedelta(hours=1), day_end)
-
-            for busy_period in busy_times:
-                busy_start = datetime.datetime.fromisoformat(busy_period['start'][:-1])  # Remove 'Z'
-                busy_end = datetime.datetime.fromisoformat(busy_period['end'][:-1])
-
-                if (current_time < busy_end and slot_end > busy_start):
-                    is_available = False
-                    break
-
-            if is_available and slot_end > current_time:
-                confidence = 0.8 if current_time.weekday() < 5 else 0.6  # Lower confidence on weekends
-                self.user_availability.append(UserAvailability(current_time, slot_end, confidence))
+        """
+        Calculate available time slots from busy periods.
+
+        Busy periods are parsed once, merged and subtracted from the
+        working-hours windows in a single pass, giving maximal free intervals
+        for any horizon in O(days + busy log busy).
+        """
+        busy = []
+        for busy_period in busy_times:
+            try:
+                busy.append((self._parse_calendar_time(busy_period['start'], week_start.tzinfo),
+                             self._parse_calendar_time(busy_period['end'], week_start.tzinfo)))
+            except (KeyError, ValueError) as e:
+                print(f"Skipping malformed busy period {busy_period}: {e}")
+
+        windows = expand_working_hours(self.working_hours, week_start, week_end)
+        for start_time, end_time, confidence in subtract_intervals(windows, busy):
+            self.user_availability.append(UserAvailability(start_time, end_time, confidence))
 
-            current_time = slot_end
+    @staticmethod
+    def _parse_calendar_time(value: str, default_tz: Optional[datetime.tzinfo]) -> datetime.datetime:
+        """Parse an RFC 3339 timestamp from the Calendar API."""
+        parsed = datetime.datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+        if parsed.tzinfo is None and default_tz is not None:
+            parsed = parsed.replace(tzinfo=default_tz)
+        return parsed
 
-    def generate_schedule(self) -> List[Dict[str, Any]]:
+    def generate_schedule(self, mode: str = "heuristic", time_limit_seconds: float = 10.0) -> List[Dict[str, Any]]:
         """Generate an optimized schedule using adaptive algorithms."""
         if not self.algorithm:
             return []
 
-        scheduled_items = self.algorithm.generate_schedule()
+        scheduled_items = self.algorithm.generate_schedule(mode, time_limit_seconds)
 
         # Convert back to dict format for API response
         return [self._item_to_dict(item) for item in scheduled_items]
@@ -134,6 +285,28 @@ class AdaptiveScheduler:
         updated_items = self.algorithm.reschedule_based_on_progress(item_id, new_progress)
         return [self._item_to_dict(item) for item in updated_items]
 
+    def reschedule_item(self, item_id: str, duration_minutes: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Repair the schedule after one item's duration changed and return only the moved items."""
+        if not self.algorithm:
+            return []
+
+        changes = self.algorithm.reschedule_item(item_id, duration_minutes)
+        return [self._change_to_dict(change) for change in changes]
+
+    def get_last_changes(self) -> List[Dict[str, Any]]:
+        """Items moved by the last progress update, for pushing to the calendar."""
+        if not self.algorithm:
+            return []
+
+        return [self._change_to_dict(change) for change in self.algorithm.last_changes]
+
+    def simulate(self, scenarios: List[Dict[str, Any]], mode: str = "heuristic") -> List[Dict[str, Any]]:
+        """Compare what-if scenarios on clones of the schedule, leaving it untouched."""
+        if not self.algorithm:
+            return []
+
+        return [self._change_to_dict(result) for result in simulate_scenarios(self.algorithm, scenarios, mode)]
+
     def update_availability(self, new_availability_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Update user availability and reschedule affected items."""
         if not self.algorithm:
@@ -165,7 +338,7 @@ class AdaptiveScheduler:
 
     def create_calendar_event(self, item_id: str) -> bool:
         """Create a calendar event for a scheduled learning item."""
-        item = next((i for i in self.scheduled_items if i.id == item_id), None)
+        item = self.algorithm.get_item(item_id) if self.algorithm else None
         if not item or not item.start_time or not item.end_time:
             return False
 
@@ -176,6 +349,51 @@ class AdaptiveScheduler:
             end_time=item.end_time
         ))
 
+    def create_calendar_events(self, item_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Create calendar events for many scheduled items with batched API calls.
+
+        Args:
+            item_ids: Items to push; defaults to every scheduled, incomplete item
+
+        Returns:
+            Per item: 'item_id', 'status' ('ok', 'failed' or 'unscheduled'),
+            and 'event_id' or 'error'
+        """
+        if not self.algorithm:
+            return []
+
+        if item_ids is None:
+            item_ids = [item.id for item in self.scheduled_items if item.start_time and not item.completed]
+
+        results = []
+        items = []
+        for item_id in item_ids:
+            item = self.algorithm.get_item(item_id)
+            if item and item.start_time and item.end_time:
+                items.append(item)
+            else:
+                results.append({'item_id': item_id, 'status': 'unscheduled'})
+
+        operations = [{
+            'op': 'create',
+            'event': self.calendar_integration.event_body(
+                summary=f"Learning: {item.title}",
+                description=f"Scheduled learning session for {item.title}",
+                start_time=item.start_time,
+                end_time=item.end_time
+            )
+        } for item in items]
+
+        for item, outcome in zip(items, self.calendar_integration.batch_events(operations)):
+            result = {'item_id': item.id, 'status': outcome['status']}
+            if outcome['status'] == 'ok':
+                result['event_id'] = outcome['event'].get('id')
+            else:
+                result['error'] = outcome['error']
+            results.append(result)
+        return results
+
     def get_schedule_summary(self) -> Dict[str, Any]:
         """Get a summary of the current schedule."""
         if not self.algorithm:
@@ -203,6 +421,19 @@ class AdaptiveScheduler:
             'conflicts': conflicts
         }
 
+    def _item_from_dict(self, item_data: Dict[str, Any]) -> ScheduleItem:
+        """Convert an item dictionary to a ScheduleItem."""
+        return ScheduleItem(
+            id=item_data['id'],
+            title=item_data['title'],
+            duration_minutes=item_data.get('duration_minutes', 60),
+            priority=item_data.get('priority', 5),
+            dependencies=item_data.get('dependencies', []),
+            completed=item_data.get('completed', False),
+            progress_percentage=item_data.get('progress_percentage', 0.0),
+            deadline=self._parse_utc_time(item_data.get('deadline'))
+        )
+
     def _item_to_dict(self, item: ScheduleItem) -> Dict[str, Any]:
         """Convert ScheduleItem to dictionary."""
         return {
@@ -214,5 +445,29 @@ class AdaptiveScheduler:
             'end_time': item.end_time.isoformat() if item.end_time else None,
             'dependencies': item.dependencies,
             'completed': item.completed,
-            'progress_percentage': item.progress_percentage
-        }
\ No newline at end of file
+            'progress_percentage': item.progress_percentage,
+            'deadline': item.deadline.isoformat() if item.deadline else None
+        }
+
+    @staticmethod
+    def _change_to_dict(change: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a schedule change to JSON-friendly values."""
+        return {
+            key: value.isoformat() if isinstance(value, datetime.datetime) else value
+            for key, value in change.items()
+        }
+
+    @staticmethod
+    def _parse_time(value: Any) -> Optional[datetime.datetime]:
+        """Accept datetimes or ISO strings for optional item times."""
+        if value is None or isinstance(value, datetime.datetime):
+            return value
+        return datetime.datetime.fromisoformat(value)
+
+    @classmethod
+    def _parse_utc_time(cls, value: Any) -> Optional[datetime.datetime]:
+        """Parse a time that is compared with the availability, reading naive times as UTC."""
+        parsed = cls._parse_time(value)
+        if parsed is None or parsed.tzinfo:
+            return parsed
+        return parsed.replace(tzinfo=datetime.timezone.utc)
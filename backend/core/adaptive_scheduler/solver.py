@@ -0,0 +1,182 @@
+"""
+Optimal schedule placement with the OR-Tools CP-SAT solver.
+
+The model places each incomplete item at most once inside the availability
+segments, without overlaps, after its prerequisites, and maximizes
+
+    sum(priority * PLACEMENT_WEIGHT * placed)
+    + sum(confidence * CONFIDENCE_WEIGHT over the segment each item lands in)
+    - sum(priority * LATENESS_WEIGHT * minutes past the deadline)
+
+OR-Tools is optional; without it ``solve_schedule`` reports the solver as
+unavailable and callers keep the heuristic schedule.
+"""
+
+import bisect
+import datetime
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:
+    cp_model = None
+
+logger = logging.getLogger(__name__)
+
+PLACEMENT_WEIGHT = 100_000  # Per priority point for placing an item at all
+CONFIDENCE_WEIGHT = 100  # Per unit of slot confidence
+LATENESS_WEIGHT = 1  # Per priority point and minute past the deadline
+
+
+def solver_available() -> bool:
+    """Whether the optional OR-Tools dependency is installed."""
+    return cp_model is not None
+
+
+def solve_schedule(items: Sequence[Any], segments: Sequence[Tuple[datetime.datetime, datetime.datetime, float]],
+                   time_limit_seconds: float = 10.0, num_workers: int = 0) -> Dict[str, Any]:
+    """
+    Solve schedule placement as a CP-SAT model, warm-started from current placements.
+
+    Args:
+        items: Incomplete ScheduleItems to place; current start times are used as hints
+        segments: Disjoint (start, end, confidence) availability segments sorted by start
+        time_limit_seconds: Wall-clock limit for the search
+        num_workers: Search workers (0 lets the solver decide)
+
+    Returns:
+        Solve report with status, objective, best_bound, gap, wall_time and
+        placements (item index to (start, end), or None if left unscheduled)
+    """
+    report = {
+        'status': 'unavailable',
+        'objective': None,
+        'best_bound': None,
+        'gap': None,
+        'wall_time': 0.0,
+        'placements': {}
+    }
+    if cp_model is None:
+        logger.warning("OR-Tools is not installed; optimal scheduling is unavailable")
+        return report
+    if not segments:
+        report['status'] = 'infeasible'
+        report['placements'] = {index: None for index in range(len(items))}
+        return report
+
+    origin = segments[0][0]
+
+    def to_minutes(value: datetime.datetime, round_up: bool) -> int:
+        seconds = (value - origin).total_seconds()
+        minutes = int(seconds // 60)
+        return minutes + 1 if round_up and seconds > minutes * 60 else minutes
+
+    windows = [(to_minutes(start, True), to_minutes(end, False), confidence)
+               for start, end, confidence in segments]
+    window_starts = [start for start, _, _ in windows]
+    horizon = max(end for _, end, _ in windows)
+
+    position = {}
+    for index, item in enumerate(items):
+        position.setdefault(item.id, index)
+
+    model = cp_model.CpModel()
+    placed, starts, ends, intervals = [], [], [], []
+    objective = []
+
+    for index, item in enumerate(items):
+        duration = max(int(item.duration_minutes), 0)
+        is_placed = model.NewBoolVar(f"placed_{index}")
+        start = model.NewIntVar(0, horizon, f"start_{index}")
+        end = model.NewIntVar(0, horizon, f"end_{index}")
+        intervals.append(model.NewOptionalIntervalVar(start, duration, end, is_placed, f"interval_{index}"))
+        placed.append(is_placed)
+        starts.append(start)
+        ends.append(end)
+        objective.append(item.priority * PLACEMENT_WEIGHT * is_placed)
+
+        # Each placed item lands in exactly one segment long enough to hold it
+        choices = []
+        hint_window = _window_of(item, origin, window_starts, windows)
+        for window, (window_start, window_end, confidence) in enumerate(windows):
+            if window_end - window_start < duration:
+                continue
+            chosen = model.NewBoolVar(f"window_{index}_{window}")
+            model.Add(start >= window_start).OnlyEnforceIf(chosen)
+            model.Add(end <= window_end).OnlyEnforceIf(chosen)
+            model.AddHint(chosen, window == hint_window)
+            objective.append(int(round(confidence * CONFIDENCE_WEIGHT)) * chosen)
+            choices.append(chosen)
+        if choices:
+            model.Add(sum(choices) == is_placed)
+        else:
+            model.Add(is_placed == 0)
+
+        if item.deadline is not None:
+            due = to_minutes(item.deadline, False)
+            lateness = model.NewIntVar(0, max(horizon - due, 0), f"lateness_{index}")
+            model.Add(lateness >= end - due).OnlyEnforceIf(is_placed)
+            objective.append(-item.priority * LATENESS_WEIGHT * lateness)
+
+        if hint_window is not None:
+            model.AddHint(is_placed, True)
+            model.AddHint(start, to_minutes(item.start_time, False))
+        else:
+            model.AddHint(is_placed, False)
+
+    for index, item in enumerate(items):
+        for dep in set(item.dependencies):
+            dep_index = position.get(dep)
+            if dep_index is None or dep_index == index:
+                continue
+            # A dependent can only be placed after its prerequisite
+            model.AddImplication(placed[index], placed[dep_index])
+            model.Add(starts[index] >= ends[dep_index]).OnlyEnforceIf(placed[index])
+
+    model.AddNoOverlap(intervals)
+    model.Maximize(sum(objective))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit_seconds
+    if num_workers:
+        solver.parameters.num_workers = num_workers
+
+    started = time.perf_counter()
+    status = solver.Solve(model)
+    report['wall_time'] = time.perf_counter() - started
+    report['status'] = solver.StatusName(status).lower()
+
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return report
+
+    objective_value = solver.ObjectiveValue()
+    best_bound = solver.BestObjectiveBound()
+    report['objective'] = objective_value
+    report['best_bound'] = best_bound
+    report['gap'] = abs(best_bound - objective_value) / max(1.0, abs(objective_value))
+
+    placements: Dict[int, Optional[Tuple[datetime.datetime, datetime.datetime]]] = {}
+    for index, item in enumerate(items):
+        if solver.Value(placed[index]):
+            start_time = origin + datetime.timedelta(minutes=solver.Value(starts[index]))
+            placements[index] = (start_time, start_time + datetime.timedelta(minutes=item.duration_minutes))
+        else:
+            placements[index] = None
+    report['placements'] = placements
+
+    return report
+
+
+def _window_of(item: Any, origin: datetime.datetime, window_starts: List[int],
+               windows: List[Tuple[int, int, float]]) -> Optional[int]:
+    """Segment holding the item's current placement, used as a warm-start hint."""
+    if not item.start_time or not item.end_time:
+        return None
+    start = (item.start_time - origin).total_seconds() / 60
+    end = (item.end_time - origin).total_seconds() / 60
+    window = bisect.bisect_right(window_starts, start) - 1
+    if window < 0 or end > windows[window][1] or start != int(start):
+        return None
+    return window
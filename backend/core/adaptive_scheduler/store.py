@@ -0,0 +1,270 @@
+"""
+Database persistence for schedules.
+
+A user's schedule is a ``schedules`` header row (version and availability
+snapshot) plus one ``scheduled_items`` row per item. Loading is a single
+query over the (user_id, item_id) primary key, and saving upserts only the
+rows the column store marked dirty, in one bulk statement.
+"""
+
+import datetime
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+from sqlalchemy import and_, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ...models import Schedule, ScheduledItem, get_db_session, upsert_rows
+from .algorithms import ScheduleItem, UserAvailability
+from .columns import ScheduleTable
+
+_UTC = datetime.timezone.utc
+_ITEM_COLUMNS = ('title', 'duration_minutes', 'priority', 'start_time', 'end_time', 'dependencies',
+                 'completed', 'progress_percentage', 'deadline')
+
+
+def _to_utc_naive(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(_UTC).replace(tzinfo=None)
+
+
+def _from_utc_naive(value: Optional[datetime.datetime], aware: bool) -> Optional[datetime.datetime]:
+    if value is None or not aware:
+        return value
+    return value.replace(tzinfo=_UTC)
+
+
+class ScheduleStore:
+    """
+    Loads and saves users' schedules with optimistic versioning.
+
+    Each save bumps the schedule's version and stamps the rows it writes
+    with it, so ``load(user_id, since_version=v)`` returns just the items
+    changed after version ``v``.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = get_db_session):
+        self.session_factory = session_factory
+
+    @contextmanager
+    def _session(self) -> Iterator[Session]:
+        """Open a session for a single store operation."""
+        session = self.session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def load(self, user_id: str, since_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load a user's schedule.
+
+        The returned items are bound to a fresh column store with no dirty
+        rows, so saving them again only writes what changes afterwards.
+
+        Args:
+            user_id: Owner of the schedule
+            since_version: If given, only items written after this version are returned
+
+        Returns:
+            Dict with 'version', 'items' (ScheduleItems), 'availability'
+            (UserAvailability snapshot) and 'availability_captured_at', or
+            None if the user has no stored schedule
+        """
+        item_join = ScheduledItem.user_id == Schedule.user_id
+        if since_version is not None:
+            item_join = and_(item_join, ScheduledItem.version > since_version)
+        query = (
+            select(Schedule.version, Schedule.timezone_aware, Schedule.availability,
+                   Schedule.availability_captured_at, ScheduledItem.item_id,
+                   *(getattr(ScheduledItem, column) for column in _ITEM_COLUMNS))
+            .outerjoin(ScheduledItem, item_join)
+            .where(Schedule.user_id == user_id)
+            .order_by(ScheduledItem.item_id)
+        )
+
+        with self._session() as session:
+            rows = session.execute(query).all()
+        if not rows:
+            return None
+
+        header = rows[0]
+        aware = bool(header.timezone_aware)
+        items = [
+            ScheduleItem(
+                id=row.item_id,
+                title=row.title,
+                duration_minutes=row.duration_minutes,
+                priority=row.priority,
+                start_time=_from_utc_naive(row.start_time, aware),
+                end_time=_from_utc_naive(row.end_time, aware),
+                dependencies=row.dependencies or [],
+                completed=bool(row.completed),
+                progress_percentage=row.progress_percentage or 0.0,
+                deadline=_from_utc_naive(row.deadline, aware)
+            )
+            for row in rows if row.item_id is not None
+        ]
+        ScheduleTable.adopt(items, ScheduleTable(_UTC if aware else None)).clear_dirty()
+
+        availability = [
+            UserAvailability(datetime.datetime.fromisoformat(start), datetime.datetime.fromisoformat(end), confidence)
+            for start, end, confidence in header.availability or []
+        ]
+        return {
+            'version': header.version,
+            'items': items,
+            'availability': availability,
+            'availability_captured_at': header.availability_captured_at
+        }
+
+    def save(self, user_id: str, items: Sequence[ScheduleItem],
+             availability: Optional[Sequence[UserAvailability]] = None,
+             expected_version: Optional[int] = None,
+             availability_captured_at: Optional[datetime.datetime] = None) -> int:
+        """
+        Write the changed items of a schedule and bump its version.
+
+        Only rows appended or modified since they were last loaded or saved
+        are written, with one bulk upsert. Items are never deleted here.
+
+        Args:
+            user_id: Owner of the schedule
+            items: The user's schedule items
+            availability: Availability snapshot to store, or None to keep the stored one
+            expected_version: If given, the save fails unless the stored version still matches
+            availability_captured_at: When ``availability`` was computed (defaults to now);
+                ignored when no availability is given
+
+        Returns:
+            The new schedule version
+
+        Raises:
+            ValueError: If ``expected_version`` does not match the stored version
+        """
+        table = ScheduleTable.adopt(items)
+        dirty = table.dirty_rows()
+        now = datetime.datetime.utcnow()
+
+        with self._session() as session:
+            version = self._bump_version(session, user_id, expected_version)
+
+            header = {'updated_date': now}
+            if any(item.start_time or item.end_time or item.deadline for item in items):
+                header['timezone_aware'] = table.tz is not None
+            if availability is not None:
+                header['availability'] = [
+                    [slot.start_time.isoformat(), slot.end_time.isoformat(), slot.confidence]
+                    for slot in availability
+                ]
+                header['availability_captured_at'] = _to_utc_naive(availability_captured_at) or now
+            session.execute(update(Schedule).where(Schedule.user_id == user_id).values(**header))
+
+            if dirty:
+                upsert_rows(session, ScheduledItem, [self._item_row(user_id, table, row, version) for row in dirty],
+                            ('user_id', 'item_id'))
+
+        table.clear_dirty()
+        return version
+
+    def save_placements(self, placements: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Write batch scheduling results back to stored schedules in bulk.
+
+        Usable as ``BatchScheduler``'s writer: one UPDATE bumps every user's
+        version, one query reads their stored items and one upsert writes the
+        items whose start or end changed. Versions are not checked, so the
+        results replace placements saved while the batch ran.
+
+        Args:
+            placements: Entries with 'user_id' and 'placements' (item ID to (start, end))
+
+        Returns:
+            New schedule version per user
+
+        Raises:
+            ValueError: If a user has no stored schedule
+        """
+        by_user = {entry['user_id']: entry['placements'] for entry in placements}
+        if not by_user:
+            return {}
+
+        with self._session() as session:
+            versions = dict(session.execute(
+                update(Schedule).where(Schedule.user_id.in_(list(by_user)))
+                .values(version=Schedule.version + 1, updated_date=datetime.datetime.utcnow())
+                .returning(Schedule.user_id, Schedule.version)
+                .execution_options(synchronize_session=False)
+            ).all())
+            missing = set(by_user) - set(versions)
+            if missing:
+                raise ValueError(f"No stored schedule for {', '.join(sorted(map(str, missing)))}")
+
+            rows = []
+            stored = session.execute(
+                select(ScheduledItem.__table__).where(ScheduledItem.user_id.in_(list(by_user)))
+            ).mappings()
+            for row in stored:
+                placement = by_user[row['user_id']].get(row['item_id'])
+                if placement is None:
+                    continue
+                start, end = (_to_utc_naive(time) for time in placement)
+                if (start, end) != (row['start_time'], row['end_time']):
+                    rows.append(dict(row, start_time=start, end_time=end, version=versions[row['user_id']]))
+            upsert_rows(session, ScheduledItem, rows, ('user_id', 'item_id'))
+
+        return versions
+
+    @staticmethod
+    def _bump_version(session: Session, user_id: str, expected_version: Optional[int]) -> int:
+        """Increment the schedule's version, creating the header row on first save."""
+        current = session.execute(
+            select(Schedule.version).where(Schedule.user_id == user_id)
+        ).scalar_one_or_none()
+
+        if current is None:
+            if expected_version not in (None, 0):
+                raise ValueError(f"Schedule for {user_id} is at version 0, expected {expected_version}")
+            try:
+                session.execute(insert(Schedule).values(user_id=user_id, version=1))
+            except IntegrityError:
+                # Another writer's first save created the header row since we read it
+                session.rollback()
+                raise ValueError(f"Schedule for {user_id} was created concurrently, expected version 0")
+            return 1
+
+        condition = Schedule.user_id == user_id
+        if expected_version is not None:
+            condition = and_(condition, Schedule.version == expected_version)
+        result = session.execute(
+            update(Schedule).where(condition).values(version=Schedule.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise ValueError(f"Schedule for {user_id} is at version {current}, expected {expected_version}")
+        return current + 1
+
+    @staticmethod
+    def _item_row(user_id: str, table: ScheduleTable, row: int, version: int) -> Dict[str, Any]:
+        (item_id, title, duration, priority, start, end, dependencies,
+         completed, progress, deadline) = table.row_values(row)
+        return {
+            'user_id': user_id,
+            'item_id': item_id,
+            'title': title,
+            'duration_minutes': duration,
+            'priority': priority,
+            'start_time': _to_utc_naive(start),
+            'end_time': _to_utc_naive(end),
+            'dependencies': dependencies,
+            'completed': completed,
+            'progress_percentage': progress,
+            'deadline': _to_utc_naive(deadline),
+            'version': version
+        }
@@ -7,5 +7,7 @@ Handles personalized learning paths based on user skills and goals.
 from .path_generator import PathGenerator
 from .skill_analyzer import SkillAnalyzer
 from .goal_tracker import GoalTracker
+from .goal_notifier import GoalDeadlineNotifier
+from .learning_curve import LearningCurveFitter
 
-__all__ = ['PathGenerator', 'SkillAnalyzer', 'GoalTracker']
\ No newline at end of file
+__all__ = ['PathGenerator', 'SkillAnalyzer', 'GoalTracker', 'GoalDeadlineNotifier', 'LearningCurveFitter']
\ No newline at end of file
@@ -0,0 +1,94 @@
+from typing import Callable, Dict, List, Optional
+import threading
+from datetime import datetime
+import logging
+
+from .goal_tracker import GoalTracker
+
+logger = logging.getLogger(__name__)
+
+
+class GoalDeadlineNotifier:
+    """
+    Periodically pushes overdue and at-risk goal events.
+
+    Each check reads the currently overdue and behind-schedule goals from the
+    database and only reports the ones that weren't already notified, so
+    goals written by other workers are picked up. The notified goals are
+    stored alongside them, so a restart does not report them again, while a
+    goal that catches up and falls behind again is reported again. Run a single notifier per database
+    (the app starts one when ``GOAL_NOTIFICATIONS`` is enabled), otherwise
+    every instance sends the same events.
+    """
+
+    def __init__(self, goal_tracker: GoalTracker, callback: Callable[[Dict], None],
+                 interval_seconds: float = 60.0):
+        self.goal_tracker = goal_tracker
+        self.callback = callback
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._check_lock = threading.Lock()
+
+    def check(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Emit events for goals that became overdue or fell behind since they were last notified.
+
+        Args:
+            now: Time to check against (defaults to the current time)
+
+        Returns:
+            Events that were pushed to the callback
+        """
+        now = now or datetime.now()
+        events = []
+
+        with self._check_lock:
+            new_overdue = self.goal_tracker.claim_notifications(
+                "overdue", self.goal_tracker.get_overdue_goal_ids(now), now
+            )
+            new_at_risk = self.goal_tracker.claim_notifications(
+                "at_risk", self.goal_tracker.get_at_risk_goal_ids(now), now
+            )
+
+        for goal_id in new_overdue:
+            events.append({"type": "overdue", "goal_id": goal_id, "date": now.isoformat()})
+
+        for goal_id in new_at_risk:
+            try:
+                metrics = self.goal_tracker.calculate_goal_completion_rate(goal_id, now)
+            except ValueError:
+                continue  # Goal was deleted since the check
+            events.append({"type": "at_risk", "goal_id": goal_id, "date": now.isoformat(),
+                           "metrics": metrics})
+
+        for event in events:
+            try:
+                self.callback(event)
+            except Exception as e:
+                logger.error(f"Goal notification callback failed: {e}")
+
+        return events
+
+    def start(self) -> None:
+        """Start checking in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="goal-deadline-notifier", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Goal deadline check failed: {e}")
@@ -1,15 +1,74 @@
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import math
 import uuid
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+from ...models import (
+    Goal, GoalMilestone, GoalNote, GoalNotification, GoalProgressEvent, GoalProgressSnapshot,
+    get_db_session
+)
+
+# A snapshot is materialized every SNAPSHOT_INTERVAL progress events, so any
+# point-in-time read replays at most SNAPSHOT_INTERVAL - 1 events
+SNAPSHOT_INTERVAL = 20
+
+
+def at_risk_date(created_date: Optional[datetime], expected_completion_date: Optional[datetime],
+                 progress_percent: Optional[float]) -> Optional[datetime]:
+    """
+    First time a goal counts as behind schedule at its current progress.
+
+    Matches ``GoalTracker.calculate_goal_completion_rate``'s ``is_on_track``:
+    a goal is behind once the whole elapsed days exceed its progress share of
+    the timeframe.
+
+    Args:
+        created_date: When the goal was created
+        expected_completion_date: Goal deadline
+        progress_percent: Current progress
+
+    Returns:
+        The time the goal falls behind, or None if it never does
+    """
+    if created_date is None or expected_completion_date is None:
+        return None
+
+    progress = progress_percent or 0.0
+    total_days = (expected_completion_date - created_date).days
+    if total_days <= 0 or progress >= 100.0:
+        return None
+    return created_date + timedelta(days=math.floor(progress * total_days / 100.0) + 1)
 
 
 class GoalTracker:
     """
     Tracks learning goals and their progress.
+
+    Progress changes are appended to an event log with periodic snapshots,
+    while the goals row holds the current state. Goals, milestones and notes
+    live in the database so they survive restarts
+    and can be shared between workers. Deadline checks query the
+    (status, expected_completion_date) and (status, at_risk_at) indexes on
+    every call, so they see goals written by any worker.
     """
 
-    def __init__(self):
-        self.goals = {}  # In a real implementation, this would be a database
+    def __init__(self, session_factory: Callable[[], Session] = get_db_session):
+        self.session_factory = session_factory
+
+    @contextmanager
+    def _session(self) -> Iterator[Session]:
+        """Open a session for a single tracker operation."""
+        session = self.session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
 
     def create_goal(self, title: str, description: str, domain: str,
                    target_skills: List[str], timeframe_weeks: int,
@@ -28,27 +87,38 @@ class GoalTracker:
         Returns:
             Goal dictionary
         """
-        goal = {
-            "goal_id": str(uuid.uuid4()),
-            "title": title,
-            "description": description,
-            "domain": domain,
-            "target_skills": target_skills,
-            "timeframe_weeks": timeframe_weeks,
-            "priority": priority,
-            "status": "Active",
-            "progress_percent": 0.0,
-            "created_date": datetime.now().isoformat(),
-            "expected_completion_date": (datetime.now() + timedelta(weeks=timeframe_weeks)).isoformat(),
-            "milestones": self._generate_milestones(target_skills, timeframe_weeks),
-            "linked_projects": [],
-            "notes": []
-        }
-
-        self.goals[goal["goal_id"]] = goal
-        return goal
-
-    def _generate_milestones(self, target_skills: List[str], timeframe_weeks: int) -> List[Dict]:
+        now = datetime.now()
+        goal = Goal(
+            goal_id=str(uuid.uuid4()),
+            title=title,
+            description=description,
+            domain=domain,
+            target_skills=list(target_skills),
+            timeframe_weeks=timeframe_weeks,
+            priority=priority,
+            status="Active",
+            progress_percent=0.0,
+            progress_sequence=0,
+            created_date=now,
+            expected_completion_date=now + timedelta(weeks=timeframe_weeks),
+            linked_projects=[]
+        )
+        goal.at_risk_at = at_risk_date(goal.created_date, goal.expected_completion_date, 0.0)
+        goal.milestones = self._generate_milestones(target_skills, timeframe_weeks, now)
+        goal.notes = []
+
+        with self._session() as session:
+            session.add(goal)
+            session.flush()
+            # Every goal starts with a base snapshot for point-in-time reads
+            session.add(GoalProgressEvent(goal_id=goal.goal_id, sequence=0, recorded_at=now,
+                                          progress_percent=0.0, status="Active"))
+            session.add(GoalProgressSnapshot(goal_id=goal.goal_id, sequence=0, as_of=now,
+                                             progress_percent=0.0, status="Active"))
+            return self._goal_to_dict(goal)
+
+    def _generate_milestones(self, target_skills: List[str], timeframe_weeks: int,
+                             start: datetime) -> List[GoalMilestone]:
         """Generate milestones for the goal."""
         milestones = []
         skills_per_milestone = max(1, len(target_skills) // 3)  # Divide into 3 milestones
@@ -58,15 +128,14 @@ class GoalTracker:
             end_idx = min((i + 1) * skills_per_milestone, len(target_skills))
             milestone_skills = target_skills[start_idx:end_idx]
 
-            milestone = {
-                "milestone_id": str(uuid.uuid4()),
-                "title": f"Milestone {i+1}: Master {', '.join(milestone_skills)}",
-                "target_skills": milestone_skills,
-                "target_date": (datetime.now() + timedelta(weeks=(i+1) * timeframe_weeks // 3)).isoformat(),
-                "status": "Pending",
-                "progress_percent": 0.0,
-                "description": f"Develop proficiency in {', '.join(milestone_skills)}"
-            }
+            milestone = GoalMilestone(
+                milestone_id=str(uuid.uuid4()),
+                position=i,
+                title=f"Milestone {i+1}: Master {', '.join(milestone_skills)}",
+                target_skills=milestone_skills,
+                target_date=start + timedelta(weeks=(i+1) * timeframe_weeks // 3),
+                description=f"Develop proficiency in {', '.join(milestone_skills)}"
+            )
             milestones.append(milestone)
 
         return milestones
@@ -84,53 +153,263 @@ class GoalTracker:
         Returns:
             Updated goal
         """
-        if goal_id not in self.goals:
-            raise ValueError(f"Goal {goal_id} not found")
+        with self._session() as session:
+            if not self._update_progress(session, {goal_id: progress_percent}):
+                raise ValueError(f"Goal {goal_id} not found")
 
-        goal = self.goals[goal_id]
-        goal["progress_percent"] = min(progress_percent, 100.0)
+            if notes:
+                session.add(GoalNote(goal_id=goal_id, date=datetime.now(), note=notes))
 
-        if notes:
-            goal["notes"].append({
-                "date": datetime.now().isoformat(),
-                "note": notes
-            })
+            session.flush()
+            return self._goal_to_dict(self._load_goal(session, goal_id))
 
-        # Update milestone progress
-        self._update_milestone_progress(goal)
+    def bulk_update_progress(self, progress_by_goal: Dict[str, float]) -> int:
+        """
+        Update progress for many goals in a single statement.
 
-        # Check if goal is completed
-        if goal["progress_percent"] >= 100.0:
-            goal["status"] = "Completed"
+        Args:
+            progress_by_goal: Goal ID to new progress percentage
+
+        Returns:
+            Number of goals updated
+        """
+        if not progress_by_goal:
+            return 0
+
+        with self._session() as session:
+            return self._update_progress(session, progress_by_goal)
+
+    def _update_progress(self, session: Session, progress_by_goal: Dict[str, float]) -> int:
+        """
+        Set progress (capped at 100%), the at-risk time and complete finished
+        goals with one UPDATE, then append the matching progress events in one INSERT.
+        """
+        capped = {goal_id: min(progress, 100.0) for goal_id, progress in progress_by_goal.items()}
+        completed = [goal_id for goal_id, progress in capped.items() if progress >= 100.0]
+
+        dates = session.execute(
+            select(Goal.goal_id, Goal.created_date, Goal.expected_completion_date)
+            .where(Goal.goal_id.in_(list(capped)))
+        ).all()
+        at_risk = {goal_id: at_risk_date(created_date, expected_completion_date, capped[goal_id])
+                   for goal_id, created_date, expected_completion_date in dates}
+
+        status = Goal.status
+        if completed:
+            status = case((Goal.goal_id.in_(completed), "Completed"), else_=Goal.status)
+
+        updated = session.execute(
+            update(Goal)
+            .where(Goal.goal_id.in_(list(capped)))
+            .values(
+                progress_percent=case(capped, value=Goal.goal_id),
+                status=status,
+                at_risk_at=case(at_risk, value=Goal.goal_id) if at_risk else None,
+                progress_sequence=func.coalesce(Goal.progress_sequence, 0) + 1
+            )
+            .returning(Goal.goal_id, Goal.progress_sequence, Goal.status)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not updated:
+            return 0
+
+        recorded_at = datetime.now()
+        events = [
+            {"goal_id": goal_id, "sequence": sequence, "recorded_at": recorded_at,
+             "progress_percent": capped[goal_id], "status": goal_status}
+            for goal_id, sequence, goal_status in updated
+        ]
+        session.execute(insert(GoalProgressEvent), events)
+
+        snapshots = [
+            {"goal_id": e["goal_id"], "sequence": e["sequence"], "as_of": recorded_at,
+             "progress_percent": e["progress_percent"], "status": e["status"]}
+            for e in events if e["sequence"] % SNAPSHOT_INTERVAL == 0
+        ]
+        if snapshots:
+            session.execute(insert(GoalProgressSnapshot), snapshots)
+
+        return len(updated)
+
+    def get_goal_state_at(self, goal_id: str, at: datetime) -> Optional[Dict]:
+        """
+        Get a goal's progress as it was at a point in time.
 
-        return goal
+        Reads the nearest snapshot at or before ``at`` and replays the short
+        tail of events after it.
 
-    def _update_milestone_progress(self, goal: Dict):
-        """Update progress for goal milestones."""
-        total_milestones = len(goal["milestones"])
-        if total_milestones == 0:
-            return
+        Args:
+            goal_id: Goal ID
+            at: Point in time
 
-        # Simple progress distribution across milestones
-        base_progress = goal["progress_percent"] / total_milestones
+        Returns:
+            State dictionary, or None if the goal did not exist yet
+        """
+        with self._session() as session:
+            return self._state_at(session, goal_id, at)
+
+    def _state_at(self, session: Session, goal_id: str, at: datetime) -> Optional[Dict]:
+        snapshot = session.execute(
+            select(GoalProgressSnapshot)
+            .where(GoalProgressSnapshot.goal_id == goal_id, GoalProgressSnapshot.as_of <= at)
+            .order_by(GoalProgressSnapshot.as_of.desc(), GoalProgressSnapshot.sequence.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        if snapshot is None:
+            return None
+
+        state = {
+            "goal_id": goal_id,
+            "sequence": snapshot.sequence,
+            "as_of": snapshot.as_of,
+            "progress_percent": snapshot.progress_percent,
+            "status": snapshot.status
+        }
 
-        for i, milestone in enumerate(goal["milestones"]):
+        tail = session.execute(
+            select(GoalProgressEvent)
+            .where(
+                GoalProgressEvent.goal_id == goal_id,
+                GoalProgressEvent.sequence > snapshot.sequence,
+                GoalProgressEvent.sequence < snapshot.sequence + SNAPSHOT_INTERVAL,
+                GoalProgressEvent.recorded_at <= at
+            )
+            .order_by(GoalProgressEvent.sequence)
+        ).scalars()
+        for event in tail:
+            state.update(sequence=event.sequence, as_of=event.recorded_at,
+                         progress_percent=event.progress_percent, status=event.status)
+
+        return state
+
+    def get_progress_history(self, goal_id: str, start: datetime, end: datetime,
+                             step: timedelta = timedelta(days=1)) -> List[Dict]:
+        """
+        Get sampled progress between two dates for burndown charts.
+
+        Starts from the state at ``start`` and only reads the events recorded
+        inside the window, never the goal's whole history.
+
+        Args:
+            goal_id: Goal ID
+            start: First sample time
+            end: Last sample time
+            step: Sampling interval
+
+        Returns:
+            List of {"date", "progress_percent", "remaining_percent"} points
+        """
+        with self._session() as session:
+            state = self._state_at(session, goal_id, start)
+            events = session.execute(
+                select(GoalProgressEvent.recorded_at, GoalProgressEvent.progress_percent)
+                .where(
+                    GoalProgressEvent.goal_id == goal_id,
+                    GoalProgressEvent.recorded_at > start,
+                    GoalProgressEvent.recorded_at <= end
+                )
+                .order_by(GoalProgressEvent.recorded_at, GoalProgressEvent.sequence)
+            ).all()
+
+        progress = state["progress_percent"] if state else None
+        points = []
+        index = 0
+        sample_time = start
+        while sample_time <= end:
+            while index < len(events) and events[index][0] <= sample_time:
+                progress = events[index][1]
+                index += 1
+            if progress is not None:
+                points.append({
+                    "date": sample_time.isoformat(),
+                    "progress_percent": progress,
+                    "remaining_percent": 100.0 - progress
+                })
+            sample_time += step
+
+        return points
+
+    def _milestone_progress(self, goal: Goal) -> List[Dict]:
+        """Derive milestone progress from the goal's overall progress."""
+        milestones = []
+        total_milestones = len(goal.milestones)
+
+        for i, milestone in enumerate(goal.milestones):
+            # Simple progress distribution across milestones
+            base_progress = (goal.progress_percent or 0.0) / total_milestones
             # Later milestones get less progress until earlier ones are complete
-            milestone_progress = base_progress * (i + 1) / total_milestones
-            milestone["progress_percent"] = min(milestone_progress, 100.0)
+            milestone_progress = min(base_progress * (i + 1) / total_milestones, 100.0)
+
+            if milestone_progress >= 100.0:
+                status = "Completed"
+            elif milestone_progress > 0:
+                status = "In Progress"
+            else:
+                status = "Pending"
+
+            milestones.append({
+                "milestone_id": milestone.milestone_id,
+                "title": milestone.title,
+                "target_skills": milestone.target_skills or [],
+                "target_date": milestone.target_date.isoformat() if milestone.target_date else None,
+                "status": status,
+                "progress_percent": milestone_progress,
+                "description": milestone.description
+            })
+
+        return milestones
+
+    def _goal_to_dict(self, goal: Goal) -> Dict:
+        """Convert a Goal row to the goal dictionary returned by the tracker."""
+        return {
+            "goal_id": goal.goal_id,
+            "title": goal.title,
+            "description": goal.description,
+            "domain": goal.domain,
+            "target_skills": goal.target_skills or [],
+            "timeframe_weeks": goal.timeframe_weeks,
+            "priority": goal.priority,
+            "status": goal.status,
+            "progress_percent": goal.progress_percent,
+            "created_date": goal.created_date.isoformat() if goal.created_date else None,
+            "expected_completion_date": (
+                goal.expected_completion_date.isoformat() if goal.expected_completion_date else None
+            ),
+            "expected_completion_timestamp": (
+                goal.expected_completion_date.timestamp() if goal.expected_completion_date else None
+            ),
+            "milestones": self._milestone_progress(goal),
+            "linked_projects": goal.linked_projects or [],
+            "notes": [{"date": note.date.isoformat(), "note": note.note} for note in goal.notes]
+        }
+
+    def _goal_query(self):
+        """Goal query that batch-loads milestones and notes instead of one query per goal."""
+        return select(Goal).options(selectinload(Goal.milestones), selectinload(Goal.notes))
 
-            if milestone["progress_percent"] >= 100.0:
-                milestone["status"] = "Completed"
-            elif milestone["progress_percent"] > 0:
-                milestone["status"] = "In Progress"
+    def _load_goal(self, session: Session, goal_id: str) -> Optional[Goal]:
+        """Load a single goal with its milestones and notes."""
+        return session.execute(
+            self._goal_query().where(Goal.goal_id == goal_id).execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+
+    def _query_goals(self, *criteria) -> List[Dict]:
+        """Run an indexed goal query and convert the results."""
+        with self._session() as session:
+            goals = session.execute(
+                self._goal_query().where(*criteria).order_by(Goal.created_date)
+            ).scalars().all()
+            return [self._goal_to_dict(goal) for goal in goals]
 
     def get_active_goals(self) -> List[Dict]:
         """Get all active goals."""
-        return [goal for goal in self.goals.values() if goal["status"] == "Active"]
+        return self._query_goals(Goal.status == "Active")
 
     def get_goal_by_id(self, goal_id: str) -> Optional[Dict]:
         """Get a specific goal by ID."""
-        return self.goals.get(goal_id)
+        with self._session() as session:
+            goal = self._load_goal(session, goal_id)
+            return self._goal_to_dict(goal) if goal else None
 
     def link_project_to_goal(self, goal_id: str, project_id: str):
         """
@@ -140,62 +419,114 @@ class GoalTracker:
             goal_id: Goal ID
             project_id: Project ID
         """
-        if goal_id in self.goals:
-            if project_id not in self.goals[goal_id]["linked_projects"]:
-                self.goals[goal_id]["linked_projects"].append(project_id)
+        with self._session() as session:
+            goal = session.get(Goal, goal_id)
+            if goal and project_id not in (goal.linked_projects or []):
+                goal.linked_projects = (goal.linked_projects or []) + [project_id]
 
-    def calculate_goal_completion_rate(self, goal_id: str) -> Dict:
+    def calculate_goal_completion_rate(self, goal_id: str, now: Optional[datetime] = None) -> Dict:
         """
         Calculate detailed completion metrics for a goal.
 
         Args:
             goal_id: Goal ID
+            now: Time to evaluate at (defaults to the current time)
 
         Returns:
             Completion metrics
         """
-        goal = self.get_goal_by_id(goal_id)
-        if not goal:
-            raise ValueError(f"Goal {goal_id} not found")
-
-        # Calculate time-based progress
-        created_date = datetime.fromisoformat(goal["created_date"])
-        expected_completion = datetime.fromisoformat(goal["expected_completion_date"])
-        now = datetime.now()
-
-        total_timeframe = (expected_completion - created_date).days
-        elapsed_time = (now - created_date).days
-        time_progress = min(elapsed_time / total_timeframe, 1.0) * 100 if total_timeframe > 0 else 0
-
-        # Calculate milestone completion
-        milestones = goal["milestones"]
-        completed_milestones = sum(1 for m in milestones if m["status"] == "Completed")
-        milestone_completion = (completed_milestones / len(milestones)) * 100 if milestones else 100
+        with self._session() as session:
+            goal = self._load_goal(session, goal_id)
+            if not goal:
+                raise ValueError(f"Goal {goal_id} not found")
+
+            # Calculate time-based progress
+            created_date = goal.created_date
+            expected_completion = goal.expected_completion_date
+            now = now or datetime.now()
+
+            total_timeframe = (expected_completion - created_date).days
+            elapsed_time = (now - created_date).days
+            time_progress = min(elapsed_time / total_timeframe, 1.0) * 100 if total_timeframe > 0 else 0
+
+            # Calculate milestone completion
+            milestones = self._milestone_progress(goal)
+            completed_milestones = sum(1 for m in milestones if m["status"] == "Completed")
+            milestone_completion = (completed_milestones / len(milestones)) * 100 if milestones else 100
+
+            return {
+                "goal_id": goal_id,
+                "overall_progress": goal.progress_percent,
+                "time_progress": time_progress,
+                "milestone_completion": milestone_completion,
+                "is_on_track": goal.progress_percent >= time_progress,
+                "days_remaining": max(0, (expected_completion - now).days),
+                "completed_milestones": completed_milestones,
+                "total_milestones": len(milestones)
+            }
 
-        return {
-            "goal_id": goal_id,
-            "overall_progress": goal["progress_percent"],
-            "time_progress": time_progress,
-            "milestone_completion": milestone_completion,
-            "is_on_track": goal["progress_percent"] >= time_progress,
-            "days_remaining": max(0, (expected_completion - now).days),
-            "completed_milestones": completed_milestones,
-            "total_milestones": len(milestones)
-        }
+    def get_goals_by_domain(self, domain: str, status: Optional[str] = None) -> List[Dict]:
+        """Get goals filtered by domain (and optionally status)."""
+        if status is not None:
+            return self._query_goals(Goal.status == status, Goal.domain == domain)
+        return self._query_goals(Goal.domain == domain)
+
+    def get_overdue_goals(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Get active goals that are past their expected completion date."""
+        now = now or datetime.now()
+        return self._query_goals(Goal.status == "Active", Goal.expected_completion_date < now)
+
+    def get_overdue_goal_ids(self, now: Optional[datetime] = None) -> List[str]:
+        """IDs of overdue active goals, read from the (status, expected_completion_date) index alone."""
+        now = now or datetime.now()
+        with self._session() as session:
+            return list(session.execute(
+                select(Goal.goal_id).where(Goal.status == "Active", Goal.expected_completion_date < now)
+            ).scalars())
+
+    def get_at_risk_goal_ids(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        IDs of active goals that are behind schedule.
 
-    def get_goals_by_domain(self, domain: str) -> List[Dict]:
-        """Get goals filtered by domain."""
-        return [goal for goal in self.goals.values() if goal["domain"] == domain]
+        Reads the (status, at_risk_at) index, which progress updates keep in
+        step with ``calculate_goal_completion_rate``'s ``is_on_track``.
+        """
+        now = now or datetime.now()
+        with self._session() as session:
+            return list(session.execute(
+                select(Goal.goal_id).where(Goal.status == "Active", Goal.at_risk_at <= now)
+            ).scalars())
+
+    def claim_notifications(self, kind: str, goal_ids: Iterable[str],
+                            now: Optional[datetime] = None) -> List[str]:
+        """
+        Record which goals currently need a ``kind`` notification.
 
-    def get_overdue_goals(self) -> List[Dict]:
-        """Get goals that are past their expected completion date."""
-        now = datetime.now()
-        overdue = []
+        Goals no longer in ``goal_ids`` are forgotten, so they are reported
+        again if they come back.
 
-        for goal in self.goals.values():
-            if goal["status"] == "Active":
-                expected_date = datetime.fromisoformat(goal["expected_completion_date"])
-                if now > expected_date:
-                    overdue.append(goal)
+        Args:
+            kind: Notification kind ("overdue" or "at_risk")
+            goal_ids: Goals that currently qualify
+            now: Notification time (defaults to the current time)
 
-        return overdue
\ No newline at end of file
+        Returns:
+            IDs from ``goal_ids`` that had not been notified yet
+        """
+        goal_ids = set(goal_ids)
+        now = now or datetime.now()
+        with self._session() as session:
+            session.execute(delete(GoalNotification).where(
+                GoalNotification.kind == kind, GoalNotification.goal_id.not_in(goal_ids)
+            ))
+            notified = set(session.execute(
+                select(GoalNotification.goal_id)
+                .where(GoalNotification.kind == kind, GoalNotification.goal_id.in_(goal_ids))
+            ).scalars())
+
+            new = sorted(goal_ids - notified)
+            if new:
+                session.execute(insert(GoalNotification), [
+                    {"goal_id": goal_id, "kind": kind, "notified_at": now} for goal_id in new
+                ])
+            return new
@@ -0,0 +1,313 @@
+"""
+Learning-curve model fitted from session history.
+
+Progress is modelled the same way as ``SkillAnalyzer.calculate_skill_progression``:
+
+    improvement * (1 + level / 100) = learning_rate * hours / 10
+
+Each observation pairs the hours studied on a skill (from ``LearningSession``
+and ``SessionSkill``) with the score change between two quiz attempts on that
+skill. The fitter keeps per-domain sufficient statistics of a least-squares
+fit through the origin, so each run only reads sessions and attempts recorded
+since its watermark. The watermark is on insertion time (``created_date``)
+rather than on the session or attempt date, so back-dated and late rows are
+still picked up; rows recorded at the watermark's exact time are matched
+with ``>=`` and deduplicated by ID.
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ...models import (
+    LearningCurve, LearningCurveWatermark, LearningSession, QuizAttempt,
+    SessionSkill, Skill, SkillLearningState, get_db_session
+)
+from .skill_taxonomy import FALLBACK_RETRY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEARNING_RATE = 0.1  # 10% improvement per 10 hours for beginners
+MIN_SAMPLES = 3  # Observations required before a fitted rate replaces the default
+RATES_TTL_SECONDS = 300.0  # How long a worker serves loaded rates before re-reading fits made elsewhere
+
+
+class LearningCurveCache:
+    """
+    In-process cache of fitted learning rates per domain.
+
+    Loaded with a single query over the learning_curves table and updated in
+    place by the fitter, so progression estimates only hit the database once
+    per ``ttl_seconds``. The reload picks up rates fitted in other worker
+    processes. If the table can't be read, the rates loaded last (or none)
+    are served for ``FALLBACK_RETRY_SECONDS`` before trying again.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = get_db_session,
+                 ttl_seconds: float = RATES_TTL_SECONDS):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self._rates: Optional[Dict[str, float]] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_rate(self, domain: Optional[str]) -> Optional[float]:
+        """Fitted learning rate for a domain, or None if there is not enough history."""
+        if domain is None:
+            return None
+        rates = self._rates
+        if rates is None or time.monotonic() >= self._expires_at:
+            rates = self._load()
+        return rates.get(domain)
+
+    def update(self, rates: Dict[str, Optional[float]]) -> None:
+        """Publish newly fitted rates; None drops a domain back to the default curve."""
+        with self._lock:
+            merged = dict(self._rates or {})
+            for domain, rate in rates.items():
+                if rate is None:
+                    merged.pop(domain, None)
+                else:
+                    merged[domain] = rate
+            self._rates = merged
+
+    def invalidate(self) -> None:
+        """Drop cached rates so they are reloaded on next use."""
+        with self._lock:
+            self._rates = None
+
+    def _load(self) -> Dict[str, float]:
+        with self._lock:
+            if self._rates is not None and time.monotonic() < self._expires_at:
+                return self._rates
+            session = self.session_factory()
+            try:
+                rows = session.execute(
+                    select(LearningCurve.domain, LearningCurve.learning_rate)
+                    .where(LearningCurve.learning_rate.is_not(None))
+                ).all()
+                self._rates = {domain: rate for domain, rate in rows}
+                self._expires_at = time.monotonic() + self.ttl_seconds
+            except Exception as e:
+                logger.warning(f"Could not load learning curves, retrying in {FALLBACK_RETRY_SECONDS:g}s: {e}")
+                # Keep serving what we have rather than hitting a failing database on every estimate
+                if self._rates is None:
+                    self._rates = {}
+                self._expires_at = time.monotonic() + FALLBACK_RETRY_SECONDS
+            finally:
+                session.close()
+            return self._rates
+
+
+class LearningCurveFitter:
+    """
+    Incrementally fits per-domain learning rates from new sessions and quiz attempts.
+
+    Call ``update`` after recording sessions or attempts, or ``start`` it as a
+    periodic job (the app does when ``LEARNING_CURVE_FITTING`` is enabled).
+    Run a single fitter per database, otherwise observations are counted twice.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = get_db_session,
+                 cache: Optional["LearningCurveCache"] = None, interval_seconds: float = 3600.0):
+        self.session_factory = session_factory
+        self.cache = cache if cache is not None else learning_curve_cache
+        self.interval_seconds = interval_seconds
+        self._update_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def update(self) -> Dict[str, Optional[float]]:
+        """
+        Fold sessions and quiz attempts recorded since the watermark into the fit.
+
+        New rows are applied in session/attempt date order. A session dated
+        before the skill's last assessment counts toward the current window,
+        and an attempt dated before it is not used as an observation.
+
+        Returns:
+            Learning rates for the domains that received new observations
+            (None while a domain has too little history)
+        """
+        with self._update_lock:
+            return self._update()
+
+    def _update(self) -> Dict[str, Optional[float]]:
+        session = self.session_factory()
+        try:
+            watermark = session.get(LearningCurveWatermark, 1)
+            if watermark is None:
+                watermark = LearningCurveWatermark(watermark_id=1)
+                session.add(watermark)
+
+            sessions, watermark.session_created, watermark.session_ids = self._new_sessions(
+                session, watermark.session_created, watermark.session_ids)
+            attempts, watermark.attempt_created, watermark.attempt_ids = self._new_attempts(
+                session, watermark.attempt_created, watermark.attempt_ids)
+            events = heapq.merge(sessions, attempts, key=lambda event: event[0])
+
+            states: Dict[str, SkillLearningState] = {}
+            curves: Dict[str, LearningCurve] = {}
+            touched = set()
+
+            for event_date, kind, skill_id, domain, value in events:
+                state = states.get(skill_id)
+                if state is None:
+                    state = session.get(SkillLearningState, skill_id)
+                    if state is None:
+                        state = SkillLearningState(skill_id=skill_id, pending_hours=0.0)
+                        session.add(state)
+                    states[skill_id] = state
+
+                if kind == "session":
+                    state.pending_hours = (state.pending_hours or 0.0) + value
+                    continue
+
+                if state.last_attempt_date is not None and event_date < state.last_attempt_date:
+                    continue  # Back-dated attempt: the window it belonged to is already closed
+
+                # Quiz attempt: close the observation window for this skill
+                if state.last_score is not None and state.pending_hours and domain:
+                    curve = curves.get(domain)
+                    if curve is None:
+                        curve = session.get(LearningCurve, domain)
+                        if curve is None:
+                            curve = LearningCurve(domain=domain, sample_count=0, sum_xx=0.0, sum_xy=0.0)
+                            session.add(curve)
+                        curves[domain] = curve
+
+                    x = state.pending_hours / 10
+                    y = (value - state.last_score) * (1 + state.last_score / 100)
+                    curve.sample_count += 1
+                    curve.sum_xx += x * x
+                    curve.sum_xy += x * y
+                    touched.add(domain)
+
+                state.last_score = value
+                state.last_attempt_date = event_date
+                state.pending_hours = 0.0
+
+            fitted = {}
+            for domain in touched:
+                curve = curves[domain]
+                curve.learning_rate = self._fit(curve)
+                curve.updated_date = datetime.utcnow()
+                fitted[domain] = curve.learning_rate
+
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        if fitted:
+            self.cache.update(fitted)
+        return fitted
+
+    @staticmethod
+    def _fit(curve: LearningCurve) -> Optional[float]:
+        """Least-squares learning rate through the origin."""
+        if curve.sample_count < MIN_SAMPLES or curve.sum_xx <= 0:
+            return None
+        rate = curve.sum_xy / curve.sum_xx
+        # A non-positive rate would make milestone estimates meaningless
+        return rate if rate > 0 else None
+
+    @staticmethod
+    def _new_sessions(session: Session, since: Optional[datetime], seen: Optional[List[str]]):
+        """
+        Session hours recorded since the watermark.
+
+        Returns:
+            ([(date, "session", skill_id, domain, hours)] ordered by date,
+            new watermark time, IDs recorded at that time)
+        """
+        query = (
+            select(LearningSession.session_id, LearningSession.created_date, LearningSession.date,
+                   SessionSkill.skill_id, Skill.domain, LearningSession.duration_minutes)
+            .join(SessionSkill, SessionSkill.session_id == LearningSession.session_id)
+            .join(Skill, Skill.skill_id == SessionSkill.skill_id)
+            .where(LearningSession.created_date.is_not(None))
+        )
+        if since is not None:
+            query = query.where(LearningSession.created_date >= since)
+
+        rows = [(created, session_id, (date, "session", skill_id, domain, (minutes or 0) / 60))
+                for session_id, created, date, skill_id, domain, minutes in session.execute(query)]
+        return _advance(rows, since, seen)
+
+    @staticmethod
+    def _new_attempts(session: Session, since: Optional[datetime], seen: Optional[List[str]]):
+        """
+        Quiz scores recorded since the watermark.
+
+        Returns:
+            ([(date, "attempt", skill_id, domain, score)] ordered by date,
+            new watermark time, IDs recorded at that time)
+        """
+        query = (
+            select(QuizAttempt.quiz_id, QuizAttempt.created_date, QuizAttempt.date_attempted,
+                   QuizAttempt.skill_id, Skill.domain, QuizAttempt.score)
+            .join(Skill, Skill.skill_id == QuizAttempt.skill_id)
+            .where(QuizAttempt.created_date.is_not(None), QuizAttempt.date_attempted.is_not(None),
+                   QuizAttempt.score.is_not(None))
+        )
+        if since is not None:
+            query = query.where(QuizAttempt.created_date >= since)
+
+        rows = [(created, quiz_id, (date, "attempt", skill_id, domain, score))
+                for quiz_id, created, date, skill_id, domain, score in session.execute(query)]
+        return _advance(rows, since, seen)
+
+    def start(self) -> None:
+        """Run ``update`` now and then periodically in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="learning-curve-fitter", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        # Fit once at startup, then on every interval
+        while True:
+            try:
+                self.update()
+            except Exception as e:
+                logger.error(f"Learning curve update failed: {e}")
+            if self._stop_event.wait(self.interval_seconds):
+                break
+
+
+def _advance(rows: List[Tuple[datetime, str, Tuple]], since: Optional[datetime],
+             seen: Optional[List[str]]) -> Tuple[List[Tuple], Optional[datetime], Optional[List[str]]]:
+    """Drop rows already folded in at the watermark and move it to the newest row."""
+    seen_ids = set(seen or ()) if since is not None else set()
+    rows = [row for row in rows if not (row[0] == since and row[1] in seen_ids)]
+    if not rows:
+        return [], since, seen
+
+    newest = max(created for created, _, _ in rows)
+    ids = {row_id for created, row_id, _ in rows if created == newest}
+    if newest == since:
+        ids |= seen_ids
+    events = sorted((event for _, _, event in rows), key=lambda event: event[0])
+    return events, newest, sorted(ids)
+
+
+# Shared by every SkillAnalyzer that uses the default database
+learning_curve_cache = LearningCurveCache()
@@ -1,5 +1,9 @@
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 import math
+import numpy as np
+from sqlalchemy.orm import Session
+from .skill_taxonomy import SkillTaxonomy, SkillTaxonomyCache, skill_taxonomy_cache
+from .learning_curve import DEFAULT_LEARNING_RATE, LearningCurveCache, learning_curve_cache
 
 
 class SkillAnalyzer:
@@ -7,15 +11,25 @@ class SkillAnalyzer:
     Analyzes user skills and identifies gaps for learning path generation.
     """
 
-    def __init__(self):
-        # Define skill hierarchy and relationships
-        self.skill_hierarchy = {
-            "Computer Vision": ["Object Detection", "Image Processing", "3D Vision"],
-            "Robotics": ["Motion Planning", "Control Systems", "Sim2Real Transfer"],
-            "Reinforcement Learning": ["Policy Gradient", "Actor-Critic", "Multi-Agent Systems"],
-            "Control Systems": ["PID Control", "State Space", "Optimal Control"],
-            "Sim2Real Transfer": ["Domain Randomization", "Physics Simulation", "System Identification"]
-        }
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        # The skill hierarchy is loaded lazily from the skills table and shared
+        # across analyzers, so construction does no database work
+        if session_factory is None:
+            self.taxonomy_cache = skill_taxonomy_cache
+            self.learning_curves = learning_curve_cache
+        else:
+            self.taxonomy_cache = SkillTaxonomyCache(session_factory)
+            self.learning_curves = LearningCurveCache(session_factory)
+
+    @property
+    def taxonomy(self) -> SkillTaxonomy:
+        """Current skill taxonomy snapshot."""
+        return self.taxonomy_cache.get()
+
+    @property
+    def skill_hierarchy(self) -> Dict[str, List[str]]:
+        """Skill hierarchy mapping parent skills to their sub-skills."""
+        return self.taxonomy.hierarchy
 
     def analyze_skill_gaps(self, current_skills: Dict[str, float],
                           target_skills: Dict[str, float]) -> Dict:
@@ -57,6 +71,62 @@ class SkillAnalyzer:
             "recommendations": self._generate_recommendations(sorted_gaps[:3])  # Top 3 gaps
         }
 
+    def analyze_skill_gaps_batch(self, skills: Sequence[str], current_levels,
+                                 target_levels) -> Dict[str, np.ndarray]:
+        """
+        Analyze skill gaps for many users at once.
+
+        Vectorized equivalent of ``analyze_skill_gaps`` for a users x skills
+        matrix, used by bulk reports where the per-user dict walk dominates.
+
+        Args:
+            skills: Skill names, one per matrix column
+            current_levels: Current proficiency matrix (users x skills, 0-100)
+            target_levels: Target proficiency matrix (users x skills, 0-100);
+                NaN marks a skill that is not targeted for that user
+
+        Returns:
+            Dictionary of arrays: per-cell "gap_size", "priority" and "has_gap",
+            and per-user "average_gap", "total_gap_hours" and "gap_count"
+        """
+        current = np.asarray(current_levels, dtype=np.float64)
+        target = np.asarray(target_levels, dtype=np.float64)
+        if current.shape != target.shape or current.ndim != 2 or current.shape[1] != len(skills):
+            raise ValueError("current_levels and target_levels must be users x skills matrices")
+
+        # Work skill-major so every per-skill row is contiguous
+        current = np.ascontiguousarray(current.T)
+        # fmax drops NaN targets, so untargeted skills never count as gaps
+        gap_size = np.fmax(np.ascontiguousarray(target.T) - current, 0.0)
+        has_gap = gap_size > 0
+
+        # Same factors as _calculate_priority, with one dependency boost per skill
+        dependency_boost = np.array(
+            [len(self._get_dependent_skills(skill)) * 0.1 for skill in skills], dtype=np.float64
+        )
+        priority = gap_size / 100
+        priority *= np.where(current < 30, 1.5, 1.0)
+        priority += dependency_boost[:, np.newaxis]
+        np.minimum(priority, 1.0, out=priority)
+        priority *= has_gap
+
+        # Accumulate skill by skill so totals match the scalar path bit for bit
+        total_gap = np.zeros(current.shape[1], dtype=np.float64)
+        gap_count = np.zeros(current.shape[1], dtype=np.int64)
+        for gap_row, mask_row in zip(gap_size, has_gap):
+            total_gap += gap_row
+            gap_count += mask_row
+        average_gap = np.divide(total_gap, gap_count, out=np.zeros_like(total_gap), where=gap_count > 0)
+
+        return {
+            "gap_size": gap_size.T,
+            "priority": priority.T,
+            "has_gap": has_gap.T,
+            "average_gap": average_gap,
+            "gap_count": gap_count,
+            "total_gap_hours": (total_gap * 0.1).astype(np.int64)
+        }
+
     def _calculate_priority(self, skill: str, gap_size: float, current_skills: Dict[str, float]) -> float:
         """
         Calculate priority score for a skill gap.
@@ -81,11 +151,7 @@ class SkillAnalyzer:
 
     def _get_dependent_skills(self, skill: str) -> List[str]:
         """Get skills that depend on the given skill."""
-        dependents = []
-        for parent, children in self.skill_hierarchy.items():
-            if skill in children:
-                dependents.append(parent)
-        return dependents
+        return list(self.taxonomy.get_parents(skill))
 
     def _estimate_gap_hours(self, total_gap_percentage: float) -> int:
         """
@@ -151,9 +217,7 @@ class SkillAnalyzer:
         deps = []
 
         # Check if skill is a child in hierarchy
-        for parent, children in self.skill_hierarchy.items():
-            if skill in children:
-                deps.append(parent)
+        deps.extend(self.taxonomy.get_parents(skill))
 
         # Add domain-specific dependencies
         if skill == "Sim2Real Transfer":
@@ -164,26 +228,33 @@ class SkillAnalyzer:
         return deps
 
     def calculate_skill_progression(self, skill: str, current_level: float,
-                                  hours_invested: int) -> Dict:
+                                  hours_invested: int, domain: Optional[str] = None) -> Dict:
         """
         Calculate expected skill progression based on time invested.
 
+        Uses the learning rate fitted from the user's session history for the
+        skill's domain when one is available.
+
         Args:
             skill: Skill name
             current_level: Current proficiency (0-100)
             hours_invested: Hours spent learning
+            domain: Skill domain (looked up in the taxonomy if omitted)
 
         Returns:
             Progression estimate
         """
-        # Simplified learning curve model
-        # Assume logarithmic learning curve
-        base_learning_rate = 0.1  # 10% improvement per 10 hours for beginners
+        if domain is None:
+            domain = self.taxonomy.get_domain(skill)
+        fitted_rate = self.learning_curves.get_rate(domain)
+
+        # Fall back to the generic curve until enough history has been fitted
+        learning_rate = fitted_rate or DEFAULT_LEARNING_RATE
 
         # Adjust for current level (harder to improve at higher levels)
         difficulty_multiplier = 1 + (current_level / 100)
 
-        expected_improvement = (hours_invested / 10) * base_learning_rate / difficulty_multiplier
+        expected_improvement = (hours_invested / 10) * learning_rate / difficulty_multiplier
         expected_improvement = min(expected_improvement, 100 - current_level)
 
         new_level = current_level + expected_improvement
@@ -193,15 +264,22 @@ class SkillAnalyzer:
             "hours_invested": hours_invested,
             "expected_new_level": round(new_level, 1),
             "improvement": round(expected_improvement, 1),
-            "time_to_next_milestone": self._estimate_time_to_milestone(new_level)
+            "learning_rate": learning_rate,
+            "is_fitted": fitted_rate is not None,
+            "time_to_next_milestone": self._estimate_time_to_milestone(new_level, fitted_rate)
         }
 
-    def _estimate_time_to_milestone(self, current_level: float) -> int:
+    def _estimate_time_to_milestone(self, current_level: float,
+                                    learning_rate: Optional[float] = None) -> int:
         """Estimate hours to next 25% milestone."""
         next_milestone = math.ceil(current_level / 25) * 25
         if next_milestone > 100:
             return 0
 
         gap = next_milestone - current_level
+        if learning_rate:
+            # Invert the fitted curve at the current level
+            return int(gap * (1 + current_level / 100) * 10 / learning_rate)
+
         # Estimate 20 hours per 10% improvement
-        return int(gap * 2)
\ No newline at end of file
+        return int(gap * 2)
@@ -0,0 +1,224 @@
+"""
+Skill taxonomy loaded from the skills table.
+
+The hierarchy is read with a single recursive CTE over ``Skill.parent_skill_id``
+and cached in-process. A transaction that inserts, updates or deletes a
+``Skill`` also bumps the version row in ``skill_taxonomy_version``, and its
+commit bumps a module-level version stamp. Edits in this process invalidate
+the cached graph right away; other worker processes compare the stored
+version at most every ``VERSION_CHECK_SECONDS`` and reload when it moved.
+Flushed changes that are rolled back never invalidate it, and readers can't
+reload the graph before the change is visible.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+import logging
+
+from sqlalchemy import event, insert, literal, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, aliased
+
+from ...models import Skill, SkillTaxonomyVersion, get_db_session
+
+logger = logging.getLogger(__name__)
+
+# Used until the skills table has been populated
+DEFAULT_SKILL_HIERARCHY = {
+    "Computer Vision": ["Object Detection", "Image Processing", "3D Vision"],
+    "Robotics": ["Motion Planning", "Control Systems", "Sim2Real Transfer"],
+    "Reinforcement Learning": ["Policy Gradient", "Actor-Critic", "Multi-Agent Systems"],
+    "Control Systems": ["PID Control", "State Space", "Optimal Control"],
+    "Sim2Real Transfer": ["Domain Randomization", "Physics Simulation", "System Identification"]
+}
+
+# Seconds to serve the default taxonomy after the skills table couldn't be read
+FALLBACK_RETRY_SECONDS = 30.0
+# Seconds between checks of the stored version for edits made by other processes
+VERSION_CHECK_SECONDS = 5.0
+
+_version_lock = threading.Lock()
+_taxonomy_version = 0
+_SKILLS_CHANGED = "skill_taxonomy_changed"  # Session.info flag set at flush, read at commit
+
+
+def invalidate_skill_taxonomy() -> None:
+    """Bump the taxonomy version so cached graphs are reloaded on next use."""
+    global _taxonomy_version
+    with _version_lock:
+        _taxonomy_version += 1
+
+
+def get_taxonomy_version() -> int:
+    """Current taxonomy version stamp."""
+    return _taxonomy_version
+
+
+@event.listens_for(Session, "after_flush")
+def _on_skill_flush(session, flush_context) -> None:
+    if session.info.get(_SKILLS_CHANGED):
+        return  # The stored version was already bumped in this transaction
+    if any(isinstance(obj, Skill) for changed in (session.new, session.dirty, session.deleted)
+           for obj in changed):
+        session.info[_SKILLS_CHANGED] = True
+        # Bumped in the same transaction, so other processes see it exactly when the edit commits
+        connection = session.connection()
+        bumped = connection.execute(
+            update(SkillTaxonomyVersion).where(SkillTaxonomyVersion.version_id == 1)
+            .values(version=SkillTaxonomyVersion.version + 1)
+        )
+        if bumped.rowcount == 0:
+            connection.execute(insert(SkillTaxonomyVersion).values(version_id=1, version=1))
+
+
+@event.listens_for(Session, "after_commit")
+def _on_skill_commit(session) -> None:
+    if session.info.pop(_SKILLS_CHANGED, False):
+        invalidate_skill_taxonomy()
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_skill_rollback(session) -> None:
+    session.info.pop(_SKILLS_CHANGED, None)
+
+
+class SkillTaxonomy:
+    """Immutable snapshot of the skill graph."""
+
+    def __init__(self, hierarchy: Dict[str, List[str]], domains: Optional[Dict[str, str]] = None,
+                 version: int = 0):
+        self.hierarchy = hierarchy
+        self.domains = domains or {}
+        self.version = version
+
+        # Reverse index: child skill -> parent skills
+        self.parents: Dict[str, List[str]] = {}
+        for parent, children in hierarchy.items():
+            for child in children:
+                self.parents.setdefault(child, []).append(parent)
+
+    def get_parents(self, skill: str) -> List[str]:
+        """Get the parent skills of the given skill."""
+        return self.parents.get(skill, [])
+
+    def get_domain(self, skill: str) -> Optional[str]:
+        """Get the domain of the given skill, if known."""
+        return self.domains.get(skill)
+
+
+class SkillTaxonomyCache:
+    """
+    Version-stamped in-process cache of the skill taxonomy.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = get_db_session):
+        self.session_factory = session_factory
+        self._taxonomy: Optional[SkillTaxonomy] = None
+        self._stored_version: Optional[int] = None  # Database version the taxonomy was loaded at
+        self._check_at = 0.0  # When to compare it with the database again
+        self._retry_at: Optional[float] = None  # Set while serving the fallback taxonomy
+        self._lock = threading.Lock()
+
+    def get(self) -> SkillTaxonomy:
+        """Return the cached taxonomy, reloading it if skills changed since it was loaded."""
+        taxonomy = self._taxonomy
+        if self._is_current(taxonomy, _taxonomy_version):
+            return taxonomy
+
+        with self._lock:
+            taxonomy = self._taxonomy
+            version = _taxonomy_version
+            if not self._is_current(taxonomy, version) and not self._stored_version_unchanged(taxonomy, version):
+                taxonomy = self._load(version)
+                self._taxonomy = taxonomy
+            return taxonomy
+
+    def _is_current(self, taxonomy: Optional[SkillTaxonomy], version: int) -> bool:
+        if taxonomy is None or taxonomy.version != version:
+            return False
+        retry_at = self._retry_at
+        if retry_at is not None:
+            return time.monotonic() < retry_at
+        return time.monotonic() < self._check_at
+
+    def _stored_version_unchanged(self, taxonomy: Optional[SkillTaxonomy], version: int) -> bool:
+        """Compare the loaded taxonomy with the stored version, pushing the next check back if it still matches."""
+        if taxonomy is None or taxonomy.version != version or self._retry_at is not None:
+            return False
+
+        session = self.session_factory()
+        try:
+            stored = _stored_version(session)
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not read skill taxonomy version: {e}")
+            stored = self._stored_version  # Keep serving the loaded graph until the next check
+        finally:
+            session.close()
+
+        if stored != self._stored_version:
+            return False
+        self._check_at = time.monotonic() + VERSION_CHECK_SECONDS
+        return True
+
+    def _load(self, version: int) -> SkillTaxonomy:
+        """Load the skill graph with one recursive query."""
+        session = self.session_factory()
+        try:
+            stored = _stored_version(session)
+            rows = session.execute(_skill_tree_query()).all()
+        except SQLAlchemyError as e:
+            logger.warning(f"Falling back to default skill taxonomy for {FALLBACK_RETRY_SECONDS:g}s: {e}")
+            # Serve the fallback for a while rather than hitting a failing database on every lookup
+            self._retry_at = time.monotonic() + FALLBACK_RETRY_SECONDS
+            return SkillTaxonomy(DEFAULT_SKILL_HIERARCHY, version=version)
+        finally:
+            session.close()
+        self._retry_at = None
+        self._stored_version = stored
+        self._check_at = time.monotonic() + VERSION_CHECK_SECONDS
+
+        if not rows:
+            return SkillTaxonomy(DEFAULT_SKILL_HIERARCHY, version=version)
+
+        names = {}
+        domains = {}
+        hierarchy: Dict[str, List[str]] = {}
+        # Rows come back parents first, ordered by depth
+        for skill_id, name, domain, parent_id, _depth in rows:
+            names[skill_id] = name
+            if domain:
+                domains[name] = domain
+            if parent_id is not None:
+                hierarchy.setdefault(names[parent_id], []).append(name)
+
+        return SkillTaxonomy(hierarchy, domains, version)
+
+
+def _stored_version(session: Session) -> int:
+    """Taxonomy version committed to the database, 0 before the first skill edit."""
+    return session.execute(
+        select(SkillTaxonomyVersion.version).where(SkillTaxonomyVersion.version_id == 1)
+    ).scalar_one_or_none() or 0
+
+
+def _skill_tree_query():
+    """Recursive CTE walking the skills table from the root skills down."""
+    tree = select(
+        Skill.skill_id, Skill.name, Skill.domain, Skill.parent_skill_id,
+        literal(0).label("depth")
+    ).where(Skill.parent_skill_id.is_(None)).cte("skill_tree", recursive=True)
+
+    child = aliased(Skill)
+    tree = tree.union_all(
+        select(
+            child.skill_id, child.name, child.domain, child.parent_skill_id,
+            (tree.c.depth + 1).label("depth")
+        ).where(child.parent_skill_id == tree.c.skill_id)
+    )
+
+    return select(tree).order_by(tree.c.depth, tree.c.name)
+
+
+# Shared by every SkillAnalyzer that uses the default database
+skill_taxonomy_cache = SkillTaxonomyCache()
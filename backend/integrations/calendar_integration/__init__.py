@@ -2,9 +2,13 @@
 Calendar Integration Module
 
 This module provides integration with external calendar services,
-currently supporting Google Calendar OAuth2 authentication and event management.
+currently supporting Google Calendar OAuth2 authentication and event management,
+and offline availability from iCalendar exports.
 """
 
+from .availability import AvailabilityProvider
 from .google_calendar import GoogleCalendarIntegration
+from .ics import IcsAvailabilityProvider
+from .sync import CalendarSync
 
-__all__ = ['GoogleCalendarIntegration']
\ No newline at end of file
+__all__ = ['AvailabilityProvider', 'GoogleCalendarIntegration', 'IcsAvailabilityProvider', 'CalendarSync']
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Availability providers.
+
+The scheduler only needs the busy periods of a time range. A provider
+supplies them from some source (a calendar mirror, an exported calendar
+file) in the free/busy API's format, so sources can be swapped without
+touching the scheduler.
+"""
+
+import datetime
+from typing import Dict, List
+
+
+class AvailabilityProvider:
+    """Source of busy periods for the scheduler."""
+
+    def busy_periods(self, time_min: datetime.datetime, time_max: datetime.datetime) -> List[Dict[str, str]]:
+        """
+        Busy periods overlapping a range.
+
+        Args:
+            time_min: Start of the range
+            time_max: End of the range
+
+        Returns:
+            {'start', 'end'} RFC 3339 UTC strings sorted by start
+
+        Raises:
+            OSError: If the source can't be reached or read
+            ValueError: If the source can't be parsed
+        """
+        raise NotImplementedError
@@ -1,11 +1,127 @@
 import os
 import datetime
-from typing import List, Dict, Optional, Any
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Sequence, Tuple
+import httplib2
+from google.auth.exceptions import TransportError
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+
+_REFRESH_MARGIN = datetime.timedelta(minutes=5)  # Refresh access tokens this long before they expire
+# Network failures below HttpError: socket timeouts and resets, TLS errors, httplib2 and token refresh errors
+_TRANSPORT_ERRORS = (OSError, httplib2.HttpLib2Error, TransportError)
+
+# Shared by every instance in the process: credentials per (token file, scopes)
+# and the parsed discovery document. Service objects are not shared, because
+# their httplib2 connections are not thread-safe.
+_cache_lock = threading.Lock()  # Guards _token_locks only, so it is never held across I/O
+_token_locks: Dict[Tuple[str, Tuple[str, ...]], threading.Lock] = {}
+_credentials_cache: Dict[Tuple[str, Tuple[str, ...]], Credentials] = {}
+_discovery_document: Optional[Dict[str, Any]] = None
+# Merged busy periods per (token file, calendars, horizon length):
+# (fetched at, time_min, time_max, [(start, end)]) in UTC
+_free_busy_cache: Dict[Tuple[str, Tuple[str, ...], datetime.timedelta],
+                       Tuple[float, datetime.datetime, datetime.datetime,
+                             List[Tuple[datetime.datetime, datetime.datetime]]]] = {}
+
+
+def _rfc3339(value: datetime.datetime) -> str:
+    """Format a time for the Calendar API in UTC, reading naive times as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + 'Z'
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    """An aware UTC time, reading naive times as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def _merge_busy(periods: List[Tuple[datetime.datetime, datetime.datetime]]
+                ) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+    """Sort busy periods and coalesce the ones that overlap or touch."""
+    merged = []
+    for start, end in sorted(periods):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _token_lock(key: Tuple[str, Tuple[str, ...]]) -> threading.Lock:
+    """The lock serializing loads and refreshes of one token file."""
+    with _cache_lock:
+        return _token_locks.setdefault(key, threading.Lock())
+
+
+def _needs_refresh(creds: Optional[Credentials]) -> bool:
+    if creds is None or not creds.valid:
+        return True
+    return creds.expiry is not None and creds.expiry - datetime.datetime.utcnow() < _REFRESH_MARGIN
+
+
+def _cached_credentials(token_path: str, scopes: Sequence[str]) -> Credentials:
+    """
+    Credentials for a token file, read once per process and refreshed ahead of expiry.
+
+    Valid cached credentials are returned without locking. Otherwise the
+    token file's own lock is held while it is loaded and refreshed, so
+    concurrent callers wait for one refresh instead of each starting their
+    own, and callers using other token files aren't blocked by it. This
+    never prompts: without a usable token it raises, and ``authorize()``
+    has to be run first.
+
+    Raises:
+        FileNotFoundError: If there is no token file yet
+        PermissionError: If the token expired and has no refresh token
+    """
+    key = (os.path.abspath(token_path), tuple(scopes))
+    creds = _credentials_cache.get(key)
+    if not _needs_refresh(creds):
+        return creds
+
+    with _token_lock(key):
+        # Another caller may have refreshed it while this one waited
+        creds = _credentials_cache.get(key)
+        if creds is None:
+            if not os.path.exists(token_path):
+                raise FileNotFoundError(f"No authorized token at {token_path}; run authorize() first")
+            creds = Credentials.from_authorized_user_file(token_path, scopes)
+
+        if _needs_refresh(creds):
+            if not creds.refresh_token:
+                raise PermissionError(f"Token at {token_path} expired and can't be refreshed; run authorize() again")
+            creds.refresh(Request())
+            with open(token_path, 'w') as token:
+                token.write(creds.to_json())
+
+        _credentials_cache[key] = creds
+        return creds
+
+
+def _build_service(creds: Credentials):
+    """Calendar API client, built from the discovery document parsed once per process."""
+    global _discovery_document
+    if _discovery_document is None:
+        static_doc = get_static_doc('calendar', 'v3')
+        if static_doc is None:
+            return build('calendar', 'v3', credentials=creds)
+        _discovery_document = json.loads(static_doc)
+    return build_from_document(_discovery_document, credentials=creds)
 
 
 class GoogleCalendarIntegration:
@@ -13,6 +129,9 @@ class GoogleCalendarIntegration:
 
     SCOPES = ['https://www.googleapis.com/auth/calendar.readonly',
               'https://www.googleapis.com/auth/calendar.events']
+    BATCH_SIZE = 50  # Calendar API limit on requests per batch
+    FREE_BUSY_MAX_CALENDARS = 50  # Calendar API limit on calendars per free/busy query
+    FREE_BUSY_TTL_SECONDS = 60.0
 
     def __init__(self, credentials_path: str = 'credentials.json', token_path: str = 'token.json'):
         self.credentials_path = credentials_path
@@ -21,52 +140,112 @@ class GoogleCalendarIntegration:
         self.creds = None
 
     def authenticate(self) -> bool:
-        """Authenticate with Google Calendar API using OAuth2."""
-        try:
-            self.creds = None
-            if os.path.exists(self.token_path):
-                self.creds = Credentials.from_authorized_user_file(self.token_path, self.SCOPES)
-
-            if not self.creds or not self.creds.valid:
-                if self.creds and self.creds.expired and self.creds.refresh_token:
-                    self.creds.refresh(Request())
-                else:
-                    if not os.path.exists(self.credentials_path):
-                        raise FileNotFoundError(f"Credentials file not found: {self.credentials_path}")
+        """
+        Authenticate with Google Calendar API using OAuth2.
 
-                    flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.SCOPES)
-                    self.creds = flow.run_local_server(port=0)
-
-                with open(self.token_path, 'w') as token:
-                    token.write(self.creds.to_json())
-
-            self.service = build('calendar', 'v3', credentials=self.creds)
+        Credentials come from a process-wide cache and are refreshed shortly
+        before they expire, so calling this again is cheap: the service is
+        only rebuilt when the credentials object changes. Without an
+        authorized token this fails rather than opening a browser; see
+        ``authorize``.
+        """
+        try:
+            creds = _cached_credentials(self.token_path, self.SCOPES)
+            if self.service is None or creds is not self.creds:
+                self.service = _build_service(creds)
+            self.creds = creds
             return True
         except Exception as e:
             print(f"Authentication failed: {e}")
             return False
 
+    def authorize(self) -> None:
+        """
+        Run the interactive OAuth2 consent flow and store the token.
+
+        This opens a browser and waits for the user, so it belongs in a
+        one-off setup step, never on a request path.
+
+        Raises:
+            FileNotFoundError: If the client credentials file is missing
+        """
+        if not os.path.exists(self.credentials_path):
+            raise FileNotFoundError(f"Credentials file not found: {self.credentials_path}")
+
+        flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.SCOPES)
+        creds = flow.run_local_server(port=0)
+        key = (os.path.abspath(self.token_path), tuple(self.SCOPES))
+        with _token_lock(key):
+            with open(self.token_path, 'w') as token:
+                token.write(creds.to_json())
+            _credentials_cache[key] = creds
+
     def get_events(self, calendar_id: str = 'primary', time_min: Optional[datetime.datetime] = None,
                    time_max: Optional[datetime.datetime] = None, max_results: int = 250) -> List[Dict]:
-        """Retrieve events from the specified calendar within the given time range."""
+        """Retrieve events from the specified calendar within the given time range, following every page."""
         if not self.service:
             if not self.authenticate():
                 return []
 
+        events = []
+        page_token = None
         try:
-            events_result = self.service.events().list(
-                calendarId=calendar_id,
-                timeMin=time_min.isoformat() + 'Z' if time_min else None,
-                timeMax=time_max.isoformat() + 'Z' if time_max else None,
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-
-            return events_result.get('items', [])
+            while True:
+                events_result = self.service.events().list(
+                    calendarId=calendar_id,
+                    timeMin=_rfc3339(time_min) if time_min else None,
+                    timeMax=_rfc3339(time_max) if time_max else None,
+                    maxResults=max_results,
+                    singleEvents=True,
+                    orderBy='startTime',
+                    pageToken=page_token
+                ).execute()
+
+                events.extend(events_result.get('items', []))
+                page_token = events_result.get('nextPageToken')
+                if not page_token:
+                    return events
         except HttpError as e:
             print(f"Error retrieving events: {e}")
-            return []
+            return events
+
+    def list_event_changes(self, calendar_id: str = 'primary', sync_token: Optional[str] = None,
+                           time_min: Optional[datetime.datetime] = None,
+                           page_size: int = 2500) -> Tuple[List[Dict], Optional[str], Optional[str]]:
+        """
+        List all events, or only those changed since a sync token, across every page.
+
+        Args:
+            calendar_id: Calendar to list
+            sync_token: ``nextSyncToken`` from a previous listing; None lists everything
+            time_min: Lower bound for a full listing (not allowed with a sync token)
+            page_size: Events requested per page
+
+        Returns:
+            (events, next sync token, the calendar's time zone); incremental
+            listings include deleted events with status 'cancelled'. The
+            token is None if the calendar could not be reached.
+
+        Raises:
+            HttpError: On API errors, including 410 Gone when the sync token has expired
+        """
+        if not self.service:
+            if not self.authenticate():
+                return [], None, None
+
+        params = {'calendarId': calendar_id, 'maxResults': page_size, 'singleEvents': True}
+        if sync_token:
+            params['syncToken'] = sync_token
+        elif time_min:
+            params['timeMin'] = _rfc3339(time_min)
+
+        events = []
+        while True:
+            events_result = self.service.events().list(**params).execute()
+            events.extend(events_result.get('items', []))
+            params['pageToken'] = events_result.get('nextPageToken')
+            if not params['pageToken']:
+                return events, events_result.get('nextSyncToken'), events_result.get('timeZone')
 
     def create_event(self, calendar_id: str = 'primary', summary: str = '', description: str = '',
                      start_time: Optional[datetime.datetime] = None, end_time: Optional[datetime.datetime] = None,
@@ -76,10 +255,23 @@ class GoogleCalendarIntegration:
             if not self.authenticate():
                 return None
 
+        event = self.event_body(summary, description, start_time, end_time, timezone)
+
+        try:
+            created_event = self.service.events().insert(calendarId=calendar_id, body=event).execute()
+            return created_event
+        except HttpError as e:
+            print(f"Error creating event: {e}")
+            return None
+
+    @staticmethod
+    def event_body(summary: str = '', description: str = '', start_time: Optional[datetime.datetime] = None,
+                   end_time: Optional[datetime.datetime] = None, timezone: str = 'UTC') -> Dict[str, Any]:
+        """Build an event resource for insert requests."""
         if not start_time or not end_time:
             raise ValueError("Start time and end time are required")
 
-        event = {
+        return {
             'summary': summary,
             'description': description,
             'start': {
@@ -92,16 +284,132 @@ class GoogleCalendarIntegration:
             },
         }
 
+    def batch_events(self, operations: List[Dict[str, Any]], calendar_id: str = 'primary',
+                     max_retries: int = 3, backoff_seconds: float = 1.0) -> List[Dict[str, Any]]:
+        """
+        Create, update and delete many events through the batch endpoint.
+
+        Operations are sent BATCH_SIZE to a request. Operations that fail
+        with a rate limit, a server error or a transport error are retried
+        in later batches with exponential backoff; other errors are final.
+
+        Such a failure doesn't prove the write was not applied, so every
+        create carries a client-supplied event ID (generated unless the
+        event already has one) and a retried create that gets 409 Conflict
+        counts as done rather than being inserted twice.
+
+        Args:
+            operations: Dicts with 'op' ('create', 'update' or 'delete'),
+                'event' (event resource for create, changed fields for update),
+                'event_id' (for update and delete) and optionally 'etag',
+                sent as If-Match so the write only applies to that version
+            calendar_id: Calendar to write to
+            max_retries: Retries per operation after the first attempt
+            backoff_seconds: Delay before the first retry round, doubled each round
+
+        Returns:
+            One result per operation, in input order, with 'op', 'status'
+            ('ok' or 'failed'), 'attempts' and either 'event' (the API
+            response; None for deletes, the event as sent for a create
+            that an earlier attempt already applied) or 'error' and
+            'http_status'
+        """
+        if not self.service:
+            if not self.authenticate():
+                return [{'op': operation.get('op'), 'status': 'failed', 'attempts': 0,
+                         'error': "Calendar unavailable"} for operation in operations]
+
+        operations = [
+            dict(operation, event=dict(operation['event'], id=uuid.uuid4().hex))
+            if operation.get('op') == 'create' and not operation['event'].get('id') else operation
+            for operation in operations
+        ]
+        requests = [self._batch_request(operation, calendar_id) for operation in operations]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+        pending = list(range(len(operations)))
+        attempt = 0
+        while pending:
+            attempt += 1
+            retry = []
+            for start in range(0, len(pending), self.BATCH_SIZE):
+                chunk = pending[start:start + self.BATCH_SIZE]
+                responses = self._execute_batch(requests, chunk)
+
+                for index in chunk:
+                    response, error = responses[index]
+                    if (attempt > 1 and operations[index]['op'] == 'create' and isinstance(error, HttpError)
+                            and error.resp.status == 409):
+                        # The event ID already exists, so an earlier attempt went through
+                        response, error = operations[index]['event'], None
+                    if error is not None and attempt <= max_retries and self._is_retryable(error):
+                        retry.append(index)
+                        continue
+                    result = {'op': operations[index]['op'], 'attempts': attempt}
+                    if error is None:
+                        result.update(status='ok', event=response)
+                    else:
+                        result.update(status='failed', error=str(error),
+                                      http_status=error.resp.status if isinstance(error, HttpError) else None)
+                    results[index] = result
+
+            pending = retry
+            if pending:
+                time.sleep(backoff_seconds * 2 ** (attempt - 1))
+
+        return results
+
+    def _batch_request(self, operation: Dict[str, Any], calendar_id: str) -> Any:
+        """The API request for one batch operation."""
+        op = operation.get('op')
+        if op not in ('create', 'update', 'delete'):
+            raise ValueError(f"Unknown batch operation: {op}")
+        if op != 'create' and not operation.get('event_id'):
+            raise ValueError(f"An event_id is required to {op} an event")
+
+        events = self.service.events()
+        if op == 'create':
+            request = events.insert(calendarId=calendar_id, body=operation['event'])
+        elif op == 'update':
+            request = events.patch(calendarId=calendar_id, eventId=operation['event_id'], body=operation['event'])
+        else:
+            request = events.delete(calendarId=calendar_id, eventId=operation['event_id'])
+        if operation.get('etag'):
+            request.headers['If-Match'] = operation['etag']
+        return request
+
+    def _execute_batch(self, requests: List[Any], indices: List[int]) -> Dict[int, Tuple[Any, Optional[Exception]]]:
+        """Send one batch and collect (response, error) per operation index."""
+        responses: Dict[int, Tuple[Any, Optional[Exception]]] = {}
+
+        def collect(request_id, response, exception):
+            responses[int(request_id)] = (response, exception)
+
+        batch = self.service.new_batch_http_request(callback=collect)
+        for index in indices:
+            batch.add(requests[index], request_id=str(index))
         try:
-            created_event = self.service.events().insert(calendarId=calendar_id, body=event).execute()
-            return created_event
-        except HttpError as e:
-            print(f"Error creating event: {e}")
-            return None
+            batch.execute()
+        except Exception as e:
+            # The whole batch failed, e.g. a dropped connection; every unanswered operation can be retried
+            print(f"Error executing calendar batch: {e}")
+            for index in indices:
+                responses.setdefault(index, (None, e))
+        return responses
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Rate limits, server errors and transport failures are worth retrying."""
+        if not isinstance(error, HttpError):
+            return True
+        status = error.resp.status
+        if status == 403:
+            reasons = {detail.get('reason') for detail in error.error_details or [] if isinstance(detail, dict)}
+            return bool(reasons & {'rateLimitExceeded', 'userRateLimitExceeded'})
+        return status == 429 or status >= 500
 
     def update_event(self, calendar_id: str = 'primary', event_id: str = '',
-                     updates: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        """Update an existing event in the specified calendar."""
+                     updates: Optional[Dict[str, Any]] = None, etag: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Update the given fields of an existing event with a single PATCH, optionally only if its ETag matches."""
         if not self.service:
             if not self.authenticate():
                 return None
@@ -110,14 +418,46 @@ class GoogleCalendarIntegration:
             return None
 
         try:
-            event = self.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
-            event.update(updates)
-            updated_event = self.service.events().update(calendarId=calendar_id, eventId=event_id, body=event).execute()
-            return updated_event
+            return self.patch_event(calendar_id, event_id, updates, etag)
         except HttpError as e:
             print(f"Error updating event: {e}")
             return None
 
+    def patch_event(self, calendar_id: str, event_id: str, changes: Dict[str, Any],
+                    etag: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Send only the changed fields of an event.
+
+        Args:
+            calendar_id: Calendar holding the event
+            event_id: Event to change
+            changes: Fields to set
+            etag: If given, sent as If-Match so the update only applies to that version
+
+        Returns:
+            The updated event
+
+        Raises:
+            HttpError: On API errors, including 412 Precondition Failed when the ETag is stale
+        """
+        request = self.service.events().patch(calendarId=calendar_id, eventId=event_id, body=changes)
+        if etag:
+            request.headers['If-Match'] = etag
+        return request.execute()
+
+    def get_event(self, calendar_id: str, event_id: str) -> Dict[str, Any]:
+        """
+        Fetch one event.
+
+        Raises:
+            HttpError: On API errors, including 404 or 410 for deleted events
+            ConnectionError: If the calendar can't be authenticated
+        """
+        if not self.service:
+            if not self.authenticate():
+                raise ConnectionError("Calendar unavailable")
+        return self.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+
     def delete_event(self, calendar_id: str = 'primary', event_id: str = '') -> bool:
         """Delete an event from the specified calendar."""
         if not self.service:
@@ -132,21 +472,107 @@ class GoogleCalendarIntegration:
             return False
 
     def get_free_busy(self, calendar_id: str = 'primary', time_min: Optional[datetime.datetime] = None,
-                      time_max: Optional[datetime.datetime] = None) -> List[Dict[str, Any]]:
-        """Get free/busy information for the specified calendar."""
+                      time_max: Optional[datetime.datetime] = None,
+                      calendar_ids: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get the busy periods of one or more calendars as one merged list.
+
+        Calendars are queried in chunks of FREE_BUSY_MAX_CALENDARS, with the
+        chunks sent concurrently. The busy periods of all calendars are
+        sorted and coalesced. When both bounds are given, the result is
+        cached for FREE_BUSY_TTL_SECONDS per set of calendars and horizon
+        length. The query reaches one TTL past ``time_max``, so a later call
+        for the same horizon within the TTL is served from the cache.
+
+        Args:
+            calendar_id: Calendar to query when ``calendar_ids`` is not given
+            time_min: Start of the range; naive times are read as UTC
+            time_max: End of the range; naive times are read as UTC
+            calendar_ids: Calendars to combine
+
+        Returns:
+            {'start', 'end'} RFC 3339 UTC strings sorted by start. Calendars
+            that could not be queried are left out.
+        """
         if not self.service:
             if not self.authenticate():
                 return []
 
+        ids = tuple(dict.fromkeys(calendar_ids or [calendar_id]))
+        time_min = _as_utc(time_min) if time_min else None
+        time_max = _as_utc(time_max) if time_max else None
+        query_max = time_max
+        key = None
+        if time_min and time_max:
+            key = (os.path.abspath(self.token_path), tuple(sorted(ids)), time_max - time_min)
+            with _cache_lock:
+                cached = _free_busy_cache.get(key)
+            if cached and time.monotonic() - cached[0] < self.FREE_BUSY_TTL_SECONDS \
+                    and cached[1] <= time_min and time_max <= cached[2]:
+                return self._busy_dicts(cached[3], time_min, time_max)
+            query_max = time_max + datetime.timedelta(seconds=self.FREE_BUSY_TTL_SECONDS)
+
+        fetched_at = time.monotonic()
+        requests = [
+            self.service.freebusy().query(body={
+                "timeMin": _rfc3339(time_min) if time_min else None,
+                "timeMax": _rfc3339(query_max) if query_max else None,
+                "items": [{"id": chunk_id} for chunk_id in ids[start:start + self.FREE_BUSY_MAX_CALENDARS]]
+            })
+            for start in range(0, len(ids), self.FREE_BUSY_MAX_CALENDARS)
+        ]
+        if len(requests) == 1:
+            chunks = [self._execute_free_busy(requests[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+                chunks = list(executor.map(lambda request: self._execute_free_busy(request, self._thread_http()),
+                                           requests))
+
+        busy = _merge_busy([period for periods, _ in chunks for period in periods])
+        if key is not None and all(complete for _, complete in chunks):
+            with _cache_lock:
+                _free_busy_cache[key] = (fetched_at, time_min, query_max, busy)
+        return self._busy_dicts(busy, time_min, time_max)
+
+    def _thread_http(self):
+        """A separate HTTP client for one worker thread, since httplib2 connections are not thread-safe."""
+        http = build_http()
+        return AuthorizedHttp(self.creds, http=http) if self.creds else http
+
+    @staticmethod
+    def _execute_free_busy(request: Any, http: Any = None
+                           ) -> Tuple[List[Tuple[datetime.datetime, datetime.datetime]], bool]:
+        """Busy periods of one free/busy query, and whether every calendar in it answered."""
         try:
-            body = {
-                "timeMin": time_min.isoformat() + 'Z' if time_min else None,
-                "timeMax": time_max.isoformat() + 'Z' if time_max else None,
-                "items": [{"id": calendar_id}]
-            }
-
-            freebusy_result = self.service.freebusy().query(body=body).execute()
-            return freebusy_result.get('calendars', {}).get(calendar_id, {}).get('busy', [])
-        except HttpError as e:
+            result = request.execute(http=http)
+        except (HttpError, *_TRANSPORT_ERRORS) as e:
+            # A failed chunk leaves out its calendars and keeps the result out of the cache
             print(f"Error retrieving free/busy info: {e}")
-            return []
\ No newline at end of file
+            return [], False
+
+        periods, complete = [], True
+        for calendar_id, calendar in result.get('calendars', {}).items():
+            if calendar.get('errors'):
+                print(f"Error retrieving free/busy info for {calendar_id}: {calendar['errors']}")
+                complete = False
+            for period in calendar.get('busy', []):
+                periods.append((_as_utc(datetime.datetime.fromisoformat(period['start'].replace('Z', '+00:00'))),
+                                _as_utc(datetime.datetime.fromisoformat(period['end'].replace('Z', '+00:00')))))
+        return periods, complete
+
+    @staticmethod
+    def _busy_dicts(busy: List[Tuple[datetime.datetime, datetime.datetime]],
+                    time_min: Optional[datetime.datetime],
+                    time_max: Optional[datetime.datetime]) -> List[Dict[str, str]]:
+        """Busy periods overlapping the range, formatted like the free/busy API."""
+        return [
+            {'start': _rfc3339(start), 'end': _rfc3339(end)}
+            for start, end in busy
+            if (time_max is None or start < time_max) and (time_min is None or end > time_min)
+        ]
+
+
+if __name__ == "__main__":
+    # One-off setup: python integrations/calendar_integration/google_calendar.py [credentials.json] [token.json]
+    import sys
+    GoogleCalendarIntegration(*sys.argv[1:3]).authorize()
@@ -0,0 +1,340 @@
+"""
+Offline availability from iCalendar (.ics) exports.
+
+For sites that can't reach Google, busy periods are read from a calendar
+export on disk. The file is parsed line by line, so it is never held in
+memory, and only the fields that affect availability are kept: two
+timestamps per one-off event and a compiled rule per recurring one.
+Recurrences are expanded lazily, only within the requested window.
+
+Parsed indexes are cached per file and default time zone. A file whose
+size and mtime are unchanged is not read again, and one that was only
+touched (same SHA-256) is not parsed again.
+"""
+
+import bisect
+import datetime
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rruleset, rrulestr
+
+from .availability import AvailabilityProvider
+from .google_calendar import _merge_busy, _rfc3339
+
+_UTC = datetime.timezone.utc
+_HASH_CHUNK = 1 << 20
+_DURATION = re.compile(r'^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+_UNTIL = re.compile(r'UNTIL=(\d{8}T\d{6})Z')
+
+_cache_lock = threading.Lock()
+_index_cache: Dict[Tuple[str, str], '_IcsIndex'] = {}  # (path, default time zone) to index
+
+
+def _split_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    """Split a content line into its upper-cased name, parameters and value."""
+    in_quotes = False
+    for position, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ':' and not in_quotes:
+            head, value = line[:position], line[position + 1:]
+            break
+    else:
+        return line.upper(), {}, ''
+
+    name, *params = head.split(';')
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition('=')
+        parameters[key.upper()] = param_value.strip('"')
+    return name.upper(), parameters, value
+
+
+def _parse_duration(value: str) -> Tuple[datetime.timedelta, datetime.timedelta]:
+    """
+    Parse an RFC 5545 DURATION such as PT1H30M or P1D.
+
+    Returns:
+        (nominal days and weeks, exact hours, minutes and seconds); per the
+        RFC, days keep the local time across DST changes and the rest is
+        elapsed time
+    """
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    nominal = datetime.timedelta(weeks=int(weeks or 0), days=int(days or 0))
+    exact = datetime.timedelta(hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return (-nominal, -exact) if sign == '-' else (nominal, exact)
+
+
+def _end_time(start: datetime.datetime, nominal: datetime.timedelta,
+              exact: datetime.timedelta) -> datetime.datetime:
+    """UTC end of an event: nominal days in the start's wall-clock time, then exact time elapsed."""
+    # Aware arithmetic within one zone is wall-clock, so only the days are added before converting
+    return (start + nominal).astimezone(_UTC) + exact
+
+
+class _Recurrence:
+    """A recurring event, expanded in its own wall-clock time so DST shifts keep the local time."""
+
+    def __init__(self, start: datetime.datetime, nominal: datetime.timedelta, exact: datetime.timedelta,
+                 rules: List[str], rdates: List[datetime.datetime]):
+        self.tz = start.tzinfo
+        self.nominal = nominal
+        self.exact = exact
+        # Longest an occurrence can last; a nominal day is 25 hours across a DST change
+        self.max_duration = nominal + exact + (datetime.timedelta(hours=1) if nominal else datetime.timedelta(0))
+        self.skipped: Set[datetime.datetime] = set()  # UTC starts removed by EXDATE or moved by RECURRENCE-ID
+        wall_start = start.replace(tzinfo=None)
+        self.rule = rruleset()
+        for rule in rules:
+            self.rule.rrule(rrulestr(self._wall_until(rule), dtstart=wall_start))
+        self.rule.rdate(wall_start)
+        for rdate in rdates:
+            self.rule.rdate(rdate.astimezone(self.tz).replace(tzinfo=None))
+
+    def _wall_until(self, rule: str) -> str:
+        """Rewrite a UTC UNTIL in the event's wall-clock time, as dateutil needs for a naive DTSTART."""
+        def to_wall(match):
+            until = datetime.datetime.strptime(match.group(1), '%Y%m%dT%H%M%S').replace(tzinfo=_UTC)
+            return 'UNTIL=' + until.astimezone(self.tz).strftime('%Y%m%dT%H%M%S')
+        return _UNTIL.sub(to_wall, rule)
+
+    def occurrences(self, time_min: datetime.datetime,
+                    time_max: datetime.datetime) -> Iterator[Tuple[datetime.datetime, datetime.datetime]]:
+        """UTC (start, end) of the occurrences overlapping the window."""
+        window_start = (time_min - self.max_duration).astimezone(self.tz).replace(tzinfo=None)
+        for wall_start in self.rule.xafter(window_start, inc=True):
+            local_start = wall_start.replace(tzinfo=self.tz)
+            start = local_start.astimezone(_UTC)
+            if start >= time_max:
+                return
+            if start in self.skipped:
+                continue
+            end = _end_time(local_start, self.nominal, self.exact)
+            if end > time_min:
+                yield start, end
+
+
+class _IcsIndex:
+    """Busy events of one file: sorted one-off intervals and recurring rules."""
+
+    def __init__(self, stat_key: Tuple[int, int], digest: str):
+        self.stat_key = stat_key
+        self.digest = digest
+        self.starts: List[int] = []  # Epoch seconds, sorted once parsing is done
+        self.ends: List[int] = []
+        self.max_duration = 0
+        self.recurrences: List[_Recurrence] = []
+
+    def add(self, start: datetime.datetime, end: datetime.datetime) -> None:
+        self.starts.append(int(start.timestamp()))
+        self.ends.append(int(end.timestamp()))
+        self.max_duration = max(self.max_duration, self.ends[-1] - self.starts[-1])
+
+    def finish(self) -> None:
+        order = sorted(range(len(self.starts)), key=self.starts.__getitem__)
+        self.starts = [self.starts[index] for index in order]
+        self.ends = [self.ends[index] for index in order]
+
+    def busy(self, time_min: datetime.datetime,
+             time_max: datetime.datetime) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        low, high = int(time_min.timestamp()), int(time_max.timestamp())
+        # Events starting more than the longest event before the window can't reach into it
+        first = bisect.bisect_left(self.starts, low - self.max_duration)
+        last = bisect.bisect_left(self.starts, high)
+        periods = [
+            (datetime.datetime.fromtimestamp(self.starts[index], _UTC),
+             datetime.datetime.fromtimestamp(self.ends[index], _UTC))
+            for index in range(first, last) if self.ends[index] > low
+        ]
+        for recurrence in self.recurrences:
+            periods.extend(recurrence.occurrences(time_min, time_max))
+        return periods
+
+
+class IcsAvailabilityProvider(AvailabilityProvider):
+    """
+    Busy periods from an iCalendar file, such as a Google or Outlook export.
+
+    Cancelled events and events marked TRANSP:TRANSPARENT (shown as free)
+    don't block time. Floating times, all-day dates and unknown TZIDs are
+    read in ``default_timezone``.
+    """
+
+    def __init__(self, path: str, default_timezone: str = 'UTC'):
+        """
+        Args:
+            path: The .ics file
+            default_timezone: IANA zone for times without a usable TZID
+        """
+        self.path = path
+        self.default_timezone = default_timezone
+        self.default_tz = ZoneInfo(default_timezone)
+
+    def busy_periods(self, time_min: datetime.datetime, time_max: datetime.datetime) -> List[Dict[str, str]]:
+        """
+        Busy periods overlapping a range, merged and sorted.
+
+        Naive bounds are read as UTC.
+
+        Raises:
+            OSError: If the file can't be read
+        """
+        time_min = time_min.astimezone(_UTC) if time_min.tzinfo else time_min.replace(tzinfo=_UTC)
+        time_max = time_max.astimezone(_UTC) if time_max.tzinfo else time_max.replace(tzinfo=_UTC)
+        busy = _merge_busy(self._index().busy(time_min, time_max))
+        return [{'start': _rfc3339(max(start, time_min)), 'end': _rfc3339(min(end, time_max))}
+                for start, end in busy]
+
+    def _index(self) -> _IcsIndex:
+        """The parsed index of the file, reusing the cached one while the file is unchanged."""
+        path = os.path.abspath(self.path)
+        # Floating times and dates are read in the default zone, so it is part of the key
+        cache_key = (path, self.default_timezone)
+        stat = os.stat(path)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        with _cache_lock:
+            cached = _index_cache.get(cache_key)
+        if cached is not None and cached.stat_key == stat_key:
+            return cached
+
+        digest = self._file_digest(path)
+        if cached is not None and cached.digest == digest:
+            cached.stat_key = stat_key
+            return cached
+
+        index = self._parse(path, stat_key, digest)
+        with _cache_lock:
+            _index_cache[cache_key] = index
+        return index
+
+    @staticmethod
+    def _file_digest(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as ics_file:
+            for chunk in iter(lambda: ics_file.read(_HASH_CHUNK), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _parse(self, path: str, stat_key: Tuple[int, int], digest: str) -> _IcsIndex:
+        """Build the index in one streaming pass over the file."""
+        index = _IcsIndex(stat_key, digest)
+        recurrences: Dict[str, List[_Recurrence]] = {}
+        moved: Dict[str, List[datetime.datetime]] = {}  # UID to the original starts of edited occurrences
+
+        event: Optional[Dict[str, Any]] = None
+        depth = 0  # Components nested in the event, such as VALARM
+        for line in self._unfolded_lines(path):
+            name, params, value = _split_line(line)
+            if name == 'BEGIN':
+                if value.upper() == 'VEVENT' and event is None:
+                    event = {'rrule': [], 'rdate': [], 'exdate': []}
+                elif event is not None:
+                    depth += 1
+            elif name == 'END' and event is not None:
+                if depth:
+                    depth -= 1
+                elif value.upper() == 'VEVENT':
+                    self._add_event(index, event, recurrences, moved)
+                    event = None
+            elif event is not None and not depth:
+                self._read_property(event, name, params, value)
+
+        for uid, starts in moved.items():
+            for recurrence in recurrences.get(uid, []):
+                recurrence.skipped.update(starts)
+        index.recurrences = [recurrence for group in recurrences.values() for recurrence in group]
+        index.finish()
+        return index
+
+    @staticmethod
+    def _unfolded_lines(path: str) -> Iterator[str]:
+        """Content lines with RFC 5545 folding undone, read lazily."""
+        pending = None
+        with open(path, encoding='utf-8', errors='replace', newline='') as ics_file:
+            for raw in ics_file:
+                line = raw.rstrip('\r\n')
+                if line[:1] in (' ', '\t') and pending is not None:
+                    pending += line[1:]
+                    continue
+                if pending:
+                    yield pending
+                pending = line
+        if pending:
+            yield pending
+
+    def _read_property(self, event: Dict[str, Any], name: str, params: Dict[str, str], value: str) -> None:
+        try:
+            if name in ('DTSTART', 'DTEND', 'RECURRENCE-ID'):
+                event[name] = self._parse_time(value, params)
+            elif name in ('RDATE', 'EXDATE'):
+                if params.get('VALUE', '').upper() != 'PERIOD':
+                    event[name.lower()].extend(self._parse_time(part, params)[0] for part in value.split(','))
+            elif name == 'RRULE':
+                event['rrule'].append(value)
+            elif name in ('DURATION', 'UID', 'STATUS', 'TRANSP'):
+                event[name] = value.strip()
+        except ValueError as e:
+            print(f"Skipping malformed {name} in {self.path}: {e}")
+
+    def _parse_time(self, value: str, params: Dict[str, str]) -> Tuple[datetime.datetime, bool]:
+        """Aware time of a DATE or DATE-TIME value, and whether it is a date."""
+        value = value.strip()
+        if params.get('VALUE', '').upper() == 'DATE' or len(value) == 8:
+            return datetime.datetime.strptime(value, '%Y%m%d').replace(tzinfo=self.default_tz), True
+        if value.endswith('Z'):
+            return datetime.datetime.strptime(value[:-1], '%Y%m%dT%H%M%S').replace(tzinfo=_UTC), False
+        return datetime.datetime.strptime(value, '%Y%m%dT%H%M%S').replace(tzinfo=self._zone(params.get('TZID'))), False
+
+    def _zone(self, tzid: Optional[str]) -> datetime.tzinfo:
+        if not tzid:
+            return self.default_tz
+        try:
+            return ZoneInfo(tzid)
+        except (ZoneInfoNotFoundError, ValueError):
+            # Exports from Outlook use Windows zone names
+            return self.default_tz
+
+    def _add_event(self, index: _IcsIndex, event: Dict[str, Any], recurrences: Dict[str, List[_Recurrence]],
+                   moved: Dict[str, List[datetime.datetime]]) -> None:
+        uid = event.get('UID', '')
+        if 'RECURRENCE-ID' in event:
+            # An edited occurrence replaces the one the rule would generate
+            moved.setdefault(uid, []).append(event['RECURRENCE-ID'][0].astimezone(_UTC))
+        if 'DTSTART' not in event or event.get('STATUS', '').upper() == 'CANCELLED' \
+                or event.get('TRANSP', '').upper() == 'TRANSPARENT':
+            return
+
+        start, all_day = event['DTSTART']
+        nominal = exact = datetime.timedelta(0)
+        try:
+            if 'DTEND' in event:
+                # Elapsed time between the two, whatever their zones
+                exact = event['DTEND'][0].astimezone(_UTC) - start.astimezone(_UTC)
+            elif 'DURATION' in event:
+                nominal, exact = _parse_duration(event['DURATION'])
+            elif all_day:
+                nominal = datetime.timedelta(days=1)
+        except ValueError as e:
+            print(f"Skipping event {uid} in {self.path}: {e}")
+            return
+        if _end_time(start, nominal, exact) <= start:
+            return
+
+        if not event['rrule'] and not event['rdate']:
+            index.add(start, _end_time(start, nominal, exact))
+            return
+        try:
+            recurrence = _Recurrence(start, nominal, exact, event['rrule'], event['rdate'])
+        except (ValueError, TypeError) as e:
+            print(f"Skipping recurring event {uid} in {self.path}: {e}")
+            return
+        recurrence.skipped.update(exdate.astimezone(_UTC) for exdate in event['exdate'])
+        recurrences.setdefault(uid, []).append(recurrence)
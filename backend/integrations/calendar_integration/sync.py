@@ -0,0 +1,320 @@
+"""
+Incremental Google Calendar sync into a local mirror.
+
+Events are mirrored into the ``calendar_events`` table so availability can
+be computed from the database without calling the API. The first sync of a
+calendar pages through every event and stores the ``nextSyncToken``; later
+syncs send the token and apply only the changes. If Google answers 410 Gone
+the token has expired, and the calendar's mirror is rebuilt with a full sync.
+Times are stored as naive UTC; all-day events span midnight to midnight in
+the calendar's time zone.
+"""
+
+import datetime
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from googleapiclient.errors import HttpError
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ...models import CalendarEvent, CalendarSyncState, get_db_session, upsert_rows
+from .availability import AvailabilityProvider
+from .google_calendar import GoogleCalendarIntegration
+
+_UTC = datetime.timezone.utc
+_ID_CHUNK = 500  # Event IDs per IN clause, well under SQLite's bound parameter limit
+
+
+def _parse_event_time(value: Dict[str, str], time_zone: Optional[str] = None) -> Tuple[datetime.datetime, bool]:
+    """
+    Naive UTC start or end of an event, and whether it is an all-day date.
+
+    All-day dates are midnight in the event's or else the calendar's time
+    zone, or UTC if neither is known.
+    """
+    if 'dateTime' in value:
+        parsed = datetime.datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(_UTC).replace(tzinfo=None)
+        return parsed, False
+
+    midnight = datetime.datetime.combine(datetime.date.fromisoformat(value['date']), datetime.time())
+    zone_name = value.get('timeZone') or time_zone
+    if zone_name:
+        try:
+            midnight = midnight.replace(tzinfo=ZoneInfo(zone_name)).astimezone(_UTC).replace(tzinfo=None)
+        except (ZoneInfoNotFoundError, ValueError):
+            print(f"Unknown time zone {zone_name}, treating all-day events as UTC")
+    return midnight, True
+
+
+def _to_utc_naive(value: datetime.datetime) -> datetime.datetime:
+    return value.astimezone(_UTC).replace(tzinfo=None) if value.tzinfo else value
+
+
+class CalendarSync(AvailabilityProvider):
+    """
+    Keeps a local mirror of Google Calendar events up to date.
+    """
+
+    def __init__(self, calendar_integration: Optional[GoogleCalendarIntegration] = None,
+                 session_factory: Callable[[], Session] = get_db_session,
+                 initial_window_days: Optional[int] = 30):
+        """
+        Args:
+            calendar_integration: Client used to list events
+            session_factory: Opens sessions on the database holding the mirror
+            initial_window_days: Full syncs skip events that ended more than
+                this many days ago; None mirrors the whole history
+        """
+        self.calendar_integration = calendar_integration or GoogleCalendarIntegration()
+        self.session_factory = session_factory
+        self.initial_window_days = initial_window_days
+
+    @contextmanager
+    def _session(self) -> Iterator[Session]:
+        """Open a session for a single mirror operation."""
+        session = self.session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def sync(self, calendar_id: str = 'primary') -> Dict[str, Any]:
+        """
+        Bring the mirror of one calendar up to date.
+
+        All pages are fetched before anything is written, and the changes
+        and the new sync token are stored in one transaction, so a failed
+        sync leaves the previous mirror and token in place.
+
+        Args:
+            calendar_id: Calendar to sync
+
+        Returns:
+            Dict with 'calendar_id', 'mode' ('full', 'incremental' or
+            'unavailable'), and the number of events 'updated' and 'deleted'
+        """
+        with self._session() as session:
+            state = session.execute(
+                select(CalendarSyncState.sync_token, CalendarSyncState.time_zone)
+                .where(CalendarSyncState.calendar_id == calendar_id)
+            ).one_or_none()
+        sync_token, stored_zone = state if state is not None else (None, None)
+
+        mode = 'incremental' if sync_token else 'full'
+        try:
+            events, next_token, time_zone = self._list(calendar_id, sync_token)
+        except HttpError as e:
+            if sync_token is None or e.resp.status != 410:
+                raise
+            # The sync token expired: drop it and reload the calendar from scratch
+            mode = 'full'
+            events, next_token, time_zone = self._list(calendar_id, None)
+
+        if next_token is None:
+            return {'calendar_id': calendar_id, 'mode': 'unavailable', 'updated': 0, 'deleted': 0}
+
+        time_zone = time_zone or stored_zone
+        rows, cancelled = [], []
+        for event in events:
+            row = self._event_row(calendar_id, event, time_zone)
+            if row is None:
+                cancelled.append(event['id'])
+            else:
+                rows.append(row)
+
+        with self._session() as session:
+            if mode == 'full':
+                session.execute(delete(CalendarEvent).where(CalendarEvent.calendar_id == calendar_id))
+            for start in range(0, len(cancelled), _ID_CHUNK):
+                session.execute(delete(CalendarEvent).where(
+                    CalendarEvent.calendar_id == calendar_id,
+                    CalendarEvent.event_id.in_(cancelled[start:start + _ID_CHUNK])
+                ))
+            upsert_rows(session, CalendarEvent, rows, ('calendar_id', 'event_id'))
+            upsert_rows(session, CalendarSyncState, [{
+                'calendar_id': calendar_id,
+                'sync_token': next_token,
+                'time_zone': time_zone,
+                'synced_at': datetime.datetime.utcnow()
+            }], ('calendar_id',))
+
+        return {'calendar_id': calendar_id, 'mode': mode, 'updated': len(rows),
+                'deleted': len(cancelled) if mode == 'incremental' else 0}
+
+    def _list(self, calendar_id: str,
+              sync_token: Optional[str]) -> Tuple[List[Dict], Optional[str], Optional[str]]:
+        time_min = None
+        if sync_token is None and self.initial_window_days is not None:
+            time_min = datetime.datetime.now(_UTC) - datetime.timedelta(days=self.initial_window_days)
+        return self.calendar_integration.list_event_changes(calendar_id, sync_token=sync_token, time_min=time_min)
+
+    def synced_at(self, calendar_ids: Iterable[str] = ('primary',)) -> Dict[str, datetime.datetime]:
+        """When each calendar's mirror was last synced (naive UTC); never-synced calendars are missing."""
+        with self._session() as session:
+            return dict(session.execute(
+                select(CalendarSyncState.calendar_id, CalendarSyncState.synced_at)
+                .where(CalendarSyncState.calendar_id.in_(list(calendar_ids)),
+                       CalendarSyncState.synced_at.is_not(None))
+            ).all())
+
+    def _time_zone(self, calendar_id: str) -> Optional[str]:
+        """Time zone recorded for a calendar by its last sync."""
+        with self._session() as session:
+            return session.execute(
+                select(CalendarSyncState.time_zone).where(CalendarSyncState.calendar_id == calendar_id)
+            ).scalar_one_or_none()
+
+    @staticmethod
+    def _event_row(calendar_id: str, event: Dict[str, Any],
+                   time_zone: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Mirror row for an event, or None if it was cancelled or has no usable times."""
+        if event.get('status') == 'cancelled' or 'start' not in event or 'end' not in event:
+            return None
+        start_time, all_day = _parse_event_time(event['start'], time_zone)
+        end_time, _ = _parse_event_time(event['end'], time_zone)
+        return {
+            'calendar_id': calendar_id,
+            'event_id': event['id'],
+            'summary': event.get('summary'),
+            'start_time': start_time,
+            'end_time': end_time,
+            'all_day': all_day,
+            'transparent': event.get('transparency') == 'transparent',
+            'etag': event.get('etag'),
+            'updated': event.get('updated')
+        }
+
+    def update_events(self, updates: List[Tuple[str, Dict[str, Any]]],
+                      calendar_id: str = 'primary') -> List[Dict[str, Any]]:
+        """
+        Patch events with their mirrored ETags, so edits made elsewhere are never overwritten.
+
+        Each update is a batched PATCH carrying only the given fields and an
+        If-Match header with the event's ETag from the mirror. Successful
+        responses are written back to the mirror. A 412 means the event
+        changed since it was mirrored; that one event is re-fetched into the
+        mirror and reported as a conflict rather than overwritten. Events
+        without a mirrored ETag are read first to get one; a patch is never
+        sent without If-Match.
+
+        Args:
+            updates: (event_id, changed fields) pairs
+            calendar_id: Calendar holding the events
+
+        Returns:
+            Per update, in order: 'event_id', 'status' ('ok', 'conflict' or
+            'failed'), and 'event' (the current event) or 'error'
+        """
+        etags = self._etags(calendar_id, [event_id for event_id, _ in updates])
+        for event_id, _ in updates:
+            if not etags.get(event_id):
+                # Not mirrored (or mirrored without an ETag): read the current version rather
+                # than send an unconditional write
+                event = self.refresh_event(event_id, calendar_id)
+                if event and event.get('etag'):
+                    etags[event_id] = event['etag']
+
+        guarded = [(event_id, changes) for event_id, changes in updates if etags.get(event_id)]
+        outcomes = iter(self.calendar_integration.batch_events([
+            {'op': 'update', 'event_id': event_id, 'event': changes, 'etag': etags[event_id]}
+            for event_id, changes in guarded
+        ], calendar_id=calendar_id))
+
+        results, refreshed = [], []
+        for event_id, _ in updates:
+            if not etags.get(event_id):
+                results.append({'event_id': event_id, 'status': 'failed',
+                                'error': f"No ETag for event {event_id}; it is gone or could not be read"})
+                continue
+            outcome = next(outcomes)
+            if outcome['status'] == 'ok':
+                results.append({'event_id': event_id, 'status': 'ok', 'event': outcome['event']})
+                refreshed.append(outcome['event'])
+            elif outcome.get('http_status') == 412:
+                results.append({'event_id': event_id, 'status': 'conflict',
+                                'event': self.refresh_event(event_id, calendar_id)})
+            else:
+                results.append({'event_id': event_id, 'status': 'failed', 'error': outcome['error']})
+
+        time_zone = self._time_zone(calendar_id) if refreshed else None
+        with self._session() as session:
+            upsert_rows(session, CalendarEvent,
+                        [row for row in (self._event_row(calendar_id, event, time_zone) for event in refreshed)
+                         if row],
+                        ('calendar_id', 'event_id'))
+        return results
+
+    def refresh_event(self, event_id: str, calendar_id: str = 'primary') -> Optional[Dict[str, Any]]:
+        """
+        Re-fetch one event into the mirror.
+
+        Returns:
+            The current event, or None if it was deleted or could not be fetched
+        """
+        try:
+            event = self.calendar_integration.get_event(calendar_id, event_id)
+        except HttpError as e:
+            if e.resp.status not in (404, 410):
+                print(f"Error refreshing event {event_id}: {e}")
+                return None
+            event = {'id': event_id, 'status': 'cancelled'}
+        except ConnectionError as e:
+            print(f"Error refreshing event {event_id}: {e}")
+            return None
+
+        row = self._event_row(calendar_id, event, self._time_zone(calendar_id))
+        with self._session() as session:
+            if row is None:
+                session.execute(delete(CalendarEvent).where(CalendarEvent.calendar_id == calendar_id,
+                                                            CalendarEvent.event_id == event_id))
+            else:
+                upsert_rows(session, CalendarEvent, [row], ('calendar_id', 'event_id'))
+        return event if row is not None else None
+
+    def _etags(self, calendar_id: str, event_ids: List[str]) -> Dict[str, str]:
+        """Mirrored ETags of the given events."""
+        etags = {}
+        with self._session() as session:
+            for start in range(0, len(event_ids), _ID_CHUNK):
+                etags.update(session.execute(
+                    select(CalendarEvent.event_id, CalendarEvent.etag)
+                    .where(CalendarEvent.calendar_id == calendar_id,
+                           CalendarEvent.event_id.in_(event_ids[start:start + _ID_CHUNK]))
+                ).all())
+        return etags
+
+    def busy_periods(self, time_min: datetime.datetime, time_max: datetime.datetime,
+                     calendar_ids: Iterable[str] = ('primary',)) -> List[Dict[str, str]]:
+        """
+        Busy periods from the mirror, in the free/busy API's format.
+
+        Events marked as free (transparent) don't block time, as in the
+        free/busy API. Reads use the (calendar_id, start_time) index.
+
+        Args:
+            time_min: Start of the range
+            time_max: End of the range
+            calendar_ids: Mirrored calendars to include
+
+        Returns:
+            {'start', 'end'} RFC 3339 UTC strings sorted by start
+        """
+        query = (
+            select(CalendarEvent.start_time, CalendarEvent.end_time)
+            .where(CalendarEvent.calendar_id.in_(list(calendar_ids)),
+                   CalendarEvent.start_time < _to_utc_naive(time_max),
+                   CalendarEvent.end_time > _to_utc_naive(time_min),
+                   CalendarEvent.transparent.is_(False))
+            .order_by(CalendarEvent.start_time)
+        )
+        with self._session() as session:
+            rows = session.execute(query).all()
+        return [{'start': start.isoformat() + 'Z', 'end': end.isoformat() + 'Z'} for start, end in rows]
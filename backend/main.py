@@ -4,6 +4,8 @@ Main FastAPI application for RoboMentor.
 
 import sys
 import os
+import logging
+from contextlib import asynccontextmanager
 
 # Add the current directory to Python path for standalone execution
 if __name__ == "__main__":
@@ -23,7 +25,8 @@ try:
         calendar_router,
         trends_router
     )
-    from .models import engine
+    from .core.learning_tracker import GoalDeadlineNotifier, GoalTracker, LearningCurveFitter
+    from .models import engine, upgrade_database
     from .models.models import Base
     from .config import config
 except ImportError:
@@ -37,18 +40,45 @@ except ImportError:
         calendar_router,
         trends_router
     )
-    from models import engine
+    from core.learning_tracker import GoalDeadlineNotifier, GoalTracker, LearningCurveFitter
+    from models import engine, upgrade_database
     from models.models import Base
     from config import config
 
-# Create database tables
+# Create database tables and migrate existing ones
 Base.metadata.create_all(bind=engine)
+upgrade_database(engine)
+
+logger = logging.getLogger(__name__)
+
+
+def log_goal_event(event):
+    """Report a goal deadline event."""
+    logger.warning(f"Goal {event['goal_id']} is {event['type'].replace('_', ' ')}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Run the background jobs this process owns while the app is up."""
+    jobs = []
+    if config.GOAL_NOTIFICATIONS:
+        jobs.append(GoalDeadlineNotifier(GoalTracker(), log_goal_event))
+    if config.LEARNING_CURVE_FITTING:
+        jobs.append(LearningCurveFitter(interval_seconds=config.LEARNING_CURVE_INTERVAL_SECONDS))
+    for job in jobs:
+        job.start()
+    try:
+        yield
+    finally:
+        for job in jobs:
+            job.stop()
 
 # Create FastAPI app
 app = FastAPI(
     title="RoboMentor API",
     description="AI-powered learning system for robotics engineers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -0,0 +1,60 @@
+"""
+Alembic environment for the RoboMentor database.
+
+New tables are still created by ``Base.metadata.create_all`` at startup;
+revisions here cover the changes it can't make to existing tables (new
+columns, replaced indexes). Each revision inspects the schema first, so
+it also applies cleanly to a database that ``create_all`` already built
+at the latest schema.
+"""
+
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# The models import the app config relatively, so they can't be loaded
+# from here; revisions are written by hand rather than autogenerated.
+target_metadata = None
+
+
+def _database_url():
+    """URL from the alembic config, else the app's DATABASE_URL."""
+    url = config.get_main_option("sqlalchemy.url")
+    if url:
+        return url
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import config as app_config
+    return app_config.DATABASE_URL
+
+
+def run_migrations_online():
+    """Run migrations on a connection passed in by the app, or a new one."""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(_database_url())
+    try:
+        with engine.connect() as connection:
+            context.configure(connection=connection, target_metadata=target_metadata)
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    # Revisions inspect the live schema, so there is no SQL-only mode
+    raise RuntimeError("Offline (--sql) migrations are not supported")
+run_migrations_online()
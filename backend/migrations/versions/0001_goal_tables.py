@@ -0,0 +1,73 @@
+"""Goal targets, milestone and note tables, status indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _schema():
+    return sa.inspect(op.get_bind())
+
+
+def upgrade():
+    schema = _schema()
+    tables = set(schema.get_table_names())
+    if "goals" not in tables:
+        # Empty database: create_all builds the current schema on startup
+        return
+
+    columns = {column["name"] for column in schema.get_columns("goals")}
+    for name in ("target_skills", "linked_projects"):
+        if name not in columns:
+            op.add_column("goals", sa.Column(name, sa.JSON()))
+
+    if "goal_milestones" not in tables:
+        op.create_table(
+            "goal_milestones",
+            sa.Column("milestone_id", sa.String(), primary_key=True),
+            sa.Column("goal_id", sa.String(), sa.ForeignKey("goals.goal_id"), nullable=False),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text()),
+            sa.Column("target_skills", sa.JSON()),
+            sa.Column("target_date", sa.DateTime()),
+        )
+        op.create_index("idx_milestone_goal", "goal_milestones", ["goal_id", "position"])
+    if "goal_notes" not in tables:
+        op.create_table(
+            "goal_notes",
+            sa.Column("note_id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("goal_id", sa.String(), sa.ForeignKey("goals.goal_id"), nullable=False),
+            sa.Column("date", sa.DateTime()),
+            sa.Column("note", sa.Text(), nullable=False),
+        )
+        op.create_index("idx_note_goal", "goal_notes", ["goal_id", "date"])
+
+    indexes = {index["name"] for index in schema.get_indexes("goals")}
+    if "idx_goal_status" in indexes:
+        op.drop_index("idx_goal_status", table_name="goals")
+    if "idx_goal_status_domain" not in indexes:
+        op.create_index("idx_goal_status_domain", "goals", ["status", "domain"])
+    if "idx_goal_status_due" not in indexes:
+        op.create_index("idx_goal_status_due", "goals", ["status", "expected_completion_date"])
+
+
+def downgrade():
+    op.drop_index("idx_goal_status_due", table_name="goals")
+    op.drop_index("idx_goal_status_domain", table_name="goals")
+    op.create_index("idx_goal_status", "goals", ["status"])
+    op.drop_table("goal_notes")
+    op.drop_table("goal_milestones")
+    with op.batch_alter_table("goals") as batch:
+        batch.drop_column("linked_projects")
+        batch.drop_column("target_skills")
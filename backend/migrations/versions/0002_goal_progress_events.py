@@ -0,0 +1,64 @@
+"""Goal progress sequence, event and snapshot tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def _progress_table(name, time_column):
+    op.create_table(
+        name,
+        sa.Column("goal_id", sa.String(), sa.ForeignKey("goals.goal_id"), primary_key=True),
+        sa.Column("sequence", sa.Integer(), primary_key=True),
+        sa.Column(time_column, sa.DateTime(), nullable=False),
+        sa.Column("progress_percent", sa.Float(), nullable=False),
+        sa.Column("status", sa.String()),
+    )
+
+
+def upgrade():
+    schema = sa.inspect(op.get_bind())
+    tables = set(schema.get_table_names())
+    if "goals" not in tables:
+        # Empty database: create_all builds the current schema on startup
+        return
+
+    columns = {column["name"] for column in schema.get_columns("goals")}
+    if "progress_sequence" not in columns:
+        op.add_column("goals", sa.Column("progress_sequence", sa.Integer(), server_default="0"))
+
+    if "goal_progress_events" not in tables:
+        _progress_table("goal_progress_events", "recorded_at")
+        op.create_index("idx_progress_event_time", "goal_progress_events", ["goal_id", "recorded_at"])
+    if "goal_progress_snapshots" not in tables:
+        _progress_table("goal_progress_snapshots", "as_of")
+        op.create_index("idx_progress_snapshot_time", "goal_progress_snapshots", ["goal_id", "as_of"])
+
+    # Existing goals have no history, so each gets a base snapshot (and the
+    # matching event) of its current progress, as of its creation
+    for table, time_column in (("goal_progress_snapshots", "as_of"), ("goal_progress_events", "recorded_at")):
+        op.get_bind().execute(sa.text(
+            f"INSERT INTO {table} (goal_id, sequence, {time_column}, progress_percent, status) "
+            "SELECT goal_id, COALESCE(progress_sequence, 0), COALESCE(created_date, :now), "
+            "COALESCE(progress_percent, 0.0), status FROM goals "
+            f"WHERE goal_id NOT IN (SELECT goal_id FROM {table})"
+        ), {"now": datetime.now()})
+
+
+def downgrade():
+    op.drop_table("goal_progress_snapshots")
+    op.drop_table("goal_progress_events")
+    with op.batch_alter_table("goals") as batch:
+        batch.drop_column("progress_sequence")
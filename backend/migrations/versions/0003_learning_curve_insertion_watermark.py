@@ -0,0 +1,57 @@
+"""Quiz attempt insertion time, learning-curve watermark on insertion time
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    schema = sa.inspect(op.get_bind())
+    tables = set(schema.get_table_names())
+
+    if "quiz_attempts" in tables:
+        columns = {column["name"] for column in schema.get_columns("quiz_attempts")}
+        if "created_date" not in columns:
+            op.add_column("quiz_attempts", sa.Column("created_date", sa.DateTime()))
+            # Best guess for existing rows; the fitter is reset below anyway
+            op.execute("UPDATE quiz_attempts SET created_date = date_attempted")
+
+    if "learning_curve_watermark" in tables:
+        columns = {column["name"] for column in schema.get_columns("learning_curve_watermark")}
+        if "session_created" not in columns:
+            # The old watermark was on event dates and can't be translated, so
+            # drop the fitted state and let the next run refit from all history
+            op.drop_table("learning_curve_watermark")
+            op.create_table(
+                "learning_curve_watermark",
+                sa.Column("watermark_id", sa.Integer(), primary_key=True),
+                sa.Column("session_created", sa.DateTime()),
+                sa.Column("session_ids", sa.JSON()),
+                sa.Column("attempt_created", sa.DateTime()),
+                sa.Column("attempt_ids", sa.JSON()),
+            )
+            for table in ("learning_curves", "skill_learning_state"):
+                if table in tables:
+                    op.execute(f"DELETE FROM {table}")
+
+
+def downgrade():
+    op.drop_table("learning_curve_watermark")
+    op.create_table(
+        "learning_curve_watermark",
+        sa.Column("watermark_id", sa.Integer(), primary_key=True),
+        sa.Column("last_session_date", sa.DateTime()),
+        sa.Column("last_attempt_date", sa.DateTime()),
+    )
+    with op.batch_alter_table("quiz_attempts") as batch:
+        batch.drop_column("created_date")
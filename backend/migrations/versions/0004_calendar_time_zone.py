@@ -0,0 +1,33 @@
+"""Calendar time zone on the sync state
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    schema = sa.inspect(op.get_bind())
+    if "calendar_sync_state" not in schema.get_table_names():
+        return
+
+    columns = {column["name"] for column in schema.get_columns("calendar_sync_state")}
+    if "time_zone" not in columns:
+        op.add_column("calendar_sync_state", sa.Column("time_zone", sa.String()))
+        # All-day events were mirrored as UTC midnight; without a sync token
+        # or sync time, each calendar is fully re-synced before it is used
+        op.execute("UPDATE calendar_sync_state SET sync_token = NULL, synced_at = NULL")
+
+
+def downgrade():
+    with op.batch_alter_table("calendar_sync_state") as batch:
+        batch.drop_column("time_zone")
@@ -0,0 +1,75 @@
+"""Goal at-risk time and notification state
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from datetime import timedelta
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def _at_risk_date(created_date, expected_completion_date, progress_percent):
+    # Same rule as goal_tracker.at_risk_date, frozen at this revision
+    if created_date is None or expected_completion_date is None:
+        return None
+    progress = progress_percent or 0.0
+    total_days = (expected_completion_date - created_date).days
+    if total_days <= 0 or progress >= 100.0:
+        return None
+    return created_date + timedelta(days=math.floor(progress * total_days / 100.0) + 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    schema = sa.inspect(bind)
+    tables = set(schema.get_table_names())
+    if "goals" not in tables:
+        return
+
+    columns = {column["name"] for column in schema.get_columns("goals")}
+    if "at_risk_at" not in columns:
+        op.add_column("goals", sa.Column("at_risk_at", sa.DateTime()))
+
+        goals = sa.table(
+            "goals", sa.column("goal_id", sa.String()), sa.column("status", sa.String()),
+            sa.column("progress_percent", sa.Float()), sa.column("created_date", sa.DateTime()),
+            sa.column("expected_completion_date", sa.DateTime()), sa.column("at_risk_at", sa.DateTime())
+        )
+        rows = bind.execute(
+            sa.select(goals.c.goal_id, goals.c.created_date, goals.c.expected_completion_date,
+                      goals.c.progress_percent)
+            .where(goals.c.status == "Active")
+        ).all()
+        for goal_id, created_date, expected_completion_date, progress in rows:
+            at_risk_at = _at_risk_date(created_date, expected_completion_date, progress)
+            if at_risk_at is not None:
+                bind.execute(goals.update().where(goals.c.goal_id == goal_id).values(at_risk_at=at_risk_at))
+
+    indexes = {index["name"] for index in schema.get_indexes("goals")}
+    if "idx_goal_status_at_risk" not in indexes:
+        op.create_index("idx_goal_status_at_risk", "goals", ["status", "at_risk_at"])
+
+    if "goal_notifications" not in tables:
+        op.create_table(
+            "goal_notifications",
+            sa.Column("goal_id", sa.String(), sa.ForeignKey("goals.goal_id"), primary_key=True),
+            sa.Column("kind", sa.String(), primary_key=True),
+            sa.Column("notified_at", sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("goal_notifications")
+    op.drop_index("idx_goal_status_at_risk", table_name="goals")
+    with op.batch_alter_table("goals") as batch:
+        batch.drop_column("at_risk_at")
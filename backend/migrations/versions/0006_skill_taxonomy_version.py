@@ -0,0 +1,29 @@
+"""Stored skill taxonomy version
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    schema = sa.inspect(op.get_bind())
+    if "skill_taxonomy_version" not in schema.get_table_names():
+        op.create_table(
+            "skill_taxonomy_version",
+            sa.Column("version_id", sa.Integer(), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("skill_taxonomy_version")
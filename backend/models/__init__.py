@@ -11,10 +11,25 @@ from .models import (
     QuizAttempt,
     LearningPath,
     Goal,
+    GoalMilestone,
+    GoalNote,
+    GoalNotification,
+    GoalProgressEvent,
+    GoalProgressSnapshot,
     Project,
     GapAnalysis,
+    LearningCurve,
+    SkillLearningState,
+    SkillTaxonomyVersion,
+    LearningCurveWatermark,
+    Schedule,
+    ScheduledItem,
+    CalendarEvent,
+    CalendarSyncState,
     engine,
-    get_db_session
+    get_db_session,
+    upgrade_database,
+    upsert_rows
 )
 
 __all__ = [
@@ -26,8 +41,23 @@ __all__ = [
     'QuizAttempt',
     'LearningPath',
     'Goal',
+    'GoalMilestone',
+    'GoalNote',
+    'GoalNotification',
+    'GoalProgressEvent',
+    'GoalProgressSnapshot',
     'Project',
     'GapAnalysis',
+    'LearningCurve',
+    'SkillLearningState',
+    'SkillTaxonomyVersion',
+    'LearningCurveWatermark',
+    'Schedule',
+    'ScheduledItem',
+    'CalendarEvent',
+    'CalendarSyncState',
     'engine',
-    'get_db_session'
+    'get_db_session',
+    'upgrade_database',
+    'upsert_rows'
 ]
\ No newline at end of file
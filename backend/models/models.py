@@ -2,11 +2,12 @@
 SQLAlchemy models for RoboMentor database.
 """
 
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Text, ForeignKey, JSON, Index
+from sqlalchemy import create_engine, Boolean, Column, String, Integer, Float, DateTime, Text, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 import json
+import os
 
 Base = declarative_base()
 
@@ -21,6 +22,58 @@ def get_db_session():
     """Get database session."""
     return SessionLocal()
 
+def upgrade_database(bind=None):
+    """
+    Bring an existing database up to the current schema.
+
+    ``create_all`` adds missing tables but never alters existing ones, so
+    columns and indexes added since a database was created come from the
+    Alembic revisions in ``migrations/``.
+
+    Args:
+        bind: Engine to migrate, defaults to the app engine
+    """
+    from alembic import command
+    from alembic.config import Config as AlembicConfig
+
+    alembic_config = AlembicConfig()
+    alembic_config.set_main_option(
+        "script_location",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+    )
+    with (bind or engine).begin() as connection:
+        alembic_config.attributes["connection"] = connection
+        command.upgrade(alembic_config, "head")
+
+def upsert_rows(session, model, rows, key_columns):
+    """
+    Insert or update rows in one statement where the dialect supports it.
+
+    Args:
+        session: Open session to write through
+        model: Mapped class of the target table
+        rows: Column-value dicts, each including the key columns
+        key_columns: Names of the primary key columns to match on
+    """
+    if not rows:
+        return
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        for row in rows:
+            session.merge(model(**row))
+        return
+
+    statement = dialect_insert(model.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={column: statement.excluded[column] for column in rows[0] if column not in key_columns}
+    )
+    session.execute(statement, rows)
+
 class Skill(Base):
     __tablename__ = "skills"
 
@@ -34,8 +87,14 @@ class Skill(Base):
     created_date = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
-    parent = relationship("Skill", remote_side=[skill_id])
-    sub_skills = relationship("Skill")
+    parent = relationship("Skill", remote_side=[skill_id], back_populates="sub_skills")
+    sub_skills = relationship("Skill", back_populates="parent")
+
+class SkillTaxonomyVersion(Base):
+    __tablename__ = "skill_taxonomy_version"
+
+    version_id = Column(Integer, primary_key=True)  # Single row
+    version = Column(Integer, nullable=False, default=0)  # Bumped by every commit that changes skills
 
 class Concept(Base):
     __tablename__ = "concepts"
@@ -83,6 +142,7 @@ class QuizAttempt(Base):
     date_attempted = Column(DateTime)
     retention_predicted = Column(Float)
     next_review_date = Column(DateTime)
+    created_date = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
     concept = relationship("Concept")
@@ -114,8 +174,60 @@ class Goal(Base):
     priority = Column(String)
     status = Column(String)
     progress_percent = Column(Float, default=0.0)
+    progress_sequence = Column(Integer, default=0)  # Sequence number of the latest progress event
+    target_skills = Column(JSON)
+    linked_projects = Column(JSON)
     created_date = Column(DateTime, default=datetime.utcnow)
     expected_completion_date = Column(DateTime)
+    at_risk_at = Column(DateTime)  # When the goal falls behind schedule at its current progress
+
+    # Relationships
+    milestones = relationship("GoalMilestone", order_by="GoalMilestone.position")
+    notes = relationship("GoalNote", order_by="GoalNote.date")
+
+class GoalMilestone(Base):
+    __tablename__ = "goal_milestones"
+
+    milestone_id = Column(String, primary_key=True)
+    goal_id = Column(String, ForeignKey('goals.goal_id'), nullable=False)
+    position = Column(Integer, nullable=False)
+    title = Column(String, nullable=False)
+    description = Column(Text)
+    target_skills = Column(JSON)
+    target_date = Column(DateTime)
+
+class GoalNote(Base):
+    __tablename__ = "goal_notes"
+
+    note_id = Column(Integer, primary_key=True, autoincrement=True)
+    goal_id = Column(String, ForeignKey('goals.goal_id'), nullable=False)
+    date = Column(DateTime, default=datetime.now)
+    note = Column(Text, nullable=False)
+
+class GoalProgressEvent(Base):
+    __tablename__ = "goal_progress_events"
+
+    goal_id = Column(String, ForeignKey('goals.goal_id'), primary_key=True)
+    sequence = Column(Integer, primary_key=True)
+    recorded_at = Column(DateTime, nullable=False)
+    progress_percent = Column(Float, nullable=False)
+    status = Column(String)
+
+class GoalProgressSnapshot(Base):
+    __tablename__ = "goal_progress_snapshots"
+
+    goal_id = Column(String, ForeignKey('goals.goal_id'), primary_key=True)
+    sequence = Column(Integer, primary_key=True)
+    as_of = Column(DateTime, nullable=False)
+    progress_percent = Column(Float, nullable=False)
+    status = Column(String)
+
+class GoalNotification(Base):
+    __tablename__ = "goal_notifications"
+
+    goal_id = Column(String, ForeignKey('goals.goal_id'), primary_key=True)
+    kind = Column(String, primary_key=True)  # "overdue" or "at_risk"
+    notified_at = Column(DateTime, nullable=False)
 
 class Project(Base):
     __tablename__ = "projects"
@@ -128,6 +240,33 @@ class Project(Base):
     repo_url = Column(String)
     created_date = Column(DateTime, default=datetime.utcnow)
 
+class LearningCurve(Base):
+    __tablename__ = "learning_curves"
+
+    domain = Column(String, primary_key=True)
+    sample_count = Column(Integer, default=0)
+    sum_xx = Column(Float, default=0.0)  # Sufficient statistics for the least-squares fit
+    sum_xy = Column(Float, default=0.0)
+    learning_rate = Column(Float)
+    updated_date = Column(DateTime, default=datetime.utcnow)
+
+class SkillLearningState(Base):
+    __tablename__ = "skill_learning_state"
+
+    skill_id = Column(String, ForeignKey('skills.skill_id'), primary_key=True)
+    pending_hours = Column(Float, default=0.0)  # Hours studied since the last assessment
+    last_score = Column(Float)
+    last_attempt_date = Column(DateTime)
+
+class LearningCurveWatermark(Base):
+    __tablename__ = "learning_curve_watermark"
+
+    watermark_id = Column(Integer, primary_key=True)
+    session_created = Column(DateTime)  # created_date of the newest session folded into the fit
+    session_ids = Column(JSON)  # Sessions at exactly session_created that were folded in
+    attempt_created = Column(DateTime)
+    attempt_ids = Column(JSON)
+
 class GapAnalysis(Base):
     __tablename__ = "gap_analysis"
 
@@ -138,12 +277,67 @@ class GapAnalysis(Base):
     gaps_identified = Column(JSON)  # Detailed gap objects
     recommendations = Column(Text)
 
+class Schedule(Base):
+    __tablename__ = "schedules"
+
+    user_id = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # Bumped by every save
+    timezone_aware = Column(Boolean, default=True)  # Item times are stored as naive UTC
+    availability = Column(JSON)  # Snapshot of [start, end, confidence] slots, ISO times
+    availability_captured_at = Column(DateTime)
+    updated_date = Column(DateTime, default=datetime.utcnow)
+
+class ScheduledItem(Base):
+    __tablename__ = "scheduled_items"
+
+    user_id = Column(String, ForeignKey('schedules.user_id'), primary_key=True)
+    item_id = Column(String, primary_key=True)
+    title = Column(String, nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    priority = Column(Integer, nullable=False)
+    start_time = Column(DateTime)
+    end_time = Column(DateTime)
+    dependencies = Column(JSON)  # Prerequisite item IDs
+    completed = Column(Boolean, default=False)
+    progress_percentage = Column(Float, default=0.0)
+    deadline = Column(DateTime)
+    version = Column(Integer, nullable=False)  # Schedule version that last wrote this row
+
+class CalendarEvent(Base):
+    __tablename__ = "calendar_events"
+
+    calendar_id = Column(String, primary_key=True)
+    event_id = Column(String, primary_key=True)
+    summary = Column(String)
+    start_time = Column(DateTime, nullable=False)  # Naive UTC
+    end_time = Column(DateTime, nullable=False)
+    all_day = Column(Boolean, default=False)
+    transparent = Column(Boolean, default=False)  # Shown as free, so it doesn't block time
+    etag = Column(String)
+    updated = Column(String)  # RFC 3339 last-modified time from the API
+
+class CalendarSyncState(Base):
+    __tablename__ = "calendar_sync_state"
+
+    calendar_id = Column(String, primary_key=True)
+    sync_token = Column(String)  # nextSyncToken of the last completed sync
+    time_zone = Column(String)  # Calendar's IANA time zone, for all-day events
+    synced_at = Column(DateTime)
+
 # Indices for performance
 Index('idx_skill_domain', Skill.domain)
 Index('idx_session_date', LearningSession.date)
 Index('idx_quiz_date', QuizAttempt.date_attempted)
 Index('idx_concept_mastery', Concept.mastery_level)
-Index('idx_goal_status', Goal.status)
+Index('idx_goal_status_domain', Goal.status, Goal.domain)
+Index('idx_goal_status_due', Goal.status, Goal.expected_completion_date)
+Index('idx_goal_status_at_risk', Goal.status, Goal.at_risk_at)
+Index('idx_milestone_goal', GoalMilestone.goal_id, GoalMilestone.position)
+Index('idx_note_goal', GoalNote.goal_id, GoalNote.date)
+Index('idx_progress_event_time', GoalProgressEvent.goal_id, GoalProgressEvent.recorded_at)
+Index('idx_progress_snapshot_time', GoalProgressSnapshot.goal_id, GoalProgressSnapshot.as_of)
+Index('idx_scheduled_item_version', ScheduledItem.user_id, ScheduledItem.version)
+Index('idx_calendar_event_start', CalendarEvent.calendar_id, CalendarEvent.start_time)
 
 # Create tables
 Base.metadata.create_all(bind=engine)
\ No newline at end of file
@@ -10,7 +10,7 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from main import app
+from ..main import app
 
 
 @pytest.fixture
@@ -19,6 +19,24 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def db_session_factory():
+    """Session factory bound to a fresh in-memory database."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from ..models.models import Base
+
+    test_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=test_engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+    test_engine.dispose()
+
+
 @pytest.fixture
 def mock_gpt_client():
     """Mock GPT client for testing."""
@@ -103,20 +103,44 @@ class TestLearningTrackerAPI:
 class TestAdaptiveSchedulerAPI:
     """Test Adaptive Scheduler API endpoints."""
 
-    def test_sync_calendar(self, client):
+    @pytest.fixture
+    def scheduler_db(self, db_session_factory):
+        """Route the scheduler endpoints to a test database, without calendar access."""
+        from ...main import app
+        from ...models import get_db_session
+
+        app.dependency_overrides[get_db_session] = lambda: db_session_factory()
+        with patch('robomentor_app.backend.integrations.calendar_integration.google_calendar.'
+                   'GoogleCalendarIntegration.authenticate', return_value=False):
+            yield db_session_factory
+        app.dependency_overrides.pop(get_db_session, None)
+
+    def test_sync_calendar(self, client, scheduler_db):
         """Test calendar synchronization."""
-        response = client.post("/api/calendar/sync")
+        from ...integrations.calendar_integration import CalendarSync
+
+        synced = {'calendar_id': 'primary', 'mode': 'full', 'updated': 3, 'deleted': 0}
+        with patch.object(CalendarSync, 'sync', return_value=synced) as mock_sync:
+            response = client.post("/api/calendar/sync")
 
         assert response.status_code == 200
         data = response.json()
         assert data["result"] == "Synced"
+        assert data["updated"] == 3
+        mock_sync.assert_called_once_with('primary')
 
-    def test_schedule_session(self, client):
+    def test_sync_calendar_unavailable(self, client, scheduler_db):
+        """Test that a calendar that can't be reached is reported, not synced."""
+        response = client.post("/api/calendar/sync")
+
+        assert response.status_code == 200
+        assert response.json()["result"] == "Calendar unavailable"
+
+    def test_schedule_session(self, client, scheduler_db):
         """Test session scheduling."""
         session_data = {
-            "title": "Learning Session",
-            "duration": 60,
-            "priority": 5
+            "user_id": "user1",
+            "items": [{"id": "session1", "title": "Learning Session", "duration_minutes": 60, "priority": 5}]
         }
 
         response = client.post("/api/calendar/schedule-session", json=session_data)
@@ -124,6 +148,15 @@ class TestAdaptiveSchedulerAPI:
         assert response.status_code == 200
         data = response.json()
         assert data["result"] == "Scheduled"
+        assert data["version"] == 1
+
+    def test_schedule_session_rejects_invalid_items(self, client, scheduler_db):
+        """Test that items the scheduler can't take are a client error, not a saved schedule."""
+        response = client.post("/api/calendar/schedule-session",
+                               json={"user_id": "user1", "items": [{"title": "No ID"}]})
+
+        assert response.status_code == 400
+        assert client.post("/api/calendar/schedule-session", json={"items": []}).status_code == 400
 
 
 class TestUpgradeRecommendationsAPI:
@@ -174,6 +207,35 @@ class TestHealthCheck:
         assert "message" in data
         assert "RoboMentor" in data["message"]
 
+    def test_goal_notifier_runs_with_app(self):
+        """Test that the app owns the goal notifier only when enabled."""
+        from fastapi.testclient import TestClient
+        from ...main import app, config
+
+        with patch('robomentor_app.backend.main.GoalTracker', return_value=Mock()), \
+                patch('robomentor_app.backend.main.GoalDeadlineNotifier') as mock_notifier:
+            with patch.object(config, 'GOAL_NOTIFICATIONS', False), TestClient(app):
+                pass
+            mock_notifier.assert_not_called()
+
+            with patch.object(config, 'GOAL_NOTIFICATIONS', True), TestClient(app):
+                mock_notifier.return_value.start.assert_called_once()
+            mock_notifier.return_value.stop.assert_called_once()
+
+    def test_learning_curve_fitter_runs_with_app(self):
+        """Test that the app runs periodic learning-curve fitting only when enabled."""
+        from fastapi.testclient import TestClient
+        from ...main import app, config
+
+        with patch('robomentor_app.backend.main.LearningCurveFitter') as mock_fitter:
+            with TestClient(app):
+                pass
+            mock_fitter.assert_not_called()
+
+            with patch.object(config, 'LEARNING_CURVE_FITTING', True), TestClient(app):
+                mock_fitter.return_value.start.assert_called_once()
+            mock_fitter.return_value.stop.assert_called_once()
+
 
 class TestErrorHandling:
     """Test error handling across endpoints."""
@@ -3,6 +3,8 @@ Unit tests for Adaptive Scheduler module components.
 """
 
 import pytest
+import copy
+import pickle
 import datetime
 from unittest.mock import Mock, patch
 from ...core.adaptive_scheduler.algorithms import (
@@ -12,6 +14,14 @@ from ...core.adaptive_scheduler.algorithms import (
     ConflictType
 )
 from ...core.adaptive_scheduler.scheduler import AdaptiveScheduler
+from ...core.adaptive_scheduler.batch import (
+    BatchScheduler, pack_user_schedule, unpack_user_schedule
+)
+from ...core.adaptive_scheduler.recurrence import RecurringItem, expand_recurring
+from ...core.adaptive_scheduler.store import ScheduleStore
+from ...core.adaptive_scheduler.simulation import simulate_scenarios
+from ...core.adaptive_scheduler.intervals import cap_weekly_hours
+from ...core.adaptive_scheduler.columns import ScheduleTable
 
 
 class TestScheduleItem:
@@ -37,6 +47,78 @@ class TestScheduleItem:
         assert item.completed is False
         assert item.progress_percentage == 25.0
 
+    def test_schedule_item_view_over_table(self):
+        """Test that adopted items read and write their table row."""
+        tz = datetime.timezone(datetime.timedelta(hours=2))
+        start = datetime.datetime(2024, 1, 1, 9, 0, 30, 250, tzinfo=tz)
+        items = [
+            ScheduleItem(id="a", title="A", duration_minutes=60, priority=5, start_time=start,
+                         end_time=start + datetime.timedelta(hours=1)),
+            ScheduleItem(id="b", title="B", duration_minutes=30, priority=7, dependencies=["a", "missing"])
+        ]
+        standalone = [copy.copy(item) for item in items]
+
+        algorithm = AdaptiveSchedulingAlgorithm(items, [])
+        table = algorithm.table
+
+        assert items == standalone
+        assert items[0].start_time == start and items[0].start_time.utcoffset() == tz.utcoffset(None)
+        assert items[1].start_time is None
+        assert list(table.column('priority')) == [5, 7]
+
+        items[1].dependencies = ["a"]
+        items[1].start_time = start + datetime.timedelta(hours=2)
+        items[1].end_time = start + datetime.timedelta(hours=3)
+        offsets, rows = table.dependency_rows()
+        assert items[1].dependencies == ["a"]
+        assert list(offsets) == [0, 0, 1] and list(rows) == [0]
+        assert algorithm.table is table
+
+        # In-place changes are written to the row like assignments
+        table.clear_dirty()
+        items[1].dependencies.append("missing")
+        assert items[1].dependencies == ["a", "missing"]
+        assert table.dirty_rows() == [1]
+        del items[1].dependencies[1]
+        assert items[1].dependencies == ["a"]
+        assert type(pickle.loads(pickle.dumps(items[1].dependencies))) is list
+        standalone[0].dependencies.append("b")
+        assert standalone[0].dependencies == ["b"]
+
+        # Copies and pickles are standalone items with the same values
+        clone = pickle.loads(pickle.dumps(copy.copy(items[1])))
+        clone.priority = 1
+        assert (clone.id, clone.start_time, clone.dependencies) == ("b", items[1].start_time, ["a"])
+        assert items[1].priority == 7
+
+        # Rebuilding the list moves the items into a new table
+        algorithm.learning_items = [items[1], items[0]]
+        assert algorithm.table is not table
+        assert [item.id for item in algorithm.learning_items] == ["b", "a"]
+        assert items[0].start_time == start
+
+    def test_table_time_zone_is_not_taken_from_the_first_item(self):
+        """Test that times keep their offset whichever item comes first, and mixing is rejected."""
+        utc = datetime.timezone.utc
+        day = datetime.datetime(2030, 1, 1, 9, tzinfo=utc)
+        items = [
+            ScheduleItem(id="a", title="A", duration_minutes=60, priority=5),
+            ScheduleItem(id="b", title="B", duration_minutes=60, priority=5, dependencies=["a"])
+        ]
+        algorithm = AdaptiveSchedulingAlgorithm(items, [UserAvailability(day, day.replace(hour=17), 0.9)])
+        algorithm.generate_schedule()
+        algorithm.generate_schedule(mode="optimal")
+
+        assert algorithm.table.tz is utc
+        assert all(item.start_time.tzinfo is not None for item in items)
+
+        mixed = [ScheduleItem(id="a", title="A", duration_minutes=60, priority=5,
+                              deadline=datetime.datetime(2030, 1, 1))]
+        with pytest.raises(ValueError, match="naive and time-zone-aware"):
+            AdaptiveSchedulingAlgorithm(mixed, [UserAvailability(day, day.replace(hour=17), 0.9)]).table
+        with pytest.raises(ValueError):
+            items[0].deadline = datetime.datetime(2030, 1, 2)
+
 
 class TestUserAvailability:
     """Test UserAvailability dataclass."""
@@ -141,6 +223,282 @@ class TestAdaptiveSchedulingAlgorithm:
         assert conflicts[0]['type'] == ConflictType.DEPENDENCY_CONFLICT
         assert conflicts[0]['severity'] == 9
 
+    def test_detect_dependency_cycle(self):
+        """Test that a longer dependency cycle is reported once with all its items."""
+        items = [
+            ScheduleItem(id="a", title="A", duration_minutes=30, priority=9, dependencies=["c"]),
+            ScheduleItem(id="b", title="B", duration_minutes=30, priority=7, dependencies=["a"]),
+            ScheduleItem(id="c", title="C", duration_minutes=30, priority=5, dependencies=["b"]),
+            ScheduleItem(id="d", title="D", duration_minutes=30, priority=3, dependencies=["a", "missing"])
+        ]
+
+        algorithm = AdaptiveSchedulingAlgorithm(items, [])
+        conflicts = algorithm.detect_conflicts()
+
+        assert len(conflicts) == 1
+        assert conflicts[0]['type'] == ConflictType.DEPENDENCY_CONFLICT
+        assert conflicts[0]['items'] == ["a", "b", "c"]
+
+        algorithm._resolve_conflicts(conflicts)
+
+        assert [item.dependencies for item in items] == [[], [], [], ["a", "missing"]]
+        assert algorithm.detect_conflicts() == []
+
+    def test_resolve_overlaps_shares_one_free_list(self):
+        """Test that resolving many overlaps builds the free list once and leaves no overlaps."""
+        base = datetime.datetime(2024, 1, 1, 9, 0)
+        availability = [UserAvailability(base + datetime.timedelta(days=day),
+                                         base + datetime.timedelta(days=day, hours=8), 0.8)
+                        for day in range(10)]
+        # Pairs of items stacked on the same hour
+        items = [
+            ScheduleItem(id=f"item{i}", title=f"Task {i}", duration_minutes=60, priority=i % 2 + 1,
+                         start_time=base + datetime.timedelta(days=i // 2),
+                         end_time=base + datetime.timedelta(days=i // 2, hours=1))
+            for i in range(20)
+        ]
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+        conflicts = algorithm.detect_conflicts()
+        assert len(conflicts) == 10
+
+        with patch.object(algorithm, '_free_time', wraps=algorithm._free_time) as free_time:
+            algorithm._resolve_conflicts(conflicts)
+
+        assert free_time.call_count == 1
+        assert algorithm.detect_conflicts() == []
+        # The higher-priority item of each pair kept its time
+        assert all(item.start_time == base + datetime.timedelta(days=index // 2)
+                   for index, item in enumerate(items) if item.priority == 2)
+
+    def test_find_best_slot_matches_linear_scan(self):
+        """Test that the indexed best-fit search picks the slot a full scan would."""
+        import random
+
+        rng = random.Random(3)
+        base = datetime.datetime(2024, 1, 1, 8, 0)
+        availability = []
+        for day in range(300):
+            start = base + datetime.timedelta(days=day, minutes=rng.randrange(0, 240, 15))
+            availability.append(UserAvailability(
+                start, start + datetime.timedelta(minutes=rng.randrange(15, 300, 15)),
+                rng.choice([0.5, 0.6, 0.7, 0.8, 0.9])
+            ))
+        rng.shuffle(availability)
+        algorithm = AdaptiveSchedulingAlgorithm([], availability)
+
+        for duration in [15, 30, 45, 60, 90, 120, 240, 290, 300]:
+            expected = None
+            best_score = -1
+            for slot in sorted(availability, key=lambda x: x.start_time):
+                slot_duration = (slot.end_time - slot.start_time).total_seconds() / 60
+                if slot_duration >= duration:
+                    score = slot.confidence * 10 + (slot_duration - duration) / slot_duration * 5
+                    if score > best_score:
+                        best_score = score
+                        expected = slot.start_time
+
+            item = ScheduleItem(id="item", title="Task", duration_minutes=duration, priority=5)
+            slot = algorithm._find_best_slot(item)
+
+            if expected is None:
+                assert slot is None
+            else:
+                assert slot == (expected, expected + datetime.timedelta(minutes=duration))
+
+    def test_is_time_available_uses_merged_slots(self):
+        """Test availability checks across adjacent and overlapping slots."""
+        availability = [
+            UserAvailability(datetime.datetime(2024, 1, 1, 13, 0), datetime.datetime(2024, 1, 1, 15, 0), 0.8),
+            UserAvailability(datetime.datetime(2024, 1, 1, 9, 0), datetime.datetime(2024, 1, 1, 10, 0), 0.8),
+            UserAvailability(datetime.datetime(2024, 1, 1, 10, 0), datetime.datetime(2024, 1, 1, 11, 0), 0.6),
+            UserAvailability(datetime.datetime(2024, 1, 1, 14, 0), datetime.datetime(2024, 1, 1, 16, 0), 0.9)
+        ]
+        algorithm = AdaptiveSchedulingAlgorithm([], availability)
+
+        assert algorithm._is_time_available(datetime.datetime(2024, 1, 1, 9, 30), datetime.datetime(2024, 1, 1, 10, 30))
+        assert algorithm._is_time_available(datetime.datetime(2024, 1, 1, 13, 0), datetime.datetime(2024, 1, 1, 16, 0))
+        assert not algorithm._is_time_available(datetime.datetime(2024, 1, 1, 10, 30), datetime.datetime(2024, 1, 1, 13, 30))
+        assert not algorithm._is_time_available(datetime.datetime(2024, 1, 1, 8, 0), datetime.datetime(2024, 1, 1, 9, 30))
+
+        # The overlap takes the higher confidence
+        assert algorithm.availability_index.segments[-2:] == [
+            (datetime.datetime(2024, 1, 1, 13, 0), datetime.datetime(2024, 1, 1, 14, 0), 0.8),
+            (datetime.datetime(2024, 1, 1, 14, 0), datetime.datetime(2024, 1, 1, 16, 0), 0.9)
+        ]
+
+        algorithm.user_availability = availability[:1]
+        assert not algorithm._is_time_available(datetime.datetime(2024, 1, 1, 9, 30), datetime.datetime(2024, 1, 1, 10, 0))
+
+    def test_generate_schedule_allocates_without_overlap(self):
+        """Test that generated items take free time instead of stacking in one slot."""
+        items = [
+            ScheduleItem(id="basics", title="Basics", duration_minutes=60, priority=3),
+            ScheduleItem(id="advanced", title="Advanced", duration_minutes=90, priority=9,
+                         dependencies=["basics"]),
+            ScheduleItem(id="review", title="Review", duration_minutes=45, priority=6),
+            ScheduleItem(id="project", title="Project", duration_minutes=90, priority=8),
+            ScheduleItem(id="done", title="Done", duration_minutes=60, priority=10, completed=True)
+        ]
+        availability = [
+            UserAvailability(datetime.datetime(2024, 1, 1, 9, 0), datetime.datetime(2024, 1, 1, 12, 0), 0.9),
+            UserAvailability(datetime.datetime(2024, 1, 2, 9, 0), datetime.datetime(2024, 1, 2, 12, 0), 0.6)
+        ]
+
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+        algorithm.generate_schedule()
+        by_id = {item.id: item for item in items}
+
+        assert algorithm.detect_conflicts() == []
+        assert all(algorithm._is_time_available(item.start_time, item.end_time)
+                   for item in items if not item.completed)
+        assert by_id["advanced"].start_time >= by_id["basics"].end_time
+        assert by_id["done"].start_time is None
+        # The head of the longest dependency chain is placed first
+        assert by_id["basics"].start_time == datetime.datetime(2024, 1, 1, 9, 0)
+
+    def test_generate_schedule_keeps_valid_placements(self):
+        """Test that placements that still fit are kept and clashing ones are moved."""
+        items = [
+            ScheduleItem(id="item1", title="Task 1", duration_minutes=60, priority=8,
+                         start_time=datetime.datetime(2024, 1, 1, 14, 0),
+                         end_time=datetime.datetime(2024, 1, 1, 15, 0)),
+            ScheduleItem(id="item2", title="Task 2", duration_minutes=60, priority=4,
+                         start_time=datetime.datetime(2024, 1, 1, 14, 30),
+                         end_time=datetime.datetime(2024, 1, 1, 15, 30))
+        ]
+        availability = [UserAvailability(
+            datetime.datetime(2024, 1, 1, 9, 0),
+            datetime.datetime(2024, 1, 1, 17, 0),
+            0.8
+        )]
+
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+        algorithm.generate_schedule()
+
+        assert items[0].start_time == datetime.datetime(2024, 1, 1, 14, 0)
+        # The clashing item moves to the largest free fragment that is left
+        assert items[1].start_time == datetime.datetime(2024, 1, 1, 9, 0)
+        assert algorithm.detect_conflicts() == []
+
+    def test_generate_schedule_leaves_unplaceable_items_unscheduled(self):
+        """Test that items without room, and their dependents, are left unscheduled."""
+        items = [
+            ScheduleItem(id="long", title="Long", duration_minutes=600, priority=5),
+            ScheduleItem(id="after", title="After", duration_minutes=30, priority=5, dependencies=["long"]),
+            ScheduleItem(id="short", title="Short", duration_minutes=30, priority=5)
+        ]
+        availability = [UserAvailability(
+            datetime.datetime(2024, 1, 1, 9, 0),
+            datetime.datetime(2024, 1, 1, 17, 0),
+            0.8
+        )]
+
+        AdaptiveSchedulingAlgorithm(items, availability).generate_schedule()
+
+        assert items[0].start_time is None
+        assert items[1].start_time is None
+        assert items[2].start_time == datetime.datetime(2024, 1, 1, 9, 0)
+
+    def test_scheduling_order_follows_critical_path(self):
+        """Test that ready items are ordered by critical path, then priority."""
+        items = [
+            ScheduleItem(id="urgent", title="Urgent", duration_minutes=60, priority=10),
+            ScheduleItem(id="intro", title="Intro", duration_minutes=30, priority=2),
+            ScheduleItem(id="lab", title="Lab", duration_minutes=120, priority=3, dependencies=["intro"]),
+            ScheduleItem(id="exam", title="Exam", duration_minutes=60, priority=9, dependencies=["lab", "intro"]),
+            ScheduleItem(id="extra", title="Extra", duration_minutes=60, priority=4)
+        ]
+
+        algorithm = AdaptiveSchedulingAlgorithm(items, [])
+        order = [item.id for item in algorithm._scheduling_order(items)]
+
+        assert order == ["intro", "lab", "urgent", "exam", "extra"]
+
+    def test_generate_schedule_respects_dependencies(self):
+        """Test that prerequisites always finish before their dependents start."""
+        import random
+
+        rng = random.Random(11)
+        items = []
+        for i in range(300):
+            deps = [f"item{j}" for j in rng.sample(range(i), min(i, rng.randint(0, 3)))]
+            items.append(ScheduleItem(id=f"item{i}", title=f"Task {i}", duration_minutes=rng.choice([30, 45, 60]),
+                                      priority=rng.randint(1, 10), dependencies=deps))
+        rng.shuffle(items)
+        availability = [
+            UserAvailability(datetime.datetime(2024, 1, 1, 9, 0) + datetime.timedelta(days=day),
+                             datetime.datetime(2024, 1, 1, 17, 0) + datetime.timedelta(days=day),
+                             0.9 if day % 7 < 5 else 0.6)
+            for day in range(60)
+        ]
+
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+        algorithm.generate_schedule()
+        by_id = {item.id: item for item in items}
+
+        assert all(item.start_time is not None for item in items)
+        assert algorithm.detect_conflicts() == []
+        for item in items:
+            for dep in item.dependencies:
+                assert by_id[dep].end_time <= item.start_time
+
+    def test_generate_schedule_optimal_mode(self):
+        """Test that the solver places what the greedy allocator cannot."""
+        pytest.importorskip("ortools")
+
+        items = [
+            ScheduleItem(id="project", title="Project", duration_minutes=120, priority=5),
+            ScheduleItem(id="lecture", title="Lecture", duration_minutes=90, priority=5),
+            ScheduleItem(id="exercises", title="Exercises", duration_minutes=90, priority=5)
+        ]
+        availability = [
+            UserAvailability(datetime.datetime(2024, 1, 1, 9, 0), datetime.datetime(2024, 1, 1, 12, 0), 0.9),
+            UserAvailability(datetime.datetime(2024, 1, 1, 13, 0), datetime.datetime(2024, 1, 1, 15, 0), 0.8)
+        ]
+
+        import copy
+
+        heuristic = AdaptiveSchedulingAlgorithm([copy.copy(item) for item in items], availability)
+        heuristic.generate_schedule()
+        assert heuristic.learning_items[2].start_time is None
+        assert heuristic.last_solve_report is None
+
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+        algorithm.generate_schedule(mode="optimal", time_limit_seconds=5)
+
+        assert items[0].start_time == datetime.datetime(2024, 1, 1, 13, 0)
+        assert {items[1].start_time, items[2].start_time} == {
+            datetime.datetime(2024, 1, 1, 9, 0), datetime.datetime(2024, 1, 1, 10, 30)
+        }
+        assert algorithm.last_solve_report['status'] == 'optimal'
+        assert algorithm.last_solve_report['gap'] == 0
+        assert algorithm.last_solve_report['scheduled_items'] == 3
+
+    def test_generate_schedule_optimal_mode_meets_deadlines(self):
+        """Test that the solver respects dependencies and prefers meeting deadlines."""
+        pytest.importorskip("ortools")
+
+        items = [
+            ScheduleItem(id="intro", title="Intro", duration_minutes=60, priority=5),
+            ScheduleItem(id="lab", title="Lab", duration_minutes=60, priority=5, dependencies=["intro"],
+                         deadline=datetime.datetime(2024, 1, 1, 12, 0)),
+            ScheduleItem(id="reading", title="Reading", duration_minutes=60, priority=5)
+        ]
+        availability = [
+            UserAvailability(datetime.datetime(2024, 1, 1, 9, 0), datetime.datetime(2024, 1, 1, 12, 0), 0.5),
+            UserAvailability(datetime.datetime(2024, 1, 2, 9, 0), datetime.datetime(2024, 1, 2, 12, 0), 0.9)
+        ]
+
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+        algorithm.generate_schedule(mode="optimal", time_limit_seconds=5)
+
+        assert items[1].end_time <= datetime.datetime(2024, 1, 1, 12, 0)
+        assert items[0].end_time <= items[1].start_time
+        assert algorithm.detect_conflicts() == []
+
+        with pytest.raises(ValueError):
+            algorithm.generate_schedule(mode="exact")
+
     def test_reschedule_based_on_progress(self):
         """Test rescheduling based on progress changes."""
         item = ScheduleItem(
@@ -159,6 +517,90 @@ class TestAdaptiveSchedulingAlgorithm:
 
         assert updated_items[0].progress_percentage == 40.0
 
+    def test_item_indexes_follow_mutations(self):
+        """Test that ID and dependent lookups stay current as items change."""
+        items = [
+            ScheduleItem(id="intro", title="Intro", duration_minutes=30, priority=5),
+            ScheduleItem(id="lab", title="Lab", duration_minutes=60, priority=5, dependencies=["intro"]),
+            ScheduleItem(id="exam", title="Exam", duration_minutes=60, priority=5, dependencies=["lab"])
+        ]
+        algorithm = AdaptiveSchedulingAlgorithm(items, [])
+
+        assert algorithm.get_item("lab") is items[1]
+        assert algorithm.get_item("missing") is None
+        assert algorithm.get_dependents("intro") == [items[1]]
+
+        items[2].dependencies = ["intro", "lab"]
+        items[1].completed = True
+        assert algorithm.get_dependents("intro") == [items[2]]
+        assert algorithm.get_dependents("lab") == [items[2]]
+
+        items.append(ScheduleItem(id="project", title="Project", duration_minutes=90, priority=5,
+                                  dependencies=["exam"]))
+        assert algorithm.get_item("project") is items[3]
+        assert algorithm.get_dependents("exam") == [items[3]]
+
+        items[0] = ScheduleItem(id="welcome", title="Welcome", duration_minutes=15, priority=5)
+        algorithm.learning_items = items
+        assert algorithm.get_item("welcome") is items[0]
+        assert algorithm.get_item("intro") is None
+
+    def test_reschedule_item_moves_only_affected_items(self):
+        """Test that a longer item only pushes its dependents and lower-priority neighbours."""
+        day = datetime.datetime(2024, 1, 1)
+        items = [
+            ScheduleItem(id="lesson", title="Lesson", duration_minutes=60, priority=8,
+                         start_time=day.replace(hour=9), end_time=day.replace(hour=10)),
+            ScheduleItem(id="quiz", title="Quiz", duration_minutes=30, priority=5, dependencies=["lesson"],
+                         start_time=day.replace(hour=10, minute=30), end_time=day.replace(hour=11)),
+            ScheduleItem(id="reading", title="Reading", duration_minutes=30, priority=3,
+                         start_time=day.replace(hour=10), end_time=day.replace(hour=10, minute=30)),
+            ScheduleItem(id="lab", title="Lab", duration_minutes=60, priority=9,
+                         start_time=day.replace(hour=13), end_time=day.replace(hour=14)),
+            ScheduleItem(id="notes", title="Notes", duration_minutes=30, priority=4,
+                         start_time=day.replace(hour=15), end_time=day.replace(hour=15, minute=30))
+        ]
+        availability = [UserAvailability(day.replace(hour=9), day.replace(hour=17), 0.8)]
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+
+        changes = algorithm.reschedule_item("lesson", 120)
+        by_id = {item.id: item for item in items}
+
+        assert {change['id'] for change in changes} == {"lesson", "quiz", "reading"}
+        assert by_id["lesson"].start_time == day.replace(hour=9)
+        assert by_id["lesson"].end_time == day.replace(hour=11)
+        assert by_id["quiz"].start_time >= by_id["lesson"].end_time
+        assert by_id["lab"].start_time == day.replace(hour=13)
+        assert by_id["notes"].start_time == day.replace(hour=15)
+        assert algorithm.detect_conflicts() == []
+
+        lesson_change = next(change for change in changes if change['id'] == "lesson")
+        assert lesson_change['previous_end_time'] == day.replace(hour=10)
+        assert lesson_change['end_time'] == day.replace(hour=11)
+
+    def test_reschedule_item_moves_item_past_higher_priority_neighbour(self):
+        """Test that an item moves instead of displacing a higher-priority neighbour."""
+        day = datetime.datetime(2024, 1, 1)
+        items = [
+            ScheduleItem(id="reading", title="Reading", duration_minutes=60, priority=3,
+                         start_time=day.replace(hour=9), end_time=day.replace(hour=10)),
+            ScheduleItem(id="lab", title="Lab", duration_minutes=60, priority=9,
+                         start_time=day.replace(hour=10), end_time=day.replace(hour=11))
+        ]
+        availability = [UserAvailability(day.replace(hour=9), day.replace(hour=17), 0.8)]
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+
+        algorithm.reschedule_based_on_progress("reading", 0.0)
+        assert algorithm.last_changes == []
+
+        items[0].progress_percentage = 50.0
+        algorithm.reschedule_based_on_progress("reading", 20.0)
+
+        assert items[0].duration_minutes == 75
+        assert [change['id'] for change in algorithm.last_changes] == ["reading"]
+        assert items[0].start_time == day.replace(hour=11)
+        assert items[1].start_time == day.replace(hour=10)
+
     def test_reschedule_based_on_availability(self):
         """Test rescheduling based on availability changes."""
         item = ScheduleItem(
@@ -184,6 +626,7 @@ class TestAdaptiveSchedulingAlgorithm:
 
         # Item should be rescheduled since old slot is no longer available
         assert len(updated_items) == 1
+        assert updated_items[0].start_time == datetime.datetime(2024, 1, 1, 12, 0)
 
     def test_generate_schedule(self):
         """Test schedule generation."""
@@ -234,6 +677,85 @@ class TestAdaptiveScheduler:
         assert scheduler.algorithm is not None
         assert len(scheduler.scheduled_items) == 2
 
+    def test_initialize_scheduler_with_recurring_sessions(self):
+        """Test that items with an RRULE become recurring sessions."""
+        calendar = Mock()
+        calendar.authenticate.return_value = False
+
+        scheduler = AdaptiveScheduler(calendar_integration=calendar)
+        success = scheduler.initialize_scheduler([
+            {"id": "slam", "title": "SLAM", "duration_minutes": 30, "recurrence": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+             "start_time": "2024-01-01T09:00:00"},
+            {"id": "item-1", "title": "Python Basics", "duration_minutes": 60}
+        ])
+
+        assert success is True
+        assert [item.id for item in scheduler.scheduled_items] == ["item-1"]
+        assert scheduler.recurring_items[0].start_time == datetime.datetime(2024, 1, 1, 9, 0,
+                                                                            tzinfo=datetime.timezone.utc)
+        assert scheduler.algorithm.recurring_items == scheduler.recurring_items
+
+    def test_naive_deadline_is_read_as_utc(self):
+        """Test that a plain ISO deadline works in heuristic and optimal runs."""
+        calendar = Mock()
+        calendar.authenticate.return_value = False
+
+        scheduler = AdaptiveScheduler(calendar_integration=calendar)
+        assert scheduler.initialize_scheduler([
+            {"id": "a", "title": "A", "duration_minutes": 60, "deadline": "2030-01-01T00:00:00"},
+            {"id": "b", "title": "B", "duration_minutes": 60, "dependencies": ["a"]}
+        ])
+        assert scheduler.scheduled_items[0].deadline == datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc)
+
+        heuristic = scheduler.generate_schedule()
+        optimal = scheduler.generate_schedule(mode="optimal", time_limit_seconds=5)
+
+        for result in (heuristic, optimal):
+            assert all(datetime.datetime.fromisoformat(item['start_time']).tzinfo is not None for item in result)
+
+    def test_availability_from_busy_times(self):
+        """Test that busy periods are cut out of working hours as maximal free intervals."""
+        utc = datetime.timezone.utc
+        monday = datetime.datetime(2024, 1, 1, 0, 0, tzinfo=utc)
+        busy_times = [
+            {"start": "2024-01-01T12:00:00Z", "end": "2024-01-01T13:00:00Z"},
+            {"start": "2024-01-01T12:30:00Z", "end": "2024-01-01T14:00:00Z"},
+            {"start": "2024-01-02T08:00:00Z", "end": "2024-01-02T10:00:00Z"},
+            {"start": "2024-01-02T16:00:00+00:00", "end": "2024-01-03T09:30:00+00:00"},
+            {"start": "2024-01-06T11:00:00Z"}
+        ]
+
+        scheduler = AdaptiveScheduler(calendar_integration=Mock())
+        scheduler._calculate_availability_from_busy_times(busy_times, monday, monday + datetime.timedelta(days=7))
+        slots = [(slot.start_time, slot.end_time, slot.confidence) for slot in scheduler.user_availability]
+
+        def at(day, hour, minute=0):
+            return datetime.datetime(2024, 1, day, hour, minute, tzinfo=utc)
+
+        assert slots[:4] == [
+            (at(1, 9), at(1, 12), 0.8),
+            (at(1, 14), at(1, 17), 0.8),
+            (at(2, 10), at(2, 16), 0.8),
+            (at(3, 9, 30), at(3, 17), 0.8)
+        ]
+        assert slots[-2:] == [(at(6, 10), at(6, 16), 0.6), (at(7, 10), at(7, 16), 0.6)]
+        assert len(slots) == 8
+
+    def test_availability_supports_long_horizons(self):
+        """Test that a semester horizon with custom working hours is handled directly."""
+        utc = datetime.timezone.utc
+        start = datetime.datetime(2024, 1, 1, 10, 30, tzinfo=utc)
+        template = {weekday: [(datetime.time(8, 0), datetime.time(12, 0), 0.9),
+                              (datetime.time(18, 0), datetime.time(20, 0), 0.5)] for weekday in range(5)}
+
+        scheduler = AdaptiveScheduler(calendar_integration=Mock(), working_hours=template, horizon_days=120)
+        scheduler._calculate_availability_from_busy_times([], start, start + datetime.timedelta(days=120))
+
+        assert scheduler.user_availability[0].start_time == start
+        assert scheduler.user_availability[0].end_time == datetime.datetime(2024, 1, 1, 12, 0, tzinfo=utc)
+        assert len(scheduler.user_availability) == 2 * 87 - 1
+        assert all(slot.start_time.weekday() < 5 for slot in scheduler.user_availability)
+
     def test_generate_schedule(self, sample_learning_items):
         """Test schedule generation."""
         scheduler = AdaptiveScheduler()
@@ -269,4 +791,439 @@ class TestAdaptiveScheduler:
         assert isinstance(summary, dict)
         assert "total_items" in summary
         assert "completed_items" in summary
-        assert "completion_percentage" in summary
\ No newline at end of file
+        assert "completion_percentage" in summary
+
+class TestBatchScheduler:
+    """Test multi-user batch scheduling."""
+
+    @staticmethod
+    def _user(index):
+        day = datetime.datetime(2024, 1, 1 + index % 5, tzinfo=datetime.timezone.utc)
+        items = [
+            ScheduleItem(id="basics", title="Basics", duration_minutes=60, priority=5),
+            ScheduleItem(id="advanced", title="Advanced", duration_minutes=45 + index, priority=7,
+                         dependencies=["basics"], deadline=day.replace(hour=15)),
+            ScheduleItem(id="done", title="Done", duration_minutes=30, priority=9, completed=True)
+        ]
+        availability = [
+            UserAvailability(day.replace(hour=9), day.replace(hour=12), 0.9),
+            UserAvailability(day.replace(hour=13), day.replace(hour=17), 0.7)
+        ]
+        return f"user{index}", items, availability
+
+    def test_pack_round_trip(self):
+        """Test that packing keeps everything the algorithm needs."""
+        user_id, items, availability = self._user(2)
+        items[0].start_time = datetime.datetime(2024, 1, 3, 9, 0, tzinfo=datetime.timezone.utc)
+        items[0].end_time = datetime.datetime(2024, 1, 3, 10, 0, tzinfo=datetime.timezone.utc)
+
+        packed = pack_user_schedule(user_id, items, availability)
+        unpacked_items, unpacked_availability = unpack_user_schedule(packed)
+
+        assert packed['start'].dtype.name == 'int64'
+        assert list(packed['dep_indptr']) == [0, 0, 1, 1]
+        for original, unpacked in zip(items, unpacked_items):
+            assert (unpacked.id, unpacked.duration_minutes, unpacked.priority, unpacked.dependencies,
+                    unpacked.completed, unpacked.start_time, unpacked.end_time, unpacked.deadline) == \
+                   (original.id, original.duration_minutes, original.priority, original.dependencies,
+                    original.completed, original.start_time, original.end_time, original.deadline)
+        assert [(slot.start_time, slot.end_time) for slot in unpacked_availability] == \
+               [(slot.start_time, slot.end_time) for slot in availability]
+
+    def test_pack_leaves_items_bound_where_they_are(self):
+        """Test that packing never rebinds the caller's items or their dirty rows."""
+        user_id, items, availability = self._user(1)
+        pack_user_schedule(user_id, items, availability)
+        assert all(item._table is None for item in items)
+
+        table = ScheduleTable.adopt(items)
+        table.clear_dirty()
+        items[1].priority = 3
+        subset = items[1:]
+
+        packed = pack_user_schedule(user_id, subset, availability)
+
+        assert packed['ids'] == ["advanced", "done"]
+        assert all(item._table is table for item in items)
+        assert [item._row for item in items] == [0, 1, 2]
+        assert table.dirty_rows() == [1]
+
+    def test_schedule_users_matches_single_user_scheduling(self):
+        """Test that batch results match scheduling each user in process."""
+        users = [self._user(index) for index in range(7)]
+        progress = []
+        written = []
+
+        batch = BatchScheduler(max_workers=2, shard_size=3, progress_callback=lambda done, total: progress.append((done, total)),
+                               writer=written.extend)
+        summary = batch.schedule_users(users)
+
+        assert summary['scheduled'] == 7
+        assert summary['timed_out'] == [] and summary['failed'] == []
+        assert sorted(progress)[-1] == (7, 7)
+        assert len(progress) == 3
+
+        results = {entry['user_id']: entry['placements'] for entry in written}
+        for user_id, items, availability in users:
+            AdaptiveSchedulingAlgorithm(items, availability).generate_schedule()
+            assert results[user_id] == {item.id: (item.start_time, item.end_time) for item in items}
+
+    def test_schedule_users_reports_timeouts(self):
+        """Test that users a shard could not reach within its budget are reported."""
+        users = [self._user(index) for index in range(4)]
+
+        summary = BatchScheduler(max_workers=1, shard_size=4, shard_timeout=0).schedule_users(users)
+
+        assert summary['scheduled'] == 0
+        assert sorted(summary['timed_out']) == ["user0", "user1", "user2", "user3"]
+        assert summary['results'] == {}
+
+    def test_hung_workers_are_terminated(self):
+        """Test that a worker stuck past the batch budget doesn't outlive it."""
+        import multiprocessing
+        users = [self._user(index) for index in range(2)]
+
+        with patch('robomentor_app.backend.core.adaptive_scheduler.batch._schedule_shard', _hang_shard), \
+                patch('robomentor_app.backend.core.adaptive_scheduler.batch.POOL_GRACE_SECONDS', 0.5):
+            summary = BatchScheduler(max_workers=1, shard_timeout=0).schedule_users(users, time_limit_seconds=0)
+
+        assert sorted(summary['timed_out']) == ["user0", "user1"]
+        assert multiprocessing.active_children() == []
+
+    def test_results_are_written_to_the_store(self, db_session_factory):
+        """Test that the store writer saves only the moved placements and bumps versions."""
+        store = ScheduleStore(db_session_factory)
+        users = [self._user(index) for index in range(3)]
+        for user_id, items, availability in users:
+            store.save(user_id, items, availability)
+
+        summary = BatchScheduler(max_workers=2, shard_size=2, writer=store.save_placements).schedule_users(
+            (user_id, store.load(user_id)['items'], availability) for user_id, _, availability in users
+        )
+
+        assert summary['scheduled'] == 3 and summary['failed'] == []
+        for user_id, items, availability in users:
+            AdaptiveSchedulingAlgorithm(items, availability).generate_schedule()
+            stored = store.load(user_id)
+            assert stored['version'] == 2
+            assert {item.id: (item.start_time, item.end_time) for item in stored['items']} == \
+                   {item.id: (item.start_time, item.end_time) for item in items}
+            # The completed item kept its (empty) placement, so only two rows were rewritten
+            assert sorted(item.id for item in store.load(user_id, since_version=1)['items']) == \
+                   ["advanced", "basics"]
+
+        with pytest.raises(ValueError):
+            store.save_placements([{'user_id': "nobody", 'placements': {}}])
+
+
+def _hang_shard(*args):
+    """Stand-in shard worker that never finishes within a test's budget."""
+    import time
+    time.sleep(60)
+
+
+class TestRecurringItem:
+    """Test recurring session expansion and scheduling around it."""
+
+    def test_occurrences_are_expanded_lazily(self):
+        """Test that an unbounded rule only yields the occurrences in the window."""
+        weekdays = RecurringItem(id="slam", title="SLAM", duration_minutes=30, priority=5,
+                                 rule="FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+                                 start_time=datetime.datetime(2024, 1, 1, 18, 0),
+                                 exclusions=[datetime.datetime(2024, 1, 3, 18, 0)])
+        every_other_day = RecurringItem(id="ros", title="ROS", duration_minutes=60, priority=5,
+                                        rule="FREQ=DAILY;INTERVAL=2",
+                                        start_time=datetime.datetime(2024, 1, 1, 18, 15))
+
+        occurrences = list(expand_recurring([weekdays, every_other_day],
+                                            datetime.datetime(2024, 1, 1, 18, 20), datetime.datetime(2024, 1, 6)))
+
+        assert [(start.day, start.hour, start.minute, template.id) for start, _, template in occurrences] == [
+            (1, 18, 0, "slam"), (1, 18, 15, "ros"), (2, 18, 0, "slam"), (3, 18, 15, "ros"), (4, 18, 0, "slam"),
+            (5, 18, 0, "slam"), (5, 18, 15, "ros")
+        ]
+        assert occurrences[1][1] == datetime.datetime(2024, 1, 1, 19, 15)
+
+        with pytest.raises(ValueError):
+            RecurringItem(id="bad", title="Bad", duration_minutes=30, priority=5, rule="FREQ=SOMETIMES",
+                          start_time=datetime.datetime(2024, 1, 1))
+
+    def test_generate_schedule_avoids_recurring_sessions(self):
+        """Test that one-off items are placed around recurring sessions."""
+        day = datetime.datetime(2024, 1, 1)
+        standup = RecurringItem(id="standup", title="Standup", duration_minutes=30, priority=5,
+                                rule="FREQ=DAILY", start_time=day.replace(hour=10))
+        items = [
+            ScheduleItem(id="reading", title="Reading", duration_minutes=60, priority=5),
+            ScheduleItem(id="lab", title="Lab", duration_minutes=90, priority=5)
+        ]
+        availability = [UserAvailability(day.replace(hour=9), day.replace(hour=12), 0.8)]
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability, [standup])
+
+        algorithm.generate_schedule()
+
+        assert {(item.start_time, item.end_time) for item in items} == {
+            (day.replace(hour=9), day.replace(hour=10)),
+            (day.replace(hour=10, minute=30), day.replace(hour=12))
+        }
+        assert algorithm.detect_conflicts() == []
+
+    def test_detect_conflicts_with_recurring_sessions(self):
+        """Test that items overlapping an occurrence are reported."""
+        day = datetime.datetime(2024, 1, 1)
+        standup = RecurringItem(id="standup", title="Standup", duration_minutes=30, priority=5,
+                                rule="FREQ=DAILY", start_time=day.replace(hour=10))
+        items = [ScheduleItem(id="lab", title="Lab", duration_minutes=60, priority=5,
+                              start_time=datetime.datetime(2024, 1, 2, 9, 45),
+                              end_time=datetime.datetime(2024, 1, 2, 10, 45))]
+        availability = [UserAvailability(day.replace(hour=9), day.replace(day=3, hour=17), 0.8)]
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability, [standup])
+
+        conflicts = algorithm.detect_conflicts()
+
+        assert [conflict['items'] for conflict in conflicts] == [["lab", "standup@2024-01-02T10:00:00"]]
+        assert conflicts[0]['type'] == ConflictType.TIME_OVERLAP
+
+
+class TestScheduleStore:
+    """Test schedule persistence."""
+
+    @staticmethod
+    def _schedule(day=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)):
+        items = [
+            ScheduleItem(id="basics", title="Basics", duration_minutes=60, priority=5,
+                         start_time=day.replace(hour=9), end_time=day.replace(hour=10)),
+            ScheduleItem(id="advanced", title="Advanced", duration_minutes=90, priority=7,
+                         dependencies=["basics"], deadline=day.replace(hour=17)),
+            ScheduleItem(id="review", title="Review", duration_minutes=30, priority=3,
+                         completed=True, progress_percentage=100.0)
+        ]
+        availability = [UserAvailability(day.replace(hour=9), day.replace(hour=17), 0.8)]
+        return items, availability
+
+    def test_save_and_load_round_trip(self, db_session_factory):
+        """Test that a saved schedule loads back unchanged."""
+        store = ScheduleStore(db_session_factory)
+        items, availability = self._schedule()
+
+        assert store.load("user1") is None
+        assert store.save("user1", items, availability) == 1
+
+        stored = store.load("user1")
+        assert stored['version'] == 1
+        assert sorted(stored['items'], key=lambda item: item.id) == sorted(items, key=lambda item: item.id)
+        assert stored['availability'] == availability
+
+    def test_save_writes_only_changed_items(self, db_session_factory):
+        """Test that saves after a load only write dirty rows."""
+        store = ScheduleStore(db_session_factory)
+        items, availability = self._schedule()
+        store.save("user1", items, availability)
+
+        loaded = store.load("user1")['items']
+        assert loaded[0]._table.dirty_rows() == []
+        advanced = next(item for item in loaded if item.id == "advanced")
+        advanced.progress_percentage = 40.0
+        loaded[0].title = loaded[0].title  # Writing an unchanged value keeps the row clean
+
+        assert store.save("user1", loaded) == 2
+        changed = store.load("user1", since_version=1)
+        assert [item.id for item in changed['items']] == ["advanced"]
+        assert changed['items'][0].progress_percentage == 40.0
+        assert changed['availability'] == availability
+
+    def test_save_rejects_stale_version(self, db_session_factory):
+        """Test optimistic versioning between concurrent writers."""
+        store = ScheduleStore(db_session_factory)
+        items, availability = self._schedule()
+        store.save("user1", items, availability)
+        store.save("user1", store.load("user1")['items'], expected_version=1)
+
+        with pytest.raises(ValueError):
+            store.save("user1", items, expected_version=1)
+
+    def test_racing_first_saves_conflict(self, db_session_factory):
+        """Test that losing a race to create the schedule is a version conflict."""
+        store = ScheduleStore(db_session_factory)
+        items, availability = self._schedule()
+
+        def racing_session():
+            session = db_session_factory()
+            execute = session.execute
+
+            def execute_after_rival(statement, *args, **kwargs):
+                if getattr(statement, 'is_insert', False) and statement.table.name == "schedules":
+                    session.execute = execute
+                    store.save("user1", self._schedule()[0])  # The rival's first save commits first
+                return execute(statement, *args, **kwargs)
+
+            session.execute = execute_after_rival
+            return session
+
+        with pytest.raises(ValueError, match="concurrently"):
+            ScheduleStore(racing_session).save("user1", items, availability)
+        assert store.load("user1")['version'] == 1
+
+    def test_load_is_one_query(self, db_session_factory):
+        """Test that loading a schedule runs a single statement."""
+        from sqlalchemy import event
+
+        store = ScheduleStore(db_session_factory)
+        items, availability = self._schedule()
+        store.save("user1", items, availability)
+        engine = db_session_factory.kw['bind']
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            store.load("user1")
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert len(statements) == 1
+
+    @staticmethod
+    def _future_day():
+        today = datetime.datetime.now(datetime.timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        return today + datetime.timedelta(days=2)
+
+    def test_scheduler_adds_items_to_stored_schedule(self, db_session_factory):
+        """Test that scheduling into a stored schedule keeps existing placements."""
+        store = ScheduleStore(db_session_factory)
+        items, availability = self._schedule(self._future_day())
+        store.save("user1", items, availability)
+
+        scheduler = AdaptiveScheduler(calendar_integration=Mock(), store=store)
+        assert scheduler.load_schedule("user1")
+        added = scheduler.add_items([{"id": "lab", "title": "Lab", "duration_minutes": 45}])
+
+        assert added[0]['start_time'] is not None
+        # Only the new item and the newly placed one are written; kept placements stay clean
+        dirty = [scheduler.scheduled_items[row].id for row in scheduler.algorithm.table.dirty_rows()]
+        assert sorted(dirty) == ["advanced", "lab"]
+        assert scheduler.save_schedule("user1") == 2
+
+        stored = store.load("user1")
+        assert {item.id for item in stored['items']} == {"basics", "advanced", "review", "lab"}
+        basics = next(item for item in stored['items'] if item.id == "basics")
+        assert basics.start_time == items[0].start_time
+
+    def test_stale_availability_is_recomputed_on_load(self, db_session_factory):
+        """Test that an old snapshot is reloaded, so new items aren't placed in the past."""
+        store = ScheduleStore(db_session_factory)
+        items, availability = self._schedule()
+        store.save("user1", items, availability,
+                   availability_captured_at=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc))
+        provider = Mock()
+        provider.busy_periods.return_value = []
+        before = datetime.datetime.now(datetime.timezone.utc)
+
+        scheduler = AdaptiveScheduler(calendar_integration=Mock(), store=store, availability_provider=provider)
+        assert scheduler.load_schedule("user1")
+        provider.busy_periods.assert_called_once()
+        added = scheduler.add_items([{"id": "lab", "title": "Lab", "duration_minutes": 45}])
+        assert datetime.datetime.fromisoformat(added[0]['start_time']) >= before
+
+        scheduler.save_schedule("user1")
+        assert store.load("user1")['availability_captured_at'] >= before.replace(tzinfo=None)
+
+    def test_fresh_availability_is_trimmed_and_kept(self, db_session_factory):
+        """Test that a recent snapshot is reused from now on and its capture time isn't re-stamped."""
+        store = ScheduleStore(db_session_factory)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        items, availability = self._schedule(self._future_day())
+        availability = [UserAvailability(now - datetime.timedelta(hours=3), now - datetime.timedelta(hours=2), 0.8),
+                        UserAvailability(now - datetime.timedelta(hours=1), now + datetime.timedelta(hours=1), 0.8),
+                        *availability]
+        captured_at = now - datetime.timedelta(minutes=10)
+        store.save("user1", items, availability, availability_captured_at=captured_at)
+        provider = Mock()
+
+        scheduler = AdaptiveScheduler(calendar_integration=Mock(), store=store, availability_provider=provider)
+        assert scheduler.load_schedule("user1")
+        provider.busy_periods.assert_not_called()
+        assert len(scheduler.user_availability) == 2
+        assert scheduler.user_availability[0].start_time >= now
+        assert scheduler.user_availability[0].end_time == now + datetime.timedelta(hours=1)
+
+        scheduler.add_items([{"id": "lab", "title": "Lab", "duration_minutes": 45}])
+        scheduler.save_schedule("user1")
+        stored = store.load("user1")
+        assert stored['availability_captured_at'] == captured_at.replace(tzinfo=None)
+        assert stored['availability'] == availability
+
+
+class TestSimulation:
+    """Test what-if simulation on schedule clones."""
+
+    @staticmethod
+    def _algorithm():
+        monday = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        items = [
+            ScheduleItem(id="basics", title="Basics", duration_minutes=120, priority=5),
+            ScheduleItem(id="advanced", title="Advanced", duration_minutes=180, priority=7, dependencies=["basics"]),
+            ScheduleItem(id="project", title="Project", duration_minutes=240, priority=6, dependencies=["advanced"]),
+            ScheduleItem(id="review", title="Review", duration_minutes=60, priority=3)
+        ]
+        availability = [
+            UserAvailability(monday + datetime.timedelta(days=day, hours=9),
+                             monday + datetime.timedelta(days=day, hours=13), 0.8)
+            for day in range(14)
+        ]
+        algorithm = AdaptiveSchedulingAlgorithm(items, availability)
+        algorithm.generate_schedule()
+        algorithm.table.clear_dirty()
+        return algorithm
+
+    def test_clone_is_independent(self):
+        """Test that changing a clone leaves the original items and their dirty rows alone."""
+        algorithm = self._algorithm()
+        before = [copy.copy(item) for item in algorithm.learning_items]
+
+        clone = algorithm.clone()
+        clone.get_item("basics").title = "Renamed"
+        clone.get_item("review").dependencies = ["extra"]
+        clone.get_item("advanced").start_time = None
+
+        assert algorithm.learning_items == before
+        assert algorithm.table.dirty_rows() == []
+        assert clone.get_item("basics").title == "Renamed"
+        assert clone.table.dirty_rows() == [0, 1, 3]
+
+    def test_cap_weekly_hours(self):
+        """Test that availability is cut to the weekly budget, most confident first."""
+        monday = datetime.datetime(2024, 1, 1)
+        windows = [
+            (monday.replace(hour=9), monday.replace(hour=12), 0.5),
+            (monday.replace(day=2, hour=9), monday.replace(day=2, hour=12), 0.9),
+            (monday.replace(day=8, hour=9), monday.replace(day=8, hour=10), 0.5)
+        ]
+
+        assert cap_weekly_hours(windows, 4) == [
+            (monday.replace(hour=9), monday.replace(hour=10), 0.5),
+            (monday.replace(day=2, hour=9), monday.replace(day=2, hour=12), 0.9),
+            (monday.replace(day=8, hour=9), monday.replace(day=8, hour=10), 0.5)
+        ]
+
+    def test_simulate_scenarios(self):
+        """Test that scenarios are compared without touching the live schedule."""
+        algorithm = self._algorithm()
+        before = [copy.copy(item) for item in algorithm.learning_items]
+
+        baseline, fewer_hours, dropped, unknown = simulate_scenarios(algorithm, [
+            {'name': "current"},
+            {'name': "4 h/week", 'hours_per_week': 4},
+            {'name': "no project", 'drop_items': ["project"]},
+            {'name': "typo", 'drop_items': ["projcet"]}
+        ], max_workers=4)
+
+        assert algorithm.learning_items == before
+        assert algorithm.table.dirty_rows() == []
+
+        assert baseline['name'] == "current"
+        assert baseline['unscheduled_minutes'] == 0 and baseline['conflict_count'] == 0
+        assert baseline['completion_date'] == max(item.end_time for item in before)
+        assert fewer_hours['scheduled_minutes'] < baseline['scheduled_minutes']
+        assert fewer_hours['completion_date'] > baseline['completion_date']
+        assert dropped['scheduled_minutes'] == baseline['scheduled_minutes'] - 240
+        assert "projcet" in unknown['error']
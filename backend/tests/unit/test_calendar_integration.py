@@ -0,0 +1,932 @@
+"""
+Unit tests for Calendar Integration module components.
+"""
+
+import pytest
+import datetime
+import itertools
+import json
+import os
+import threading
+import tracemalloc
+import httplib2
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+from ...integrations.calendar_integration import google_calendar
+from ...integrations.calendar_integration.google_calendar import GoogleCalendarIntegration
+from ...integrations.calendar_integration.ics import IcsAvailabilityProvider
+from ...integrations.calendar_integration.sync import CalendarSync
+from ...core.adaptive_scheduler.algorithms import AdaptiveSchedulingAlgorithm, ScheduleItem
+from ...core.adaptive_scheduler.scheduler import AdaptiveScheduler
+
+
+def _event(event_id, day, start_hour, end_hour, **fields):
+    return {
+        'id': event_id,
+        'status': 'confirmed',
+        'start': {'dateTime': f"2024-01-{day:02d}T{start_hour:02d}:00:00Z"},
+        'end': {'dateTime': f"2024-01-{day:02d}T{end_hour:02d}:00:00Z"},
+        **fields
+    }
+
+
+class FakeEventsService:
+    """Serves events.list pages like the Calendar API, with sync tokens."""
+
+    def __init__(self, page_size=2, time_zone=None):
+        self.page_size = page_size
+        self.time_zone = time_zone
+        self.stored = {}
+        self.changes = []  # Event IDs in change order
+        self.expired_tokens = set()
+        self.requests = []
+
+    def put(self, event):
+        self.stored[event['id']] = event
+        self.changes.append(event['id'])
+
+    def cancel(self, event_id):
+        self.stored[event_id] = {'id': event_id, 'status': 'cancelled'}
+        self.changes.append(event_id)
+
+    # Service surface used by GoogleCalendarIntegration
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.requests.append(params)
+        return Mock(execute=lambda: self._page(params))
+
+    def get(self, calendarId, eventId):
+        return Mock(execute=lambda: self.stored[eventId])
+
+    def _page(self, params):
+        token = params.get('syncToken')
+        if token in self.expired_tokens:
+            raise HttpError(httplib2.Response({'status': 410}), b'Sync token is no longer valid')
+
+        if token:
+            # Changed events since the token, latest version of each
+            ids = list(dict.fromkeys(self.changes[int(token):]))
+            matching = [self.stored[event_id] for event_id in ids]
+        else:
+            matching = [event for event in self.stored.values() if event.get('status') != 'cancelled']
+
+        offset = int(params.get('pageToken') or 0)
+        page = {'items': matching[offset:offset + self.page_size]}
+        if offset + self.page_size < len(matching):
+            page['nextPageToken'] = str(offset + self.page_size)
+        else:
+            page['nextSyncToken'] = str(len(self.changes))
+        if self.time_zone:
+            page['timeZone'] = self.time_zone
+        return page
+
+
+class FakeCalendarServer:
+    """
+    Local HTTP server speaking enough of the Calendar API for event writes.
+
+    Events carry numbered ETags that PATCH increments, and If-Match
+    preconditions are enforced. Free/busy queries answer from ``busy``
+    (calendar ID to (start, end) strings), with an error for calendars in
+    ``unavailable_calendars``. ``failures`` maps an event summary or ID to statuses returned on its
+    next attempts; ``failed_batches`` makes whole batch requests fail.
+    Summaries in ``lost_replies`` are written but answered with a 503 once,
+    like a response lost after the server applied the request. A free/busy
+    query for a calendar in ``dropped_calendars`` gets its connection closed
+    without a reply.
+    """
+
+    def __init__(self):
+        self.events = {}
+        self.failures = {}
+        self.failed_batches = 0
+        self.lost_replies = set()
+        self.batch_sizes = []
+        self.requests = []  # (method, path, If-Match, body) of every event request
+        self.busy = {}
+        self.unavailable_calendars = set()
+        self.dropped_calendars = set()
+        self.free_busy_queries = []  # Calendar IDs of each free/busy query
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                if self.path != '/batch/calendar/v3':
+                    self._single('POST', body)
+                    return
+                with server._lock:
+                    content, content_type = server._batch(self.headers['Content-Type'], body)
+                self._reply(200 if content_type else 503, content, content_type or 'application/json')
+
+            def do_GET(self):
+                self._single('GET', b'')
+
+            def do_PATCH(self):
+                self._single('PATCH', self.rfile.read(int(self.headers['Content-Length'])))
+
+            def _single(self, method, body):
+                if body and self.path.split('?')[0].endswith('/freeBusy') and server.dropped_calendars & {
+                    item['id'] for item in json.loads(body)['items']
+                }:
+                    self.close_connection = True
+                    return
+                with server._lock:
+                    status, response = server._handle(method, self.path.split('?')[0],
+                                                      json.loads(body) if body else None, self.headers.get('If-Match'))
+                self._reply(status, json.dumps(response).encode() if response is not None else b'', 'application/json')
+
+            def _reply(self, status, content, content_type):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def service(self):
+        """A Calendar API client bound to this server."""
+        document = json.loads(get_static_doc('calendar', 'v3'))
+        document['rootUrl'] = self.url + '/'
+        document['baseUrl'] = self.url + '/calendar/v3/'
+        return build_from_document(document, http=httplib2.Http())
+
+    def _batch(self, content_type, body):
+        if self.failed_batches:
+            self.failed_batches -= 1
+            return json.dumps({'error': {'code': 503, 'message': "Backend error"}}).encode(), None
+
+        message = BytesParser().parsebytes(b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body)
+        parts = []
+        for part in message.get_payload():
+            request = part.get_payload().replace('\r\n', '\n')
+            head, _, request_body = request.partition('\n\n')
+            request_line, *header_lines = head.split('\n')
+            method, path, _ = request_line.split(' ')
+            headers = dict(line.split(': ', 1) for line in header_lines if ': ' in line)
+            status, response = self._handle(method, path.split('?')[0], json.loads(request_body) if request_body else None,
+                                            headers.get('If-Match', headers.get('if-match')))
+            payload = json.dumps(response) if response is not None else ''
+            parts.append(
+                f"Content-Type: application/http\r\nContent-ID: <response-{part['Content-ID'].strip('<>')}>\r\n\r\n"
+                f"HTTP/1.1 {status} Status\r\nContent-Type: application/json\r\n\r\n{payload}"
+            )
+        self.batch_sizes.append(len(parts))
+        content = ''.join(f"--fakebatch\r\n{part}\r\n" for part in parts) + "--fakebatch--"
+        return content.encode(), 'multipart/mixed; boundary=fakebatch'
+
+    def _free_busy(self, body):
+        ids = [item['id'] for item in body['items']]
+        self.free_busy_queries.append(ids)
+        calendars = {}
+        for calendar_id in ids:
+            if calendar_id in self.unavailable_calendars:
+                calendars[calendar_id] = {'errors': [{'domain': 'global', 'reason': 'notFound'}], 'busy': []}
+            else:
+                calendars[calendar_id] = {'busy': [
+                    {'start': start, 'end': end} for start, end in self.busy.get(calendar_id, [])
+                    if start < body['timeMax'] and end > body['timeMin']
+                ]}
+        return {'kind': 'calendar#freeBusy', 'calendars': calendars}
+
+    def _handle(self, method, path, body, if_match=None):
+        if path.endswith('/freeBusy'):
+            return 200, self._free_busy(body)
+        segments = path.strip('/').split('/')  # calendar/v3/calendars/{id}/events[/{event_id}]
+        event_id = segments[5] if len(segments) > 5 else None
+        self.requests.append((method, path, if_match, body))
+        key = (body or {}).get('summary') or event_id
+        pending = self.failures.get(key)
+        if pending:
+            status = pending.pop(0)
+            reason = 'rateLimitExceeded' if status == 403 else 'backendError'
+            return status, {'error': {'code': status, 'message': reason, 'errors': [{'reason': reason}]}}
+
+        if method == 'POST':
+            event = dict(body, id=body.get('id') or f"event{next(self._ids)}", etag='"1"')
+            if event['id'] in self.events:
+                return 409, {'error': {'code': 409, 'message': "The requested identifier already exists."}}
+            self.events[event['id']] = event
+            if event.get('summary') in self.lost_replies:
+                self.lost_replies.discard(event['summary'])
+                return 503, {'error': {'code': 503, 'message': 'backendError', 'errors': [{'reason': 'backendError'}]}}
+            return 200, event
+        if method == 'GET' and event_id is None:
+            return 200, {'items': list(self.events.values()), 'nextSyncToken': "1"}
+        if event_id not in self.events:
+            return 404, {'error': {'code': 404, 'message': "Not Found"}}
+        event = self.events[event_id]
+        if if_match and if_match != event['etag']:
+            return 412, {'error': {'code': 412, 'message': "Precondition Failed"}}
+        if method == 'GET':
+            return 200, event
+        if method == 'PATCH':
+            event.update(body, etag=f'"{int(event["etag"].strip(chr(34))) + 1}"')
+            return 200, event
+        if method == 'DELETE':
+            del self.events[event_id]
+            return 204, None
+        return 405, {'error': {'code': 405, 'message': "Method not allowed"}}
+
+
+@pytest.fixture
+def calendar_server():
+    server = FakeCalendarServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def calendar(calendar_server, tmp_path):
+    integration = GoogleCalendarIntegration(token_path=str(tmp_path / "token.json"))
+    integration.service = calendar_server.service()
+    return integration
+
+
+class TestAuthentication:
+    """Test the process-wide credential and service cache."""
+
+    @staticmethod
+    def _token_file(tmp_path, expires_in):
+        expiry = datetime.datetime.utcnow() + expires_in
+        token_path = tmp_path / "token.json"
+        token_path.write_text(json.dumps({
+            'token': "access-1", 'refresh_token': "refresh", 'client_id': "client", 'client_secret': "secret",
+            'expiry': expiry.strftime("%Y-%m-%dT%H:%M:%SZ")
+        }))
+        return str(token_path)
+
+    def test_token_file_is_read_once(self, tmp_path):
+        """Test that instances and threads share one load of the token file and the discovery document."""
+        token_path = self._token_file(tmp_path, datetime.timedelta(hours=1))
+        integrations = [GoogleCalendarIntegration(token_path=token_path) for _ in range(8)]
+
+        with patch.object(google_calendar.Credentials, 'from_authorized_user_file',
+                          side_effect=google_calendar.Credentials.from_authorized_user_file) as load, \
+                patch.object(google_calendar, 'build') as build, \
+                patch.object(google_calendar.Credentials, 'refresh') as refresh:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                assert all(executor.map(lambda integration: integration.authenticate(), integrations))
+            service = integrations[0].service
+            assert integrations[0].authenticate()
+
+        assert load.call_count == 1
+        build.assert_not_called()
+        refresh.assert_not_called()
+        assert len({id(integration.creds) for integration in integrations}) == 1
+        assert integrations[0].service is service
+        assert integrations[1].service is not service  # Clients are per instance
+
+    def test_token_is_refreshed_before_expiry(self, tmp_path):
+        """Test that a token about to expire is refreshed once and written back."""
+        token_path = self._token_file(tmp_path, datetime.timedelta(minutes=2))
+
+        def refresh(creds, request):
+            creds.token = "access-2"
+            creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+        with patch.object(google_calendar.Credentials, 'refresh', autospec=True, side_effect=refresh) as mock_refresh:
+            assert GoogleCalendarIntegration(token_path=token_path).authenticate()
+            assert GoogleCalendarIntegration(token_path=token_path).authenticate()
+
+        assert mock_refresh.call_count == 1
+        assert json.loads(open(token_path).read())['token'] == "access-2"
+
+    def test_missing_token_never_prompts(self, tmp_path):
+        """Test that authentication without a token fails instead of starting the browser flow."""
+        (tmp_path / "credentials.json").write_text("{}")
+        integration = GoogleCalendarIntegration(credentials_path=str(tmp_path / "credentials.json"),
+                                                token_path=str(tmp_path / "token.json"))
+
+        with patch.object(google_calendar, 'InstalledAppFlow') as flow:
+            assert not integration.authenticate()
+        flow.from_client_secrets_file.assert_not_called()
+
+    def test_refresh_does_not_block_other_tokens(self, tmp_path):
+        """Test that a slow refresh of one token file doesn't hold up callers of another."""
+        (tmp_path / "slow").mkdir()
+        (tmp_path / "fast").mkdir()
+        slow_path = self._token_file(tmp_path / "slow", datetime.timedelta(minutes=2))
+        fast_path = self._token_file(tmp_path / "fast", datetime.timedelta(hours=1))
+        refreshing, release = threading.Event(), threading.Event()
+
+        def refresh(creds, request):
+            refreshing.set()
+            assert release.wait(5)
+            creds.token = "access-2"
+            creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+        with patch.object(google_calendar.Credentials, 'refresh', autospec=True, side_effect=refresh):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                slow = executor.submit(GoogleCalendarIntegration(token_path=slow_path).authenticate)
+                assert refreshing.wait(5)
+                try:
+                    assert GoogleCalendarIntegration(token_path=fast_path).authenticate()
+                finally:
+                    release.set()
+                assert slow.result()
+
+
+class TestBatchEvents:
+    """Test batched event writes against a local Calendar server."""
+
+    @staticmethod
+    def _create(summary, hour=9):
+        start = datetime.datetime(2024, 1, 1, hour, tzinfo=datetime.timezone.utc)
+        return {'op': 'create', 'event': GoogleCalendarIntegration.event_body(
+            summary, "", start, start + datetime.timedelta(hours=1))}
+
+    def test_creates_are_sent_fifty_per_batch(self, calendar, calendar_server):
+        """Test that many creates go out in batches of at most 50."""
+        results = calendar.batch_events([self._create(f"Session {index}") for index in range(120)])
+
+        assert calendar_server.batch_sizes == [50, 50, 20]
+        assert [result['status'] for result in results] == ['ok'] * 120
+        assert [result['event']['summary'] for result in results] == [f"Session {index}" for index in range(120)]
+        assert len(calendar_server.events) == 120
+
+    def test_transient_errors_are_retried(self, calendar, calendar_server):
+        """Test that rate limits and server errors are retried and other errors are final."""
+        calendar_server.failures = {"Flaky": [503, 503], "Throttled": [403], "Invalid": [400]}
+
+        results = calendar.batch_events([self._create("Flaky"), self._create("Throttled"),
+                                         self._create("Invalid"), self._create("Fine")], backoff_seconds=0)
+
+        assert [(result['status'], result['attempts']) for result in results] == \
+               [('ok', 3), ('ok', 2), ('failed', 1), ('ok', 1)]
+        assert calendar_server.batch_sizes == [4, 2, 1]
+
+    def test_retries_are_limited(self, calendar, calendar_server):
+        """Test that an operation that keeps failing is reported after the last retry."""
+        calendar_server.failures = {"Down": [500] * 5}
+
+        result, = calendar.batch_events([self._create("Down")], max_retries=2, backoff_seconds=0)
+
+        assert (result['status'], result['attempts']) == ('failed', 3)
+        assert '500' in result['error']
+
+    def test_failed_batch_request_is_retried(self, calendar, calendar_server):
+        """Test that a batch rejected as a whole is resent."""
+        calendar_server.failed_batches = 1
+
+        results = calendar.batch_events([self._create("One"), self._create("Two")], backoff_seconds=0)
+
+        assert [(result['status'], result['attempts']) for result in results] == [('ok', 2), ('ok', 2)]
+
+    def test_applied_create_is_not_duplicated(self, calendar, calendar_server):
+        """Test that retrying a create whose reply was lost doesn't insert it twice."""
+        calendar_server.lost_replies = {"Lost"}
+
+        lost, fine = calendar.batch_events([self._create("Lost"), self._create("Fine")], backoff_seconds=0)
+
+        assert (lost['status'], lost['attempts']) == ('ok', 2)
+        assert (fine['status'], fine['attempts']) == ('ok', 1)
+        assert sorted(event['summary'] for event in calendar_server.events.values()) == ["Fine", "Lost"]
+        assert calendar_server.events[lost['event']['id']]['summary'] == "Lost"
+
+    def test_existing_event_id_on_first_attempt_fails(self, calendar, calendar_server):
+        """Test that a 409 is only treated as done when an earlier attempt was sent."""
+        first, = calendar.batch_events([self._create("Once")])
+        again, = calendar.batch_events([dict(self._create("Once"), event=dict(first['event']))], backoff_seconds=0)
+
+        assert (again['status'], again['http_status']) == ('failed', 409)
+        assert len(calendar_server.events) == 1
+
+    def test_updates_and_deletes(self, calendar, calendar_server):
+        """Test mixed operations with per-operation results."""
+        created = calendar.batch_events([self._create("Keep"), self._create("Drop")])
+        keep, drop = (result['event']['id'] for result in created)
+
+        results = calendar.batch_events([
+            {'op': 'update', 'event_id': keep, 'event': {'summary': "Kept"}},
+            {'op': 'delete', 'event_id': drop},
+            {'op': 'delete', 'event_id': "missing"}
+        ], backoff_seconds=0)
+
+        assert [result['status'] for result in results] == ['ok', 'ok', 'failed']
+        assert results[0]['event']['summary'] == "Kept"
+        assert list(calendar_server.events) == [keep]
+
+        with pytest.raises(ValueError):
+            calendar.batch_events([{'op': 'update', 'event': {}}])
+
+    def test_scheduler_pushes_items_in_batches(self, calendar, calendar_server):
+        """Test that a scheduled plan is pushed with batched creates."""
+        day = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        scheduler = AdaptiveScheduler(calendar_integration=calendar)
+        scheduler.scheduled_items = [
+            ScheduleItem(id=f"item{index}", title=f"Topic {index}", duration_minutes=30, priority=5,
+                         start_time=day + datetime.timedelta(hours=index),
+                         end_time=day + datetime.timedelta(hours=index, minutes=30))
+            for index in range(60)
+        ] + [ScheduleItem(id="later", title="Later", duration_minutes=30, priority=5)]
+        scheduler.algorithm = AdaptiveSchedulingAlgorithm(scheduler.scheduled_items, [])
+
+        results = scheduler.create_calendar_events()
+
+        assert calendar_server.batch_sizes == [50, 10]
+        assert all(result['status'] == 'ok' and result['event_id'] for result in results)
+        assert len(results) == 60
+        assert scheduler.create_calendar_events(["later"]) == [{'item_id': "later", 'status': 'unscheduled'}]
+
+
+class TestFreeBusy:
+    """Test free/busy aggregation over many calendars."""
+
+    START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    END = datetime.datetime(2024, 1, 8, tzinfo=datetime.timezone.utc)
+
+    def test_calendars_are_chunked_and_merged(self, calendar, calendar_server):
+        """Test that many calendars are queried fifty at a time and their busy periods coalesced."""
+        ids = [f"team{index}@example.com" for index in range(120)]
+        calendar_server.busy = {
+            ids[0]: [("2024-01-02T09:00:00Z", "2024-01-02T10:00:00Z"), ("2024-01-03T09:00:00Z", "2024-01-03T10:00:00Z")],
+            ids[75]: [("2024-01-02T09:30:00Z", "2024-01-02T11:00:00Z")],
+            ids[119]: [("2024-01-02T11:00:00Z", "2024-01-02T12:00:00Z"), ("2024-01-01T08:00:00Z", "2024-01-01T08:30:00Z")]
+        }
+
+        busy = calendar.get_free_busy(time_min=self.START, time_max=self.END, calendar_ids=ids)
+
+        assert sorted(len(query) for query in calendar_server.free_busy_queries) == [20, 50, 50]
+        assert busy == [
+            {'start': "2024-01-01T08:00:00Z", 'end': "2024-01-01T08:30:00Z"},
+            {'start': "2024-01-02T09:00:00Z", 'end': "2024-01-02T12:00:00Z"},
+            {'start': "2024-01-03T09:00:00Z", 'end': "2024-01-03T10:00:00Z"}
+        ]
+
+    def test_results_are_cached_per_horizon(self, calendar, calendar_server):
+        """Test that the same horizon a little later is answered from the cache."""
+        calendar_server.busy = {'primary': [("2024-01-01T08:00:00Z", "2024-01-01T09:00:00Z"),
+                                            ("2024-01-08T00:00:30Z", "2024-01-08T01:00:00Z")]}
+
+        assert len(calendar.get_free_busy(time_min=self.START, time_max=self.END)) == 1
+        later = datetime.timedelta(seconds=45)
+        busy = calendar.get_free_busy(time_min=self.START + later, time_max=self.END + later)
+
+        assert len(calendar_server.free_busy_queries) == 1
+        assert busy == [{'start': "2024-01-01T08:00:00Z", 'end': "2024-01-01T09:00:00Z"},
+                        {'start': "2024-01-08T00:00:30Z", 'end': "2024-01-08T01:00:00Z"}]
+
+        calendar.get_free_busy(time_min=self.START, time_max=self.END + datetime.timedelta(days=1))
+        calendar.FREE_BUSY_TTL_SECONDS = 0
+        calendar.get_free_busy(time_min=self.START, time_max=self.END)
+        assert len(calendar_server.free_busy_queries) == 3
+
+    def test_failed_calendars_are_skipped_and_not_cached(self, calendar, calendar_server):
+        """Test that an unavailable calendar leaves out its periods without caching the partial result."""
+        calendar_server.busy = {'primary': [("2024-01-02T09:00:00Z", "2024-01-02T10:00:00Z")]}
+        calendar_server.unavailable_calendars = {"gone@example.com"}
+
+        for _ in range(2):
+            busy = calendar.get_free_busy(time_min=self.START, time_max=self.END,
+                                          calendar_ids=['primary', "gone@example.com"])
+            assert busy == [{'start': "2024-01-02T09:00:00Z", 'end': "2024-01-02T10:00:00Z"}]
+        assert len(calendar_server.free_busy_queries) == 2
+
+    def test_transport_errors_fail_only_their_chunk(self, calendar, calendar_server):
+        """Test that a chunk whose connection drops is skipped like a failed query and not cached."""
+        ids = [f"team{index}@example.com" for index in range(60)]
+        calendar_server.busy = {ids[0]: [("2024-01-02T09:00:00Z", "2024-01-02T10:00:00Z")]}
+        calendar_server.dropped_calendars = {ids[59]}
+
+        for _ in range(2):
+            busy = calendar.get_free_busy(time_min=self.START, time_max=self.END, calendar_ids=ids)
+            assert busy == [{'start': "2024-01-02T09:00:00Z", 'end': "2024-01-02T10:00:00Z"}]
+        assert len(calendar_server.free_busy_queries) == 2
+
+
+class TestEventUpdates:
+    """Test ETag-guarded event patches against a local Calendar server."""
+
+    @staticmethod
+    def _mirrored(calendar, calendar_server, db_session_factory, *summaries):
+        start = datetime.datetime(2024, 1, 1, 9, tzinfo=datetime.timezone.utc)
+        created = calendar.batch_events([
+            {'op': 'create', 'event': GoogleCalendarIntegration.event_body(
+                summary, "", start, start + datetime.timedelta(hours=1))}
+            for summary in summaries
+        ])
+        sync = CalendarSync(calendar, db_session_factory, initial_window_days=None)
+        sync.sync()
+        calendar_server.requests.clear()
+        return sync, [result['event']['id'] for result in created]
+
+    def test_update_event_is_one_patch(self, calendar, calendar_server):
+        """Test that a single update is one PATCH of the changed fields, without a prior read."""
+        event_id = calendar.create_event(summary="Study", start_time=datetime.datetime(2024, 1, 1, 9),
+                                         end_time=datetime.datetime(2024, 1, 1, 10))['id']
+        calendar_server.requests.clear()
+
+        updated = calendar.update_event('primary', event_id, {'summary': "Review"}, etag='"1"')
+
+        assert updated['summary'] == "Review"
+        assert [(method, if_match, body) for method, _, if_match, body in calendar_server.requests] == \
+               [('PATCH', '"1"', {'summary': "Review"})]
+        assert calendar.update_event('primary', event_id, {'summary': "Stale"}, etag='"1"') is None
+
+    def test_patches_carry_mirrored_etags(self, calendar, calendar_server, db_session_factory):
+        """Test that batched patches send only the changes, guarded by the mirrored ETag."""
+        sync, (first, second) = self._mirrored(calendar, calendar_server, db_session_factory, "One", "Two")
+        moved = {'start': {'dateTime': "2024-01-01T11:00:00Z"}, 'end': {'dateTime': "2024-01-01T12:00:00Z"}}
+
+        results = sync.update_events([(first, moved), (second, {'summary': "Two (moved)"})])
+
+        assert [result['status'] for result in results] == ['ok', 'ok']
+        assert calendar_server.batch_sizes[-1] == 2
+        assert [(method, if_match, body) for method, _, if_match, body in calendar_server.requests] == \
+               [('PATCH', '"1"', moved), ('PATCH', '"1"', {'summary': "Two (moved)"})]
+
+        # The mirror holds the new ETags, so a second round of patches succeeds too
+        assert sync._etags('primary', [first, second]) == {first: '"2"', second: '"2"'}
+        assert sync.update_events([(first, {'summary': "One again"})])[0]['status'] == 'ok'
+        busy = sync.busy_periods(datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2))
+        assert {'start': "2024-01-01T11:00:00Z", 'end': "2024-01-01T12:00:00Z"} in busy
+
+    def test_stale_etag_refreshes_event(self, calendar, calendar_server, db_session_factory):
+        """Test that a 412 re-fetches the event instead of overwriting the remote edit."""
+        sync, (event_id,) = self._mirrored(calendar, calendar_server, db_session_factory, "Study")
+        calendar.update_event('primary', event_id, {'summary': "Edited elsewhere"})
+        calendar_server.requests.clear()
+
+        result, = sync.update_events([(event_id, {'summary': "Mine"})])
+
+        assert result['status'] == 'conflict'
+        assert result['event']['summary'] == "Edited elsewhere"
+        assert calendar_server.events[event_id]['summary'] == "Edited elsewhere"
+        assert [(method, if_match) for method, _, if_match, _ in calendar_server.requests] == \
+               [('PATCH', '"1"'), ('GET', None)]
+        assert sync._etags('primary', [event_id]) == {event_id: '"2"'}
+
+    def test_unmirrored_event_is_read_before_patch(self, calendar, calendar_server, db_session_factory):
+        """Test that an event missing from the mirror is fetched for its ETag, never patched blind."""
+        sync, (mirrored,) = self._mirrored(calendar, calendar_server, db_session_factory, "Mirrored")
+        unmirrored = calendar.create_event(summary="New", start_time=datetime.datetime(2024, 1, 2, 9),
+                                           end_time=datetime.datetime(2024, 1, 2, 10))['id']
+        calendar_server.requests.clear()
+
+        results = sync.update_events([(unmirrored, {'summary': "New (moved)"}),
+                                      ("missing", {'summary': "Gone"}),
+                                      (mirrored, {'summary': "Mirrored (moved)"})])
+
+        assert [result['status'] for result in results] == ['ok', 'failed', 'ok']
+        assert calendar_server.events[unmirrored]['summary'] == "New (moved)"
+        assert [(method, if_match) for method, _, if_match, _ in calendar_server.requests] == \
+               [('GET', None), ('GET', None), ('PATCH', '"1"'), ('PATCH', '"1"')]
+        assert sync._etags('primary', [unmirrored]) == {unmirrored: '"2"'}
+
+    def test_refresh_drops_deleted_event(self, calendar, calendar_server, db_session_factory):
+        """Test that refreshing an event deleted remotely removes it from the mirror."""
+        sync, (event_id,) = self._mirrored(calendar, calendar_server, db_session_factory, "Study")
+        del calendar_server.events[event_id]
+
+        assert sync.refresh_event(event_id) is None
+        assert sync._etags('primary', [event_id]) == {}
+
+
+class TestCalendarSync:
+    """Test the incremental calendar mirror."""
+
+    @staticmethod
+    def _sync(db_session_factory, service):
+        integration = GoogleCalendarIntegration()
+        integration.service = service
+        return CalendarSync(integration, db_session_factory, initial_window_days=None)
+
+    def test_get_events_follows_pages(self):
+        """Test that event listing doesn't stop after the first page."""
+        service = FakeEventsService(page_size=2)
+        for index in range(5):
+            service.put(_event(f"e{index}", 1, 9 + index, 10 + index))
+        integration = GoogleCalendarIntegration()
+        integration.service = service
+
+        assert [event['id'] for event in integration.get_events()] == ["e0", "e1", "e2", "e3", "e4"]
+
+    def test_full_then_incremental_sync(self, db_session_factory):
+        """Test that later syncs fetch and apply only the changes."""
+        service = FakeEventsService(page_size=2)
+        service.put(_event("standup", 1, 9, 10))
+        service.put(_event("lunch", 1, 12, 13, transparency='transparent'))
+        service.put(_event("review", 2, 14, 16))
+        sync = self._sync(db_session_factory, service)
+
+        assert sync.sync() == {'calendar_id': 'primary', 'mode': 'full', 'updated': 3, 'deleted': 0}
+        assert len(service.requests) == 2  # Two pages
+
+        service.put(_event("review", 2, 15, 17))
+        service.cancel("standup")
+        service.requests.clear()
+        assert sync.sync() == {'calendar_id': 'primary', 'mode': 'incremental', 'updated': 1, 'deleted': 1}
+        assert service.requests[0]['syncToken'] == "3"
+
+        busy = sync.busy_periods(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+                                 datetime.datetime(2024, 1, 3, tzinfo=datetime.timezone.utc))
+        assert busy == [{'start': "2024-01-02T15:00:00Z", 'end': "2024-01-02T17:00:00Z"}]
+
+    def test_expired_token_triggers_full_resync(self, db_session_factory):
+        """Test that a 410 response rebuilds the mirror from a full listing."""
+        service = FakeEventsService()
+        service.put(_event("standup", 1, 9, 10))
+        sync = self._sync(db_session_factory, service)
+        sync.sync()
+
+        service.expired_tokens.add("1")
+        service.cancel("standup")
+        service.put(_event("lab", 1, 11, 12))
+
+        assert sync.sync()['mode'] == 'full'
+        busy = sync.busy_periods(datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2))
+        assert busy == [{'start': "2024-01-01T11:00:00Z", 'end': "2024-01-01T12:00:00Z"}]
+        assert 'syncToken' not in service.requests[-1]
+
+    def test_failed_sync_keeps_previous_token(self, db_session_factory):
+        """Test that an API error leaves the mirror and token untouched."""
+        service = FakeEventsService()
+        service.put(_event("standup", 1, 9, 10))
+        sync = self._sync(db_session_factory, service)
+        sync.sync()
+
+        service.list = Mock(side_effect=HttpError(httplib2.Response({'status': 500}), b'Backend error'))
+        with pytest.raises(HttpError):
+            sync.sync()
+
+        del service.list
+        service.put(_event("lab", 1, 11, 12))
+        assert sync.sync() == {'calendar_id': 'primary', 'mode': 'incremental', 'updated': 1, 'deleted': 0}
+
+    def test_scheduler_reads_availability_from_mirror(self, db_session_factory):
+        """Test that availability comes from the mirror without calling the API."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        tomorrow = (now + datetime.timedelta(days=1)).date()
+        service = FakeEventsService()
+        service.put({'id': "meeting", 'status': 'confirmed',
+                     'start': {'dateTime': f"{tomorrow}T10:00:00+00:00"},
+                     'end': {'dateTime': f"{tomorrow}T11:00:00+00:00"}})
+        sync = self._sync(db_session_factory, service)
+        sync.sync()
+
+        calendar = Mock()
+        scheduler = AdaptiveScheduler(calendar_integration=calendar, calendar_sync=sync,
+                                      working_hours={weekday: [(datetime.time(9), datetime.time(12), 0.8)]
+                                                     for weekday in range(7)})
+        scheduler._load_user_availability()
+
+        calendar.authenticate.assert_not_called()
+        calendar.get_free_busy.assert_not_called()
+        tomorrow_slots = [(slot.start_time.hour, slot.end_time.hour)
+                          for slot in scheduler.user_availability if slot.start_time.date() == tomorrow]
+        assert tomorrow_slots == [(9, 10), (11, 12)]
+
+    def test_all_day_events_follow_the_calendar_time_zone(self, db_session_factory):
+        """Test that an all-day event blocks its day in the calendar's zone, not in UTC."""
+        service = FakeEventsService(time_zone="America/New_York")
+        service.put({'id': "offsite", 'status': 'confirmed',
+                     'start': {'date': "2024-01-15"}, 'end': {'date': "2024-01-16"}})
+        sync = self._sync(db_session_factory, service)
+        sync.sync()
+
+        busy = sync.busy_periods(datetime.datetime(2024, 1, 14), datetime.datetime(2024, 1, 17))
+        assert busy == [{'start': "2024-01-15T05:00:00Z", 'end': "2024-01-16T05:00:00Z"}]
+
+        # Single-event reads carry no calendar zone; the one from the last sync is used
+        sync.refresh_event("offsite")
+        assert sync.busy_periods(datetime.datetime(2024, 1, 14), datetime.datetime(2024, 1, 17)) == busy
+
+    def test_scheduler_syncs_a_stale_mirror_first(self, db_session_factory):
+        """Test that a never-synced mirror is synced rather than read as a free calendar."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        tomorrow = (now + datetime.timedelta(days=1)).date()
+        service = FakeEventsService()
+        service.put({'id': "meeting", 'status': 'confirmed',
+                     'start': {'dateTime': f"{tomorrow}T10:00:00+00:00"},
+                     'end': {'dateTime': f"{tomorrow}T11:00:00+00:00"}})
+        sync = self._sync(db_session_factory, service)
+
+        scheduler = AdaptiveScheduler(calendar_integration=Mock(), calendar_sync=sync,
+                                      working_hours={weekday: [(datetime.time(9), datetime.time(12), 0.8)]
+                                                     for weekday in range(7)})
+        scheduler._load_user_availability()
+
+        assert list(sync.synced_at()) == ['primary']
+        tomorrow_slots = [(slot.start_time.hour, slot.end_time.hour)
+                          for slot in scheduler.user_availability if slot.start_time.date() == tomorrow]
+        assert tomorrow_slots == [(9, 10), (11, 12)]
+
+    def test_unsyncable_mirror_falls_back_to_default_availability(self, db_session_factory):
+        """Test that a stale mirror of an unreachable calendar isn't taken as free time."""
+        calendar = GoogleCalendarIntegration()
+        calendar.authenticate = Mock(return_value=False)
+        sync = CalendarSync(calendar, db_session_factory)
+
+        scheduler = AdaptiveScheduler(calendar_integration=Mock(), calendar_sync=sync,
+                                      working_hours={weekday: [(datetime.time(9), datetime.time(12), 0.8)]
+                                                     for weekday in range(7)})
+        scheduler._load_user_availability()
+
+        assert len(scheduler.user_availability) == scheduler.horizon_days
+        assert all(slot.end_time - slot.start_time >= datetime.timedelta(hours=6)
+                   for slot in scheduler.user_availability)
+
+
+ICS_EXPORT = """BEGIN:VCALENDAR\r
+VERSION:2.0\r
+BEGIN:VEVENT\r
+UID:standup\r
+DTSTART;TZID=Europe/Berlin:20240320T090000\r
+DTEND;TZID=Europe/Berlin:20240320T093000\r
+RRULE:FREQ=WEEKLY;BYDAY=WE;UNTIL=20240417T080000Z\r
+EXDATE;TZID=Europe/Berlin:20240403T090000\r
+SUMMARY:Weekly standup with a summary long enough that the exporter folds it \r
+ onto a second line\r
+BEGIN:VALARM\r
+TRIGGER:-PT10M\r
+END:VALARM\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:standup\r
+RECURRENCE-ID;TZID=Europe/Berlin:20240410T090000\r
+DTSTART;TZID=Europe/Berlin:20240410T140000\r
+DURATION:PT1H\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:review\r
+DTSTART:20240321T130000Z\r
+DTEND:20240321T150000Z\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:holiday\r
+DTSTART;VALUE=DATE:20240329\r
+DTEND;VALUE=DATE:20240330\r
+TRANSP:TRANSPARENT\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:offsite\r
+DTSTART;VALUE=DATE:20240322\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:cancelled\r
+STATUS:CANCELLED\r
+DTSTART:20240321T100000Z\r
+DTEND:20240321T110000Z\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+class TestIcsAvailability:
+    """Test busy periods read from an iCalendar export."""
+
+    @staticmethod
+    def _busy(provider, start, end):
+        return [(period['start'], period['end']) for period in provider.busy_periods(
+            datetime.datetime.fromisoformat(start + "+00:00"), datetime.datetime.fromisoformat(end + "+00:00"))]
+
+    @pytest.fixture
+    def ics_path(self, tmp_path):
+        path = tmp_path / "calendar.ics"
+        path.write_text(ICS_EXPORT, newline='')
+        return str(path)
+
+    def test_events_and_recurrences(self, ics_path):
+        """Test one-off, all-day, transparent, cancelled and recurring events."""
+        provider = IcsAvailabilityProvider(ics_path)
+
+        assert self._busy(provider, "2024-03-18T00:00:00", "2024-03-25T00:00:00") == [
+            ("2024-03-20T08:00:00Z", "2024-03-20T08:30:00Z"),  # CET
+            ("2024-03-21T13:00:00Z", "2024-03-21T15:00:00Z"),
+            ("2024-03-22T00:00:00Z", "2024-03-23T00:00:00Z")
+        ]
+        # Across the DST change the standup stays at 9:00 Berlin time; one week is
+        # excluded, one was moved to the afternoon, and the rule ends mid-April
+        assert self._busy(provider, "2024-03-25T00:00:00", "2024-05-01T00:00:00") == [
+            ("2024-03-27T08:00:00Z", "2024-03-27T08:30:00Z"),
+            ("2024-04-10T12:00:00Z", "2024-04-10T13:00:00Z"),
+            ("2024-04-17T07:00:00Z", "2024-04-17T07:30:00Z")
+        ]
+        # Periods are clipped to the window
+        assert self._busy(provider, "2024-03-21T14:00:00", "2024-03-21T16:00:00") == [
+            ("2024-03-21T14:00:00Z", "2024-03-21T15:00:00Z")]
+
+    def test_durations_across_dst(self, tmp_path):
+        """Test that DURATION hours elapse in real time and days keep the local time."""
+        path = tmp_path / "dst.ics"
+        path.write_text("BEGIN:VCALENDAR\r\n"
+                        "BEGIN:VEVENT\r\nUID:night\r\nDTSTART:20240331T013000\r\nDURATION:PT2H\r\nEND:VEVENT\r\n"
+                        "BEGIN:VEVENT\r\nUID:weekly\r\nDTSTART:20240324T013000\r\nDURATION:PT2H\r\n"
+                        "RRULE:FREQ=WEEKLY;COUNT=2\r\nEND:VEVENT\r\n"
+                        "BEGIN:VEVENT\r\nUID:day\r\nDTSTART;VALUE=DATE:20240331\r\nDURATION:P1D\r\nEND:VEVENT\r\n"
+                        "END:VCALENDAR\r\n", newline='')
+        provider = IcsAvailabilityProvider(str(path), default_timezone="Europe/Berlin")
+
+        index = provider._index()
+        assert [(datetime.datetime.fromtimestamp(start, datetime.timezone.utc).isoformat(),
+                 datetime.datetime.fromtimestamp(end, datetime.timezone.utc).isoformat())
+                for start, end in zip(index.starts, index.ends)] == [
+            ("2024-03-30T23:00:00+00:00", "2024-03-31T22:00:00+00:00"),  # 23-hour local day
+            ("2024-03-31T00:30:00+00:00", "2024-03-31T02:30:00+00:00")  # Two hours, ending 4:30 CEST
+        ]
+        occurrences = list(index.recurrences[0].occurrences(
+            datetime.datetime(2024, 3, 30, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2024, 4, 1, tzinfo=datetime.timezone.utc)))
+        assert occurrences == [(datetime.datetime(2024, 3, 31, 0, 30, tzinfo=datetime.timezone.utc),
+                                datetime.datetime(2024, 3, 31, 2, 30, tzinfo=datetime.timezone.utc))]
+
+    def test_index_is_cached_per_default_timezone(self, ics_path):
+        """Test that providers reading floating times in different zones don't share an index."""
+        utc = self._busy(IcsAvailabilityProvider(ics_path), "2024-03-22T00:00:00", "2024-03-23T00:00:00")
+        berlin = self._busy(IcsAvailabilityProvider(ics_path, default_timezone="Europe/Berlin"),
+                            "2024-03-21T00:00:00", "2024-03-23T00:00:00")
+
+        assert utc == [("2024-03-22T00:00:00Z", "2024-03-23T00:00:00Z")]
+        assert ("2024-03-21T23:00:00Z", "2024-03-22T23:00:00Z") in berlin
+
+    def test_index_is_cached_by_mtime_and_hash(self, ics_path):
+        """Test that unchanged or only touched files aren't parsed again."""
+        provider = IcsAvailabilityProvider(ics_path)
+        with patch.object(IcsAvailabilityProvider, '_parse', autospec=True,
+                          side_effect=IcsAvailabilityProvider._parse) as parse:
+            provider.busy_periods(datetime.datetime(2024, 3, 18), datetime.datetime(2024, 3, 25))
+            IcsAvailabilityProvider(ics_path).busy_periods(datetime.datetime(2024, 3, 18), datetime.datetime(2024, 3, 25))
+            assert parse.call_count == 1
+
+            stat = os.stat(ics_path)
+            os.utime(ics_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            provider.busy_periods(datetime.datetime(2024, 3, 18), datetime.datetime(2024, 3, 25))
+            assert parse.call_count == 1
+
+            with open(ics_path, 'w', newline='') as ics_file:
+                ics_file.write(ICS_EXPORT.replace("20240321T150000Z", "20240321T160000Z"))
+            os.utime(ics_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+            assert self._busy(provider, "2024-03-21T00:00:00", "2024-03-22T00:00:00") == [
+                ("2024-03-21T13:00:00Z", "2024-03-21T16:00:00Z")]
+            assert parse.call_count == 2
+
+    def test_large_export_is_streamed(self, tmp_path):
+        """Test that parsing a multi-megabyte export never holds the file in memory."""
+        path = tmp_path / "large.ics"
+        start = datetime.datetime(2020, 1, 1, 9)
+        with open(path, 'w', newline='') as ics_file:
+            ics_file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+            for index in range(5000):
+                day = start + datetime.timedelta(hours=6 * index)
+                ics_file.write(
+                    f"BEGIN:VEVENT\r\nUID:event-{index}@example.com\r\n"
+                    f"DTSTART:{day:%Y%m%dT%H%M%S}Z\r\nDTEND:{day:%Y%m%dT%H}3000Z\r\n"
+                    f"SUMMARY:Meeting {index}\r\nDESCRIPTION:{'Agenda item. ' * 80}\r\nEND:VEVENT\r\n")
+            ics_file.write("END:VCALENDAR\r\n")
+        size = os.path.getsize(path)
+        assert size > 5 * 10 ** 6
+
+        tracemalloc.start()
+        try:
+            busy = IcsAvailabilityProvider(str(path)).busy_periods(datetime.datetime(2021, 1, 1),
+                                                                   datetime.datetime(2021, 1, 2))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert len(busy) == 4
+        assert peak < size / 2
+
+    def test_scheduler_uses_provider(self, tmp_path):
+        """Test that the scheduler reads busy times from a provider and falls back without one."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        tomorrow = (now + datetime.timedelta(days=1)).date()
+        path = tmp_path / "calendar.ics"
+        path.write_text(f"BEGIN:VCALENDAR\nBEGIN:VEVENT\nUID:lab\nDTSTART:{tomorrow:%Y%m%d}T100000Z\n"
+                        f"DTEND:{tomorrow:%Y%m%d}T110000Z\nEND:VEVENT\nEND:VCALENDAR\n")
+        calendar = Mock()
+        working_hours = {weekday: [(datetime.time(9), datetime.time(12), 0.8)] for weekday in range(7)}
+
+        scheduler = AdaptiveScheduler(calendar_integration=calendar, working_hours=working_hours,
+                                      availability_provider=IcsAvailabilityProvider(str(path)))
+        scheduler._load_user_availability()
+
+        calendar.authenticate.assert_not_called()
+        assert [(slot.start_time.hour, slot.end_time.hour) for slot in scheduler.user_availability
+                if slot.start_time.date() == tomorrow] == [(9, 10), (11, 12)]
+
+        scheduler.availability_provider = IcsAvailabilityProvider(str(tmp_path / "missing.ics"))
+        scheduler._load_user_availability()
+        assert len(scheduler.user_availability) == scheduler.horizon_days
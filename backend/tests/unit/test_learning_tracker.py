@@ -3,23 +3,36 @@ Unit tests for Learning Tracker module components.
 """
 
 import pytest
+import time
+from unittest.mock import Mock, patch
+from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timedelta
-from ...core.learning_tracker.goal_tracker import GoalTracker
+from ...core.learning_tracker.goal_tracker import GoalTracker, SNAPSHOT_INTERVAL
+from ...core.learning_tracker.goal_notifier import GoalDeadlineNotifier
 from ...core.learning_tracker.path_generator import PathGenerator
 from ...core.learning_tracker.skill_analyzer import SkillAnalyzer
+from ...core.learning_tracker.skill_taxonomy import (
+    DEFAULT_SKILL_HIERARCHY, FALLBACK_RETRY_SECONDS, VERSION_CHECK_SECONDS, SkillTaxonomyCache,
+    get_taxonomy_version, invalidate_skill_taxonomy
+)
+from ...core.learning_tracker.learning_curve import LearningCurveCache, LearningCurveFitter
+from ...models import (
+    Goal, GoalProgressEvent, GoalProgressSnapshot, LearningSession, QuizAttempt, SessionSkill, Skill,
+    SkillLearningState, SkillTaxonomyVersion, LearningCurve, LearningCurveWatermark
+)
 
 
 class TestGoalTracker:
     """Test goal tracker functionality."""
 
-    def test_init(self):
+    def test_init(self, db_session_factory):
         """Test goal tracker initialization."""
-        tracker = GoalTracker()
-        assert tracker.goals == {}
+        tracker = GoalTracker(db_session_factory)
+        assert tracker.get_active_goals() == []
 
-    def test_create_goal(self):
+    def test_create_goal(self, db_session_factory):
         """Test goal creation."""
-        tracker = GoalTracker()
+        tracker = GoalTracker(db_session_factory)
         goal = tracker.create_goal(
             title="Learn Robotics",
             description="Master robotics fundamentals",
@@ -40,9 +53,9 @@ class TestGoalTracker:
         assert "milestones" in goal
         assert len(goal["milestones"]) == 3  # Divided into 3 milestones
 
-    def test_update_goal_progress(self):
+    def test_update_goal_progress(self, db_session_factory):
         """Test goal progress update."""
-        tracker = GoalTracker()
+        tracker = GoalTracker(db_session_factory)
         goal = tracker.create_goal("Test Goal", "Test", "Test", ["Skill1"], 4)
 
         updated_goal = tracker.update_goal_progress(goal["goal_id"], 50.0, "Made good progress")
@@ -51,18 +64,18 @@ class TestGoalTracker:
         assert len(updated_goal["notes"]) == 1
         assert updated_goal["notes"][0]["note"] == "Made good progress"
 
-    def test_update_goal_progress_completion(self):
+    def test_update_goal_progress_completion(self, db_session_factory):
         """Test goal completion when progress reaches 100%."""
-        tracker = GoalTracker()
+        tracker = GoalTracker(db_session_factory)
         goal = tracker.create_goal("Test Goal", "Test", "Test", ["Skill1"], 4)
 
         updated_goal = tracker.update_goal_progress(goal["goal_id"], 100.0)
 
         assert updated_goal["status"] == "Completed"
 
-    def test_get_active_goals(self):
+    def test_get_active_goals(self, db_session_factory):
         """Test getting active goals."""
-        tracker = GoalTracker()
+        tracker = GoalTracker(db_session_factory)
         goal1 = tracker.create_goal("Active Goal", "Test", "Test", ["Skill1"], 4)
         goal2 = tracker.create_goal("Completed Goal", "Test", "Test", ["Skill2"], 4)
         tracker.update_goal_progress(goal2["goal_id"], 100.0)
@@ -71,14 +84,14 @@ class TestGoalTracker:
         assert len(active_goals) == 1
         assert active_goals[0]["goal_id"] == goal1["goal_id"]
 
-    def test_calculate_goal_completion_rate(self):
+    def test_calculate_goal_completion_rate(self, db_session_factory):
         """Test goal completion rate calculation."""
-        tracker = GoalTracker()
+        tracker = GoalTracker(db_session_factory)
         goal = tracker.create_goal("Test Goal", "Test", "Test", ["Skill1"], 4)
 
         # Set goal creation date to 2 weeks ago
-        two_weeks_ago = datetime.now() - timedelta(weeks=2)
-        goal["created_date"] = two_weeks_ago.isoformat()
+        self._set_goal_dates(db_session_factory, goal["goal_id"],
+                             created_date=datetime.now() - timedelta(weeks=2))
 
         metrics = tracker.calculate_goal_completion_rate(goal["goal_id"])
 
@@ -88,32 +101,411 @@ class TestGoalTracker:
         assert "is_on_track" in metrics
         assert "days_remaining" in metrics
 
-    def test_get_overdue_goals(self):
+    def test_get_overdue_goals(self, db_session_factory):
         """Test getting overdue goals."""
-        tracker = GoalTracker()
+        tracker = GoalTracker(db_session_factory)
         goal = tracker.create_goal("Overdue Goal", "Test", "Test", ["Skill1"], 1)
 
         # Set creation date to more than a week ago
         week_ago = datetime.now() - timedelta(weeks=2)
-        goal["created_date"] = week_ago.isoformat()
+        self._set_goal_dates(db_session_factory, goal["goal_id"], created_date=week_ago,
+                             expected_completion_date=week_ago + timedelta(weeks=1))
 
         overdue = tracker.get_overdue_goals()
         assert len(overdue) == 1
         assert overdue[0]["goal_id"] == goal["goal_id"]
 
+    def test_goals_persist_across_trackers(self, db_session_factory):
+        """Test that goals are shared through the database."""
+        goal = GoalTracker(db_session_factory).create_goal(
+            "Shared Goal", "Test", "Robotics", ["Skill1"], 4
+        )
+
+        other = GoalTracker(db_session_factory)
+        assert other.get_goal_by_id(goal["goal_id"])["title"] == "Shared Goal"
+        assert [g["goal_id"] for g in other.get_goals_by_domain("Robotics")] == [goal["goal_id"]]
+        assert other.get_goals_by_domain("Robotics", status="Completed") == []
+
+    def test_bulk_update_progress(self, db_session_factory):
+        """Test updating many goals at once."""
+        tracker = GoalTracker(db_session_factory)
+        goal1 = tracker.create_goal("Goal 1", "Test", "Test", ["Skill1"], 4)
+        goal2 = tracker.create_goal("Goal 2", "Test", "Test", ["Skill2"], 4)
+
+        updated = tracker.bulk_update_progress({goal1["goal_id"]: 30.0, goal2["goal_id"]: 120.0})
+
+        assert updated == 2
+        assert tracker.get_goal_by_id(goal1["goal_id"])["progress_percent"] == 30.0
+        completed = tracker.get_goal_by_id(goal2["goal_id"])
+        assert completed["progress_percent"] == 100.0
+        assert completed["status"] == "Completed"
+        assert [g["goal_id"] for g in tracker.get_active_goals()] == [goal1["goal_id"]]
+
+    def test_update_missing_goal(self, db_session_factory):
+        """Test that updating an unknown goal raises."""
+        tracker = GoalTracker(db_session_factory)
+        with pytest.raises(ValueError):
+            tracker.update_goal_progress("missing", 10.0)
+
+    def test_goal_queries_use_indexes(self, db_session_factory):
+        """Test that status/domain and status/deadline lookups hit the composite indexes."""
+        from sqlalchemy import text
+
+        db = db_session_factory()
+        plans = [
+            " ".join(str(col) for row in db.execute(text(f"EXPLAIN QUERY PLAN {query}")) for col in row)
+            for query in (
+                "SELECT * FROM goals WHERE status = 'Active' AND domain = 'Robotics'",
+                "SELECT * FROM goals WHERE status = 'Active' AND expected_completion_date < '2024-01-01'",
+                "SELECT goal_id FROM goals WHERE status = 'Active' AND at_risk_at <= '2024-01-01'"
+            )
+        ]
+        db.close()
+
+        assert "idx_goal_status_domain" in plans[0]
+        assert "idx_goal_status_due" in plans[1]
+        assert "idx_goal_status_at_risk" in plans[2]
+
+    def test_upgrade_database_migrates_old_goal_schema(self, tmp_path):
+        """Test that an existing goals table gains the new columns and indexes."""
+        from sqlalchemy import create_engine, inspect, text
+        from sqlalchemy.orm import sessionmaker
+        from ...models import upgrade_database
+        from ...models.models import Base
+
+        old_engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with old_engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE goals (goal_id VARCHAR PRIMARY KEY, title VARCHAR NOT NULL, "
+                "description TEXT, domain VARCHAR, timeframe_weeks INTEGER, priority VARCHAR, "
+                "status VARCHAR, progress_percent FLOAT, created_date DATETIME, "
+                "expected_completion_date DATETIME)"
+            ))
+            conn.execute(text("CREATE INDEX idx_goal_status ON goals (status)"))
+            conn.execute(text(
+                "INSERT INTO goals VALUES ('g1', 'Old Goal', '', 'Robotics', 4, 'Medium', "
+                "'Active', 25.0, '2024-01-01 00:00:00', '2024-01-29 00:00:00')"
+            ))
+
+        # Startup order: create_all for missing tables, then the migrations
+        Base.metadata.create_all(bind=old_engine)
+        upgrade_database(old_engine)
+        upgrade_database(old_engine)
+
+        schema = inspect(old_engine)
+        columns = {column["name"] for column in schema.get_columns("goals")}
+        indexes = {index["name"] for index in schema.get_indexes("goals")}
+        assert {"target_skills", "linked_projects", "progress_sequence", "at_risk_at"} <= columns
+        assert "idx_goal_status" not in indexes
+        assert {"idx_goal_status_domain", "idx_goal_status_due", "idx_goal_status_at_risk"} <= indexes
+
+        # Existing rows start their progress log at sequence 0
+        tracker = GoalTracker(sessionmaker(bind=old_engine))
+        assert [g["goal_id"] for g in tracker.get_active_goals()] == ["g1"]
+        # Existing goals get a base snapshot of their current progress
+        assert tracker.get_goal_state_at("g1", datetime(2024, 1, 5))["progress_percent"] == 25.0
+        # 25% of a four-week goal falls behind after its seventh day
+        assert tracker.get_at_risk_goal_ids(datetime(2024, 1, 8, 12)) == []
+        assert tracker.get_at_risk_goal_ids(datetime(2024, 1, 9)) == ["g1"]
+        assert tracker.update_goal_progress("g1", 50.0)["progress_percent"] == 50.0
+        old_engine.dispose()
+
+    def test_upgrade_database_resets_date_watermark(self, tmp_path):
+        """Test that learning curves fitted on the old date watermark are refit from scratch."""
+        from sqlalchemy import create_engine, inspect, text
+        from sqlalchemy.orm import sessionmaker
+        from ...models import upgrade_database
+        from ...models.models import Base
+
+        old_engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with old_engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE quiz_attempts (quiz_id VARCHAR PRIMARY KEY, attempt_id VARCHAR NOT NULL, "
+                "concept_id VARCHAR, skill_id VARCHAR, score FLOAT, time_spent_minutes INTEGER, "
+                "date_attempted DATETIME, retention_predicted FLOAT, next_review_date DATETIME)"
+            ))
+            conn.execute(text(
+                "CREATE TABLE learning_curve_watermark (watermark_id INTEGER PRIMARY KEY, "
+                "last_session_date DATETIME, last_attempt_date DATETIME)"
+            ))
+            conn.execute(text("INSERT INTO learning_curve_watermark VALUES (1, '2024-01-01', '2024-01-02')"))
+            conn.execute(text(
+                "INSERT INTO quiz_attempts (quiz_id, attempt_id, score, date_attempted) "
+                "VALUES ('q1', '1', 50.0, '2024-01-02 00:00:00')"
+            ))
+
+        Base.metadata.create_all(bind=old_engine)
+        with old_engine.begin() as conn:
+            conn.execute(text("INSERT INTO learning_curves (domain, sample_count, sum_xx, sum_xy) "
+                              "VALUES ('Controls', 3, 1.0, 1.0)"))
+        upgrade_database(old_engine)
+        upgrade_database(old_engine)
+
+        schema = inspect(old_engine)
+        assert "created_date" in {column["name"] for column in schema.get_columns("quiz_attempts")}
+        assert "session_created" in {column["name"] for column in schema.get_columns("learning_curve_watermark")}
+        db = sessionmaker(bind=old_engine)()
+        assert db.get(QuizAttempt, "q1").created_date == datetime(2024, 1, 2)
+        assert db.get(LearningCurveWatermark, 1) is None
+        assert db.query(LearningCurve).count() == 0
+        db.close()
+        old_engine.dispose()
+
+    def test_upgrade_database_on_current_schema(self, db_session_factory):
+        """Test that migrating a freshly created database is a no-op."""
+        from ...models import upgrade_database
+
+        upgrade_database(db_session_factory.kw["bind"])
+        assert GoalTracker(db_session_factory).get_active_goals() == []
+
+    def test_overdue_detection_sees_other_writers(self, db_session_factory):
+        """Test that overdue checks pick up goals created or re-dated elsewhere."""
+        tracker = GoalTracker(db_session_factory)
+        short = tracker.create_goal("Short Goal", "Test", "Test", ["Skill1"], 1)
+
+        in_two_weeks = datetime.now() + timedelta(weeks=2)
+        assert tracker.get_overdue_goals() == []
+        assert [g["goal_id"] for g in tracker.get_overdue_goals(in_two_weeks)] == [short["goal_id"]]
+        assert tracker.get_overdue_goal_ids(in_two_weeks) == [short["goal_id"]]
+        assert short["expected_completion_timestamp"] == datetime.fromisoformat(
+            short["expected_completion_date"]).timestamp()
+
+        tracker.update_goal_progress(short["goal_id"], 100.0)
+        assert tracker.get_overdue_goals(in_two_weeks) == []
+
+        # Written by another tracker after this one has already checked
+        long = GoalTracker(db_session_factory).create_goal("Long Goal", "Test", "Test", ["Skill2"], 8)
+        in_ten_weeks = datetime.now() + timedelta(weeks=10)
+        assert [g["goal_id"] for g in tracker.get_overdue_goals(in_ten_weeks)] == [long["goal_id"]]
+
+        # Re-dated directly in the database
+        self._set_goal_dates(db_session_factory, long["goal_id"],
+                             expected_completion_date=datetime.now() - timedelta(days=1))
+        assert tracker.get_overdue_goal_ids() == [long["goal_id"]]
+
+    def test_deadline_notifier_events(self, db_session_factory):
+        """Test that the notifier pushes at-risk and overdue events once."""
+        tracker = GoalTracker(db_session_factory)
+        goal = tracker.create_goal("Goal", "Test", "Test", ["Skill1"], 4)
+        tracker.update_goal_progress(goal["goal_id"], 50.0)
+
+        events = []
+        notifier = GoalDeadlineNotifier(tracker, events.append)
+        now = datetime.now()
+
+        assert notifier.check(now + timedelta(days=10)) == []
+
+        at_risk = notifier.check(now + timedelta(days=16))
+        assert [(e["type"], e["goal_id"]) for e in at_risk] == [("at_risk", goal["goal_id"])]
+        assert at_risk[0]["metrics"]["is_on_track"] is False
+
+        overdue = notifier.check(now + timedelta(weeks=5))
+        assert [(e["type"], e["goal_id"]) for e in overdue] == [("overdue", goal["goal_id"])]
+        assert notifier.check(now + timedelta(weeks=6)) == []
+        assert len(events) == 2
+
+        # Goals created by another tracker are reported on the next check
+        other = GoalTracker(db_session_factory).create_goal("Other", "Test", "Test", ["Skill2"], 1)
+        later = notifier.check(now + timedelta(weeks=6))
+        assert {(e["type"], e["goal_id"]) for e in later} == {
+            ("overdue", other["goal_id"]), ("at_risk", other["goal_id"])
+        }
+
+        # A restarted notifier does not report the same goals again
+        restarted = GoalDeadlineNotifier(GoalTracker(db_session_factory), events.append)
+        assert restarted.check(now + timedelta(weeks=6)) == []
+
+    def test_at_risk_goals_follow_progress(self, db_session_factory):
+        """Test that the at-risk query agrees with is_on_track as progress changes."""
+        tracker = GoalTracker(db_session_factory)
+        goal = tracker.create_goal("Goal", "Test", "Test", ["Skill1"], 4)
+        notifier = GoalDeadlineNotifier(tracker, lambda event: None)
+        now = datetime.now()
+
+        for days in (0, 1, 2, 10):
+            at = now + timedelta(days=days)
+            behind = not tracker.calculate_goal_completion_rate(goal["goal_id"], at)["is_on_track"]
+            assert (tracker.get_at_risk_goal_ids(at) == [goal["goal_id"]]) == behind
+
+        assert [e["goal_id"] for e in notifier.check(now + timedelta(days=10))] == [goal["goal_id"]]
+
+        # Catching up clears the notification, falling behind again reports it again
+        tracker.update_goal_progress(goal["goal_id"], 50.0)
+        assert tracker.get_at_risk_goal_ids(now + timedelta(days=10)) == []
+        assert notifier.check(now + timedelta(days=10)) == []
+        assert [e["goal_id"] for e in notifier.check(now + timedelta(days=16))] == [goal["goal_id"]]
+
+        tracker.update_goal_progress(goal["goal_id"], 100.0)
+        assert tracker.get_at_risk_goal_ids(now + timedelta(weeks=3)) == []
+
+    def test_progress_events_and_snapshots(self, db_session_factory):
+        """Test that progress updates are logged with periodic snapshots."""
+        tracker = GoalTracker(db_session_factory)
+        goal = tracker.create_goal("Goal", "Test", "Test", ["Skill1"], 4)
+
+        for step in range(1, 2 * SNAPSHOT_INTERVAL + 6):
+            tracker.update_goal_progress(goal["goal_id"], float(step))
+
+        db = db_session_factory()
+        events = db.query(GoalProgressEvent).filter_by(goal_id=goal["goal_id"]).count()
+        snapshots = [s.sequence for s in db.query(GoalProgressSnapshot).filter_by(goal_id=goal["goal_id"])]
+        db.close()
+
+        assert events == 2 * SNAPSHOT_INTERVAL + 6  # Creation event plus one per update
+        assert sorted(snapshots) == [0, SNAPSHOT_INTERVAL, 2 * SNAPSHOT_INTERVAL]
+
+        state = tracker.get_goal_state_at(goal["goal_id"], datetime.now())
+        assert state["sequence"] == 2 * SNAPSHOT_INTERVAL + 5
+        assert state["progress_percent"] == tracker.get_goal_by_id(goal["goal_id"])["progress_percent"]
+
+    def test_goal_state_at_point_in_time(self, db_session_factory):
+        """Test reading past states and burndown history."""
+        tracker = GoalTracker(db_session_factory)
+        goal = tracker.create_goal("Goal", "Test", "Test", ["Skill1"], 4)
+        created = datetime.fromisoformat(goal["created_date"])
+
+        # Backdate progress events to one per day
+        for progress in [10.0, 25.0, 60.0]:
+            tracker.update_goal_progress(goal["goal_id"], progress)
+        db = db_session_factory()
+        for event in db.query(GoalProgressEvent).filter(GoalProgressEvent.sequence > 0):
+            event.recorded_at = created + timedelta(days=event.sequence)
+        db.commit()
+        db.close()
+
+        assert tracker.get_goal_state_at(goal["goal_id"], created - timedelta(days=1)) is None
+        assert tracker.get_goal_state_at(goal["goal_id"], created)["progress_percent"] == 0.0
+        past = tracker.get_goal_state_at(goal["goal_id"], created + timedelta(days=2, hours=1))
+        assert past["progress_percent"] == 25.0
+        assert past["sequence"] == 2
+
+        history = tracker.get_progress_history(goal["goal_id"], created, created + timedelta(days=4))
+        assert [p["progress_percent"] for p in history] == [0.0, 10.0, 25.0, 60.0, 60.0]
+        assert history[-1]["remaining_percent"] == 40.0
+
+    def _set_goal_dates(self, db_session_factory, goal_id, **dates):
+        """Backdate a stored goal."""
+        db = db_session_factory()
+        goal = db.get(Goal, goal_id)
+        for field, value in dates.items():
+            setattr(goal, field, value)
+        db.commit()
+        db.close()
+
 
 class TestSkillAnalyzer:
     """Test skill analyzer functionality."""
 
-    def test_init(self):
+    def test_init(self, db_session_factory):
         """Test skill analyzer initialization."""
-        analyzer = SkillAnalyzer()
+        analyzer = SkillAnalyzer(db_session_factory)
         assert "Computer Vision" in analyzer.skill_hierarchy
         assert "Robotics" in analyzer.skill_hierarchy
 
-    def test_analyze_skill_gaps(self, sample_user_skills):
+    def test_taxonomy_loaded_from_skills_table(self, db_session_factory):
+        """Test that the hierarchy is built from Skill.parent_skill_id."""
+        db = db_session_factory()
+        db.add_all([
+            Skill(skill_id="robotics", name="Robotics", domain="Robotics"),
+            Skill(skill_id="control", name="Control Systems", domain="Robotics", parent_skill_id="robotics"),
+            Skill(skill_id="pid", name="PID Control", domain="Robotics", parent_skill_id="control")
+        ])
+        db.commit()
+        db.close()
+
+        analyzer = SkillAnalyzer(db_session_factory)
+
+        assert analyzer.skill_hierarchy == {
+            "Robotics": ["Control Systems"],
+            "Control Systems": ["PID Control"]
+        }
+        assert analyzer._get_dependent_skills("PID Control") == ["Control Systems"]
+        assert analyzer.taxonomy.get_domain("PID Control") == "Robotics"
+
+    def test_taxonomy_cache_invalidated_on_skill_edit(self, db_session_factory):
+        """Test that the cached taxonomy is reused until a skill changes."""
+        db = db_session_factory()
+        db.add(Skill(skill_id="cv", name="Computer Vision"))
+        db.add(Skill(skill_id="det", name="Object Detection", parent_skill_id="cv"))
+        db.commit()
+
+        analyzer = SkillAnalyzer(db_session_factory)
+        first = analyzer.taxonomy
+        assert analyzer.taxonomy is first
+
+        db.add(Skill(skill_id="seg", name="Segmentation", parent_skill_id="cv"))
+        db.commit()
+        db.close()
+
+        second = analyzer.taxonomy
+        assert second is not first
+        assert second.hierarchy["Computer Vision"] == ["Object Detection", "Segmentation"]
+
+        invalidate_skill_taxonomy()
+        assert analyzer.taxonomy is not second
+
+    def test_taxonomy_invalidated_only_on_commit(self, db_session_factory):
+        """Test that flushed skill edits invalidate the cache at commit, never on rollback."""
+        version = get_taxonomy_version()
+        db = db_session_factory()
+        db.add(Skill(skill_id="cv", name="Computer Vision"))
+        db.flush()
+        assert get_taxonomy_version() == version
+
+        db.rollback()
+        assert get_taxonomy_version() == version
+
+        db.add(Skill(skill_id="cv", name="Computer Vision"))
+        db.flush()
+        db.add(Skill(skill_id="det", name="Object Detection", parent_skill_id="cv"))
+        db.flush()
+        db.commit()
+        assert get_taxonomy_version() == version + 1
+        # The stored version moves once per committed transaction too
+        assert db.get(SkillTaxonomyVersion, 1).version == 1
+        db.close()
+
+    def test_taxonomy_edits_from_other_processes_are_picked_up(self, db_session_factory):
+        """Test that a skill edit committed by another worker reloads the taxonomy after the version check."""
+        from sqlalchemy import text
+
+        db = db_session_factory()
+        db.add(Skill(skill_id="cv", name="Computer Vision"))
+        db.commit()
+
+        analyzer = SkillAnalyzer(db_session_factory)
+        first = analyzer.taxonomy
+
+        # What another process's commit leaves behind, without this process's commit hook
+        db.execute(text("INSERT INTO skills (skill_id, name, parent_skill_id) VALUES ('seg', 'Segmentation', 'cv')"))
+        db.execute(text("UPDATE skill_taxonomy_version SET version = version + 1"))
+        db.commit()
+        db.close()
+        assert analyzer.taxonomy is first
+
+        with patch('robomentor_app.backend.core.learning_tracker.skill_taxonomy.time.monotonic',
+                   return_value=time.monotonic() + VERSION_CHECK_SECONDS + 1):
+            assert analyzer.taxonomy.hierarchy == {"Computer Vision": ["Segmentation"]}
+
+    def test_taxonomy_fallback_is_cached_with_backoff(self):
+        """Test that an unreadable skills table isn't queried again on every lookup."""
+        session = Mock()
+        session.execute.side_effect = SQLAlchemyError("database is locked")
+        cache = SkillTaxonomyCache(lambda: session)
+
+        first = cache.get()
+        assert first.hierarchy == DEFAULT_SKILL_HIERARCHY
+        assert cache.get() is first
+        assert session.execute.call_count == 1
+
+        with patch('robomentor_app.backend.core.learning_tracker.skill_taxonomy.time.monotonic',
+                   return_value=time.monotonic() + FALLBACK_RETRY_SECONDS + 1):
+            cache.get()
+        assert session.execute.call_count == 2
+
+    def test_analyze_skill_gaps(self, db_session_factory, sample_user_skills):
         """Test skill gap analysis."""
-        analyzer = SkillAnalyzer()
+        analyzer = SkillAnalyzer(db_session_factory)
         target_skills = {"Python": 90.0, "Machine Learning": 80.0, "Robotics": 70.0}
 
         gaps = analyzer.analyze_skill_gaps(sample_user_skills, target_skills)
@@ -130,9 +522,42 @@ class TestSkillAnalyzer:
         assert python_gap["current"] == 75.0
         assert python_gap["target"] == 90.0
 
-    def test_identify_learning_sequence(self):
+    def test_analyze_skill_gaps_batch_matches_scalar(self, db_session_factory):
+        """Test that the vectorized gap analysis matches the per-user path."""
+        import numpy as np
+
+        analyzer = SkillAnalyzer(db_session_factory)
+        skills = ["Robotics", "Control Systems", "PID Control", "Computer Vision", "Python"]
+        rng = np.random.default_rng(42)
+        current = rng.uniform(0, 100, (200, len(skills))).round(1)
+        target = rng.uniform(0, 100, (200, len(skills))).round(1)
+        target[rng.uniform(size=target.shape) < 0.2] = np.nan  # Untargeted skills
+
+        batch = analyzer.analyze_skill_gaps_batch(skills, current, target)
+
+        for user in range(len(current)):
+            current_skills = dict(zip(skills, current[user].tolist()))
+            target_skills = {s: t for s, t in zip(skills, target[user].tolist()) if not np.isnan(t)}
+            expected = analyzer.analyze_skill_gaps(current_skills, target_skills)
+
+            assert batch["total_gap_hours"][user] == expected["total_gap_hours"]
+            assert batch["average_gap"][user] == expected["average_gap"]
+            for col, skill in enumerate(skills):
+                gap = expected["gaps"].get(skill)
+                assert batch["has_gap"][user, col] == (gap is not None)
+                if gap:
+                    assert batch["gap_size"][user, col] == gap["gap_size"]
+                    assert batch["priority"][user, col] == gap["priority"]
+
+    def test_analyze_skill_gaps_batch_shape_mismatch(self, db_session_factory):
+        """Test that mismatched matrices are rejected."""
+        analyzer = SkillAnalyzer(db_session_factory)
+        with pytest.raises(ValueError):
+            analyzer.analyze_skill_gaps_batch(["Python"], [[10.0, 20.0]], [[50.0, 60.0]])
+
+    def test_identify_learning_sequence(self, db_session_factory):
         """Test learning sequence identification."""
-        analyzer = SkillAnalyzer()
+        analyzer = SkillAnalyzer(db_session_factory)
         skill_gaps = {
             "Robotics": {"priority": 0.8, "gap_size": 40.0},
             "Control Systems": {"priority": 0.9, "gap_size": 50.0},
@@ -145,9 +570,9 @@ class TestSkillAnalyzer:
         assert sequence[0] == "Control Systems"
         assert len(sequence) == 3
 
-    def test_calculate_skill_progression(self):
+    def test_calculate_skill_progression(self, db_session_factory):
         """Test skill progression calculation."""
-        analyzer = SkillAnalyzer()
+        analyzer = SkillAnalyzer(db_session_factory)
 
         progression = analyzer.calculate_skill_progression(
             skill="Python",
@@ -165,6 +590,166 @@ class TestSkillAnalyzer:
         assert progression["improvement"] > 0
 
 
+class TestLearningCurveFitter:
+    """Test learning-curve fitting from session history."""
+
+    def _add_history(self, db, start, weeks, hours_per_week, gain_per_week, score=20.0):
+        """Add weekly study sessions on PID Control, each followed by a quiz."""
+        for week in range(weeks):
+            day = start + timedelta(weeks=week)
+            session_id = f"s-{day.isoformat()}"
+            db.add(LearningSession(session_id=session_id, date=day, duration_minutes=hours_per_week * 60))
+            db.add(SessionSkill(session_id=session_id, skill_id="pid"))
+            db.add(QuizAttempt(quiz_id=f"q-{day.isoformat()}", attempt_id="1", skill_id="pid",
+                               score=score + gain_per_week * week, date_attempted=day + timedelta(days=1)))
+        db.commit()
+
+    def test_fit_from_sessions(self, db_session_factory):
+        """Test that the fitted rate reflects the observed progress."""
+        db = db_session_factory()
+        db.add(Skill(skill_id="pid", name="PID Control", domain="Controls"))
+        self._add_history(db, datetime(2024, 1, 1), weeks=5, hours_per_week=10, gain_per_week=1.0)
+        db.close()
+
+        cache = LearningCurveCache(db_session_factory)
+        fitted = LearningCurveFitter(db_session_factory, cache).update()
+
+        # Every observation: 10 hours, +1 point at level ~20-23
+        assert fitted["Controls"] == pytest.approx(1.2, rel=0.05)
+        assert cache.get_rate("Controls") == fitted["Controls"]
+
+    def test_incremental_update(self, db_session_factory):
+        """Test that later runs only fold in new history."""
+        db = db_session_factory()
+        db.add(Skill(skill_id="pid", name="PID Control", domain="Controls"))
+        self._add_history(db, datetime(2024, 1, 1), weeks=4, hours_per_week=10, gain_per_week=1.0)
+
+        cache = LearningCurveCache(db_session_factory)
+        fitter = LearningCurveFitter(db_session_factory, cache)
+        first = fitter.update()["Controls"]
+
+        assert fitter.update() == {}  # Nothing new
+
+        self._add_history(db, datetime(2024, 3, 1), weeks=3, hours_per_week=10, gain_per_week=5.0, score=28.0)
+        db.close()
+        second = fitter.update()["Controls"]
+
+        assert second > first
+
+    def test_late_and_back_dated_history_is_picked_up(self, db_session_factory):
+        """Test that rows recorded after a run are folded in whatever their dates."""
+        db = db_session_factory()
+        db.add(Skill(skill_id="pid", name="PID Control", domain="Controls"))
+        self._add_history(db, datetime(2024, 3, 1), weeks=3, hours_per_week=10, gain_per_week=1.0)
+
+        fitter = LearningCurveFitter(db_session_factory, LearningCurveCache(db_session_factory))
+        fitter.update()
+        state = db.get(SkillLearningState, "pid")
+        db.refresh(state)
+        assert state.pending_hours == 0.0
+
+        # Logged late: a session dated before everything already fitted
+        db.add(LearningSession(session_id="late", date=datetime(2024, 1, 1), duration_minutes=120))
+        db.add(SessionSkill(session_id="late", skill_id="pid"))
+        # Back-dated attempt: must not be taken as the latest score
+        db.add(QuizAttempt(quiz_id="old-quiz", attempt_id="1", skill_id="pid", score=5.0,
+                           date_attempted=datetime(2024, 1, 2)))
+        db.commit()
+
+        fitter.update()
+        db.refresh(state)
+        assert state.pending_hours == 2.0
+        assert state.last_score == 22.0
+
+        assert fitter.update() == {}
+        db.refresh(state)
+        assert state.pending_hours == 2.0
+        db.close()
+
+    def test_rows_at_the_watermark_time_are_read_once(self, db_session_factory):
+        """Test that rows sharing the watermark's insertion time are neither skipped nor repeated."""
+        created = datetime(2024, 5, 1, 12, 0)
+        db = db_session_factory()
+        db.add(Skill(skill_id="pid", name="PID Control", domain="Controls"))
+        db.add(LearningSession(session_id="a", date=datetime(2024, 5, 1), duration_minutes=60,
+                               created_date=created))
+        db.add(SessionSkill(session_id="a", skill_id="pid"))
+        db.commit()
+
+        fitter = LearningCurveFitter(db_session_factory, LearningCurveCache(db_session_factory))
+        fitter.update()
+
+        db.add(LearningSession(session_id="b", date=datetime(2024, 5, 1), duration_minutes=60,
+                               created_date=created))
+        db.add(SessionSkill(session_id="b", skill_id="pid"))
+        db.commit()
+
+        fitter.update()
+        fitter.update()
+        assert db.get(SkillLearningState, "pid").pending_hours == 2.0
+        db.close()
+
+    def test_periodic_fitting(self, db_session_factory):
+        """Test that a started fitter fits right away and stops cleanly."""
+        db = db_session_factory()
+        db.add(Skill(skill_id="pid", name="PID Control", domain="Controls"))
+        self._add_history(db, datetime(2024, 1, 1), weeks=5, hours_per_week=10, gain_per_week=1.0)
+        db.close()
+
+        cache = LearningCurveCache(db_session_factory)
+        fitter = LearningCurveFitter(db_session_factory, cache, interval_seconds=60)
+        fitter.start()
+        fitter.stop()
+
+        assert cache.get_rate("Controls") == pytest.approx(1.2, rel=0.05)
+
+    def test_rates_fitted_elsewhere_are_picked_up(self, db_session_factory):
+        """Test that a worker's cache reloads rates fitted by another worker once its TTL runs out."""
+        db = db_session_factory()
+        db.add(Skill(skill_id="pid", name="PID Control", domain="Controls"))
+        self._add_history(db, datetime(2024, 1, 1), weeks=5, hours_per_week=10, gain_per_week=1.0)
+        db.close()
+
+        other_worker = LearningCurveCache(db_session_factory, ttl_seconds=60)
+        assert other_worker.get_rate("Controls") is None
+
+        LearningCurveFitter(db_session_factory, LearningCurveCache(db_session_factory)).update()
+        assert other_worker.get_rate("Controls") is None
+
+        with patch('robomentor_app.backend.core.learning_tracker.learning_curve.time.monotonic',
+                   return_value=time.monotonic() + 61):
+            assert other_worker.get_rate("Controls") == pytest.approx(1.2, rel=0.05)
+
+    def test_rates_fallback_is_cached_with_backoff(self):
+        """Test that an unreadable learning_curves table isn't queried on every estimate."""
+        session = Mock()
+        session.execute.side_effect = SQLAlchemyError("database is locked")
+        cache = LearningCurveCache(lambda: session)
+
+        assert cache.get_rate("Controls") is None
+        assert cache.get_rate("Controls") is None
+        assert session.execute.call_count == 1
+
+        with patch('robomentor_app.backend.core.learning_tracker.learning_curve.time.monotonic',
+                   return_value=time.monotonic() + FALLBACK_RETRY_SECONDS + 1):
+            cache.get_rate("Controls")
+        assert session.execute.call_count == 2
+
+    def test_progression_uses_cached_rate(self, db_session_factory):
+        """Test that progression estimates use the fitted rate for the skill's domain."""
+        analyzer = SkillAnalyzer(db_session_factory)
+        default = analyzer.calculate_skill_progression("PID Control", 40.0, 20, domain="Controls")
+        assert default["is_fitted"] is False
+
+        analyzer.learning_curves.update({"Controls": 2.0})
+        fitted = analyzer.calculate_skill_progression("PID Control", 40.0, 20, domain="Controls")
+
+        assert fitted["is_fitted"] is True
+        new_level = 40.0 + 20 / 10 * 2.0 / 1.4
+        assert fitted["improvement"] == round(new_level - 40.0, 1)
+        assert fitted["time_to_next_milestone"] == int((50 - new_level) * (1 + new_level / 100) * 10 / 2.0)
+
+
 class TestPathGenerator:
     """Test learning path generator functionality."""
 